@@ -1,99 +1,293 @@
-import os
+import asyncio
+import re
+import threading
+import time
 import pytz
+from collections import namedtuple, deque
 from dateutil.parser import parse
 from dateparser import parse as parse_date
 from dateparser.search import search_dates
 from datetime import datetime, timedelta
 
-from langchain.agents import initialize_agent, Tool
-from langchain.agents.agent_types import AgentType
-from langchain.memory import ConversationBufferMemory
+from config import (
+    AGENT_ROUTER, HYBRID_CONFIDENCE_THRESHOLD, MEETING_SEARCH_HORIZON_DAYS, MEETING_SEARCH_RESULTS,
+    LLM_HISTORY_MAX_TURNS
+)
+from calendar_utils import book_slot, delete_event, get_day_slots, find_meeting_slots
+import async_calendar
+import calendar_utils
+
+# 🧠 Chat state lives per session; tools read the current request's context
+from session_store import current_context, session_scope
+from event_cache import EventCache
+from booking_ledger import SlotUnavailableError
+from agent_events import emit, event_sink, is_streaming
+from tracing import span, traced
+from log_setup import get_logger
 
-from llm_setup import get_llm
-from config import GOOGLE_CALENDAR_ID
-from calendar_utils import get_free_slots, book_slot, get_calendar_service, delete_event
+log = get_logger("agent")
 
 # ------------------------------
-# 🧠 ChatContext to track memory
+# 🗓️ Date resolution: fast path → memo → dateparser
 # ------------------------------
-class ChatContext:
-    def __init__(self):
-        self.pending_booking = None
-        self.last_date = None
-        self.pending_delete = False
-        self.pending_delete_title = None
-        self.pending_reschedule = False
-        self.pending_reschedule_title = None
+DATE_LANGUAGES = ["en"]
+DEFAULT_DATE_SETTINGS = {"PREFER_DATES_FROM": "future"}
+
+_MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+           "august", "september", "october", "november", "december"]
+_WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_TIME_PART = r"(?:at\s+)?(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>am|pm)"
+_FAST_DATE = re.compile(
+    r"(?:(?P<relative>today|tomorrow|day after tomorrow)"
+    r"|(?P<iso>\d{4}-\d{2}-\d{2})"
+    r"|(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+(?P<month>" + "|".join(_MONTHS) + r")"
+    r"|(?P<month_first>" + "|".join(_MONTHS) + r")\s+(?P<day_second>\d{1,2})(?:st|nd|rd|th)?"
+    r"|(?P<weekday>" + "|".join(_WEEKDAY_NAMES) + r"))"
+    r"(?:\s+" + _TIME_PART + r")?"
+)
+_FAST_TIME = re.compile(_TIME_PART)
+
+# Keyed on (normalized text, reference date, settings); see _cacheable for what is stored
+_date_cache = EventCache(ttl_seconds=24 * 3600, max_entries=2048)
+
+def _normalize_date_text(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(".!?")
+
+def _fast_time(match, day: datetime):
+    hour = int(match.group("hour"))
+    if not 1 <= hour <= 12:
+        return None
+    minute = int(match.group("minute") or 0)
+    if minute > 59:
+        return None
+    hour = hour % 12 + (12 if match.group("ampm") == "pm" else 0)
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+def _fast_resolve(text: str, now: datetime):
+    """
+    Resolve the everyday shapes without dateparser, matching what it returns
+    for PREFER_DATES_FROM=future. Returns None to fall through to the slow path.
+    """
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    match = _FAST_TIME.fullmatch(text)
+    if match:
+        # A bare time that already passed today means tomorrow
+        dt = _fast_time(match, midnight)
+        return dt + timedelta(days=1) if dt and dt < now else dt
+
+    match = _FAST_DATE.fullmatch(text)
+    if not match:
+        return None
+    has_time = match.group("hour") is not None
+
+    try:
+        if match.group("relative"):
+            offset = {"today": 0, "tomorrow": 1, "day after tomorrow": 2}[match.group("relative")]
+            if not has_time:
+                # dateparser keeps the current clock time for relative days
+                return now + timedelta(days=offset)
+            day = midnight + timedelta(days=offset)
+        elif match.group("iso"):
+            day = datetime.strptime(match.group("iso"), "%Y-%m-%d")
+        elif match.group("weekday"):
+            offset = (_WEEKDAY_NAMES.index(match.group("weekday")) - now.weekday()) % 7 or 7
+            day = midnight + timedelta(days=offset)
+        else:
+            day_number = int(match.group("day") or match.group("day_second"))
+            month = _MONTHS.index(match.group("month") or match.group("month_first")) + 1
+            day = midnight.replace(month=month, day=day_number)
+            dt = _fast_time(match, day) if has_time else day
+            if dt is None:
+                return None
+            # Day + month with no year rolls to next year once it has passed
+            return dt.replace(year=dt.year + 1) if dt < now else dt
+    except ValueError:
+        # e.g. 31 June or 29 February; let dateparser decide
+        return None
+
+    return _fast_time(match, day) if has_time else day
+
+def _cacheable(results, now: datetime) -> bool:
+    """
+    Results that carry the current clock time ("tomorrow", "in 2 hours"; typed
+    times never have microseconds) or land on the reference day (which can flip
+    to a later day as the clock moves) are recomputed. Everything else is
+    stable for the whole reference date.
+    """
+    for dt in results:
+        if dt is None:
+            continue
+        if dt.microsecond or dt.date() == now.date():
+            return False
+    return True
+
+def _settings_key(settings):
+    return tuple(sorted(settings.items()))
+
+@traced("date_parsing")
+def resolve_date(text: str, settings=None):
+    """dateparser.parse with a fast path for common phrasings and a per-day memo."""
+    settings = settings or DEFAULT_DATE_SETTINGS
+    now = datetime.now()
+    normalized = _normalize_date_text(text)
+
+    if settings == DEFAULT_DATE_SETTINGS:
+        dt = _fast_resolve(normalized, now)
+        if dt is not None:
+            return dt
+
+    key = ("parse", normalized, now.date(), _settings_key(settings))
+    hit = _date_cache.get(key)
+    if hit is not None:
+        return hit[0]
+
+    dt = parse_date(text, settings=settings, languages=DATE_LANGUAGES)
+    if _cacheable([dt], now):
+        _date_cache.put(key, (dt,))
+    return dt
+
+@traced("date_parsing")
+def search_date_mentions(text: str, settings=None):
+    """dateparser.search.search_dates, memoized per reference date; always returns a list."""
+    settings = settings or DEFAULT_DATE_SETTINGS
+    now = datetime.now()
+    # Keyed on the raw text: the matched substrings are returned as written
+    key = ("search", text, now.date(), _settings_key(settings))
+    hit = _date_cache.get(key)
+    if hit is not None:
+        return list(hit)
+
+    found = search_dates(text, settings=settings, languages=DATE_LANGUAGES) or []
+    if _cacheable([dt for _, dt in found], now):
+        _date_cache.put(key, tuple(found))
+    return list(found)
+
+def prewarm_date_parser():
+    """Load dateparser's language data up front so the first chat doesn't pay for it."""
+    start = time.perf_counter()
+    parse_date("tomorrow at 3 pm", settings=DEFAULT_DATE_SETTINGS, languages=DATE_LANGUAGES)
+    search_dates("book a call on 8 July at 2 pm", settings=DEFAULT_DATE_SETTINGS, languages=DATE_LANGUAGES)
+    log.info("dateparser pre-warmed (%s) in %.2fs", ", ".join(DATE_LANGUAGES), time.perf_counter() - start)
+
+# ------------------------------
+# 🧰 Tool helpers shared by the sync and async tools
+# ------------------------------
+class ToolInputError(Exception):
+    """Raised with a user-facing message when tool arguments can't be used."""
+
+def _parse_attendees(attendees):
+    if isinstance(attendees, str):
+        attendees = [a.strip() for a in attendees.split(",") if a.strip()]
+    return attendees or None
+
+def _format_availability(date: str, day_slots, attendees=None) -> str:
+    # 📅 Label each 30-min slot, two per line
+    slot_lines = day_slots.to_text(columns=2)
+
+    # ✅ Final message (title and CTA outside code block)
+    title = f"📅 **Availability on {date}:**"
+    if attendees:
+        title = f"📅 **Common availability on {date}** (you + {', '.join(attendees)}):"
+    code_block = "```\n" + slot_lines + "\n```"
+    cta = "💬 _Would you like me to book one of these?_"
+
+    return f"{title}\n\n{code_block}\n\n{cta}"
+
+def _booking_window(time: str, date: str = None, duration_minutes: int = 30):
+    if not date:
+        date = current_context().get_last_date()
+        if not date:
+            raise ToolInputError("❌ Please provide a date to book the meeting.")
+
+    dt = resolve_date(f"{date} {time}")
+    if not dt:
+        raise ToolInputError(f"❌ Could not understand the time '{time}' for date '{date}'.")
+
+    # ✅ Ensure timezone-aware datetime in IST
+    tz = pytz.timezone("Asia/Kolkata")
+    if dt.tzinfo is None:
+        start_time = tz.localize(dt)
+    else:
+        start_time = dt.astimezone(tz)
 
-    def update_date(self, date_str):
-        self.last_date = date_str
+    return start_time, start_time + timedelta(minutes=duration_minutes)
+
+def _slot_bounds(start_time: datetime, end_time: datetime):
+    return (
+        {"dateTime": start_time.isoformat(), "timeZone": "Asia/Kolkata"},
+        {"dateTime": end_time.isoformat(), "timeZone": "Asia/Kolkata"},
+    )
 
-    def get_last_date(self):
-        return self.last_date
+def _booking_confirmation(summary: str, start_time: datetime, end_time: datetime) -> str:
+    confirmation = f"✅ Booking confirmed: **{summary}** from {start_time.strftime('%Y-%m-%d %I:%M %p')} to {end_time.strftime('%I:%M %p')}"
+    return confirmation if confirmation.strip() else "✅ Meeting booked successfully."
 
-chat_context = ChatContext()
+def _reschedule_window(new_date: str, new_time: str, duration: timedelta = timedelta(minutes=30)):
+    dt = resolve_date(f"{new_date} {new_time}")
+    if not dt:
+        raise ToolInputError(f"❌ Could not understand the new date/time: '{new_date} {new_time}'")
 
-# 🛠️ Tool: Check availability
-def check_availability(date: str) -> str:
+    tz = pytz.timezone("Asia/Kolkata")
+    start_time = tz.localize(dt)
+    return start_time, start_time + duration
+
+def _event_duration(event) -> timedelta:
+    # ⏱️ A moved meeting keeps its length; all-day or odd events fall back to 30 minutes
     try:
-        print(f"[TOOL:check_availability] Checking slots for date: {date}")
-        chat_context.update_date(date)
-        tz = pytz.timezone("Asia/Kolkata")
-        start_datetime = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
-        end_datetime = start_datetime + timedelta(days=1)
-
-        # 🔄 Fetch events
-        service = get_calendar_service()
-        events_result = service.events().list(
-            calendarId=GOOGLE_CALENDAR_ID,
-            timeMin=start_datetime.isoformat(),
-            timeMax=end_datetime.isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
-        print(f"[DEBUG] Fetched {len(events)} events for {date}")
-
-        # 📌 Build busy intervals
-        busy_intervals = []
-        for event in events:
-            if 'dateTime' in event['start']:
-                busy_start = parse(event['start']['dateTime']).astimezone(tz)
-                busy_end = parse(event['end']['dateTime']).astimezone(tz)
-                busy_intervals.append((busy_start, busy_end))
-
-        # 📅 Build 30-min slots
-        slots = []
-        current = start_datetime.replace(hour=9, minute=0, second=0, microsecond=0)
-        work_end = start_datetime.replace(hour=17, minute=0, second=0, microsecond=0)
-
-        while current < work_end:
-            slot_start = current
-            slot_end = current + timedelta(minutes=30)
-            current = slot_end
-
-            is_busy = any(slot_start < b_end and slot_end > b_start for b_start, b_end in busy_intervals)
-            time_range = f"{slot_start.strftime('%I:%M %p')} to {slot_end.strftime('%I:%M %p')}"
-            label = "🔴 Booked" if is_busy else "🟢 Free"
-            slots.append(f"{label} - {time_range}")
-
-        # 🧾 Format 2-column string
-        slot_lines = []
-        for i in range(0, len(slots), 2):
-            left = slots[i]
-            right = slots[i+1] if i+1 < len(slots) else ""
-            slot_lines.append(f"{left:<30} {right}")
-
-        # ✅ Final message (title and CTA outside code block)
-        title = f"📅 **Availability on {date}:**"
-        code_block = "```\n" + "\n".join(slot_lines) + "\n```"
-        cta = "💬 _Would you like me to book one of these?_"
-
-        return f"{title}\n\n{code_block}\n\n{cta}"
+        duration = parse(event['end']['dateTime']) - parse(event['start']['dateTime'])
+        return duration if duration > timedelta(0) else timedelta(minutes=30)
+    except (KeyError, ValueError):
+        return timedelta(minutes=30)
+
+def _duration_label(minutes: int) -> str:
+    if minutes % 60 == 0:
+        hours = minutes // 60
+        return f"{hours}-hour" if hours > 1 else "1-hour"
+    return f"{minutes}-minute"
+
+def _format_meeting_options(duration_minutes: int, candidates, attendees=None, preference=None) -> str:
+    label = _duration_label(duration_minutes)
+    if not candidates:
+        when = f" in the {preference}" if preference else ""
+        return f"😕 I couldn't find a free {label} slot{when} in that range. Try a longer horizon or a shorter meeting."
+
+    title = f"🔎 **Best times for a {label} meeting**"
+    if attendees:
+        title += f" (you + {', '.join(attendees)})"
+    lines = [
+        f"{i}. {start.strftime('%a %Y-%m-%d')} · {start.strftime('%I:%M %p')} to {end.strftime('%I:%M %p')}"
+        for i, (start, end) in enumerate(candidates, 1)
+    ]
+    first = candidates[0][0]
+    cta = f"💬 _Say e.g. 'book a {label} meeting on {first.strftime('%Y-%m-%d')} at {first.strftime('%I:%M %p')}' to lock one in._"
+    return f"{title}:\n\n" + "\n".join(lines) + f"\n\n{cta}"
+
+def _nearest_event(matching_events):
+    # 🔍 Pick the one with nearest start time
+    return sorted(matching_events, key=lambda e: e['start']['dateTime'])[0]
+
+def _reschedule_confirmation(title: str, start_time: datetime, end_time: datetime) -> str:
+    result = (
+        f"🔁 Meeting rescheduled:\n\n"
+        f"**{title}**\n"
+        f"🗓️ New Date: {start_time.strftime('%Y-%m-%d')}\n"
+        f"⏰ Time: {start_time.strftime('%I:%M %p')} to {end_time.strftime('%I:%M %p')}"
+    )
+    return result.strip() or "✅ Meeting rescheduled successfully."
+
+# 🛠️ Tool: Check availability (optionally common to several attendees)
+def check_availability(date: str, attendees: str = None) -> str:
+    try:
+        log.info("[TOOL:check_availability] Checking slots for date: %s, attendees: %s", date, attendees)
+        current_context().update_date(date)
+        attendees = _parse_attendees(attendees)
+
+        # 📅 Build 30-min slots (events fetched once, busy times indexed)
+        return _format_availability(date, get_day_slots(date, "Asia/Kolkata", calendar_ids=attendees), attendees)
 
     except Exception as e:
-        print(f"[ERROR:check_availability] {str(e)}")
+        log.error("check_availability failed: %s", e)
         return f"❌ Failed to check availability for {date}: {e}"
 
 # 🛠️ Tool: Book a meeting
@@ -101,209 +295,305 @@ def book_meeting(
     time: str,
     date: str = None,
     summary: str = "Meeting",
-    description: str = "Booked via Assistant"
+    description: str = "Booked via Assistant",
+    duration_minutes: int = 30
 ) -> str:
     try:
-        print(f"[TOOL:book_meeting] Booking meeting with time='{time}', date='{date}'")
-        if not date:
-            date = chat_context.get_last_date()
-            if not date:
-                return "❌ Please provide a date to book the meeting."
-
-        dt = parse_date(f"{date} {time}", settings={"PREFER_DATES_FROM": "future"})
-        if not dt:
-            return f"❌ Could not understand the time '{time}' for date '{date}'."
-
-        # ✅ Ensure timezone-aware datetime in IST
-        tz = pytz.timezone("Asia/Kolkata")
-        if dt.tzinfo is None:
-            start_time = tz.localize(dt)
-        else:
-            start_time = dt.astimezone(tz)
-
-        end_time = start_time + timedelta(minutes=30)
+        log.info("[TOOL:book_meeting] Booking meeting with time=%r, date=%r, duration=%sm", time, date, duration_minutes)
+        start_time, end_time = _booking_window(time, date, int(duration_minutes))
 
         # 🗓 Book the meeting
-        book_slot(
-            start={
-                "dateTime": start_time.isoformat(),
-                "timeZone": "Asia/Kolkata"
-            },
-            end={
-                "dateTime": end_time.isoformat(),
-                "timeZone": "Asia/Kolkata"
-            },
-            summary=summary,
-            description=description,
-        )
+        start, end = _slot_bounds(start_time, end_time)
+        book_slot(start=start, end=end, summary=summary, description=description)
 
-        confirmation = f"✅ Booking confirmed: **{summary}** from {start_time.strftime('%Y-%m-%d %I:%M %p')} to {end_time.strftime('%I:%M %p')}"
-        return confirmation if confirmation.strip() else "✅ Meeting booked successfully."
+        return _booking_confirmation(summary, start_time, end_time)
 
+    except ToolInputError as e:
+        return str(e)
+    except SlotUnavailableError as e:
+        return f"⚠️ {e}"
     except Exception as e:
-        print(f"[ERROR:book_meeting] {str(e)}")
+        log.error("book_meeting failed: %s", e)
         return f"❌ Failed to book meeting: {str(e)}"
 
 # Reschedule meeting
-from calendar_utils import find_events_by_title, delete_event_by_id, book_slot
-import pytz
-from datetime import datetime, timedelta
-from dateparser import parse as parse_date
+from calendar_utils import match_events_by_title, move_event, title_confirmation
+from title_index import is_unambiguous
 
 def reschedule_meeting(title: str, new_date: str, new_time: str) -> str:
     try:
-        print(f"[TOOL:reschedule_meeting] Rescheduling '{title}' to {new_date} at {new_time}")
+        log.info("[TOOL:reschedule_meeting] Rescheduling %r to %s at %s", title, new_date, new_time)
 
-        # 1. 🗑️ Find matching event
-        matching_events = find_events_by_title(title)
+        if not title.strip():
+            return "❌ Please provide a valid title for the meeting to reschedule."
+
+        # 1. 🔍 Find matching event
+        tier, matching_events = match_events_by_title(title)
         if not matching_events:
-            print(f"[DEBUG] No matching event found with title '{title}' to delete.")
-        else:
-            # 🔍 Pick the one with nearest start time
-            event_to_delete = sorted(matching_events, key=lambda e: e['start']['dateTime'])[0]
-            event_id = event_to_delete['id']
-            print(f"[DEBUG] Deleting event ID={event_id}, start={event_to_delete['start']['dateTime']}")
-            delete_event_by_id(event_id)
+            return f"❌ No meeting found with title '{title}' to reschedule."
+        if not is_unambiguous(title, tier, matching_events):
+            return title_confirmation(title, matching_events, "reschedule")
+        event_to_move = _nearest_event(matching_events)
 
         # 2. 🕒 Parse new datetime
-        dt = parse_date(f"{new_date} {new_time}", settings={"PREFER_DATES_FROM": "future"})
-        if not dt:
-            return f"❌ Could not parse new date/time for '{title}'"
+        start_time, end_time = _reschedule_window(new_date, new_time, _event_duration(event_to_move))
 
-        tz = pytz.timezone("Asia/Kolkata")
-        start_time = tz.localize(dt)
-        end_time = start_time + timedelta(minutes=30)
-
-        # 3. 📅 Book the rescheduled event
-        book_slot(
-            start={
-                "dateTime": start_time.isoformat(),
-                "timeZone": "Asia/Kolkata"
-            },
-            end={
-                "dateTime": end_time.isoformat(),
-                "timeZone": "Asia/Kolkata"
-            },
-            summary=title,
-            description=f"Rescheduled via Assistant on {datetime.now().strftime('%Y-%m-%d')}"
-        )
+        # 3. 📅 Move the event in place (one PATCH instead of delete + insert)
+        log.debug("Moving event ID=%s, start=%s", event_to_move["id"], event_to_move["start"]["dateTime"])
+        move_event(event_to_move['id'], start_time, end_time, "Asia/Kolkata", old_event=event_to_move)
 
-        result = f"✅ Rescheduled **{title}** to {start_time.strftime('%Y-%m-%d %I:%M %p')} – {end_time.strftime('%I:%M %p')}"
-        return result if result.strip() else "✅ Meeting rescheduled."
+        return _reschedule_confirmation(event_to_move.get("summary", title), start_time, end_time)
 
+    except ToolInputError as e:
+        return str(e)
+    except SlotUnavailableError as e:
+        return f"⚠️ {e}"
     except Exception as e:
-        print(f"[ERROR:reschedule_meeting] {e}")
+        log.error("reschedule_meeting failed: %s", e)
         return f"❌ Failed to reschedule meeting: {e}"
 
-# Reschedule meeting
-from calendar_utils import find_events_by_title, delete_event_by_id, book_slot
-import pytz
-from datetime import datetime, timedelta
-from dateparser import parse as parse_date
+# 🔎 Tool: Find the best times for a meeting of any length
+def _meeting_search_args(duration_minutes, start_date, days, preference, attendees):
+    preference = (preference or "").strip().lower() or None
+    if preference and preference not in TIME_BLOCKS:
+        raise ToolInputError(f"❌ Unknown time of day '{preference}'. Use morning, afternoon, evening or night.")
+    duration_minutes = int(duration_minutes)
+    if not 5 <= duration_minutes <= 8 * 60:
+        raise ToolInputError("❌ Meetings can be between 5 minutes and 8 hours long.")
+    return {
+        "duration_minutes": duration_minutes,
+        "start_date": start_date,
+        "days": int(days or MEETING_SEARCH_HORIZON_DAYS),
+        "preference": TIME_BLOCKS.get(preference),
+        "count": MEETING_SEARCH_RESULTS,
+        "calendar_ids": _parse_attendees(attendees),
+    }, preference
+
+def find_meeting_time(
+    duration_minutes: int = 30,
+    start_date: str = None,
+    days: int = None,
+    preference: str = None,
+    attendees: str = None
+) -> str:
+    try:
+        log.info("[TOOL:find_meeting_time] %sm from %s over %s days, preference=%s", duration_minutes, start_date or "today", days, preference)
+        args, preference = _meeting_search_args(duration_minutes, start_date, days, preference, attendees)
+        candidates = find_meeting_slots(**args, timezone="Asia/Kolkata")
+        return _format_meeting_options(args["duration_minutes"], candidates, args["calendar_ids"], preference)
 
-def reschedule_meeting(title: str, new_date: str, new_time: str) -> str:
+    except ToolInputError as e:
+        return str(e)
+    except Exception as e:
+        log.error("find_meeting_time failed: %s", e)
+        return f"❌ Failed to search for a meeting time: {e}"
+
+# ------------------------------
+# ⚡ Async tools (non-blocking calendar I/O for the FastAPI backend)
+# ------------------------------
+async def check_availability_async(date: str, attendees: str = None) -> str:
+    try:
+        log.info("[TOOL:check_availability_async] Checking slots for date: %s, attendees: %s", date, attendees)
+        current_context().update_date(date)
+        attendees = _parse_attendees(attendees)
+        day_slots = await async_calendar.get_day_slots(date, "Asia/Kolkata", calendar_ids=attendees)
+        return _format_availability(date, day_slots, attendees)
+
+    except Exception as e:
+        log.error("check_availability_async failed: %s", e)
+        return f"❌ Failed to check availability for {date}: {e}"
+
+async def book_meeting_async(
+    time: str,
+    date: str = None,
+    summary: str = "Meeting",
+    description: str = "Booked via Assistant",
+    duration_minutes: int = 30
+) -> str:
     try:
-        print(f"[TOOL:reschedule_meeting] Rescheduling '{title}' to {new_date} at {new_time}")
+        log.info("[TOOL:book_meeting_async] Booking meeting with time=%r, date=%r, duration=%sm", time, date, duration_minutes)
+        start_time, end_time = _booking_window(time, date, int(duration_minutes))
+        start, end = _slot_bounds(start_time, end_time)
+        await async_calendar.book_slot(start=start, end=end, summary=summary, description=description)
+        return _booking_confirmation(summary, start_time, end_time)
+
+    except ToolInputError as e:
+        return str(e)
+    except SlotUnavailableError as e:
+        return f"⚠️ {e}"
+    except Exception as e:
+        log.error("book_meeting_async failed: %s", e)
+        return f"❌ Failed to book meeting: {str(e)}"
 
+async def reschedule_meeting_async(title: str, new_date: str, new_time: str) -> str:
+    try:
+        log.info("[TOOL:reschedule_meeting_async] Rescheduling %r to %s at %s", title, new_date, new_time)
         if not title.strip():
             return "❌ Please provide a valid title for the meeting to reschedule."
 
-        # 1. 🗑️ Find matching event
-        matching_events = find_events_by_title(title)
+        tier, matching_events = await async_calendar.match_events_by_title(title)
         if not matching_events:
             return f"❌ No meeting found with title '{title}' to reschedule."
-
-        # 🔍 Pick the one with nearest start time
-        event_to_delete = sorted(matching_events, key=lambda e: e['start']['dateTime'])[0]
-        event_id = event_to_delete['id']
-        print(f"[DEBUG] Deleting event ID={event_id}, start={event_to_delete['start']['dateTime']}")
-        delete_event_by_id(event_id)
-
-        # 2. 🕒 Parse new datetime
-        dt = parse_date(f"{new_date} {new_time}", settings={"PREFER_DATES_FROM": "future"})
-        if not dt:
-            return f"❌ Could not understand the new date/time: '{new_date} {new_time}'"
-
-        tz = pytz.timezone("Asia/Kolkata")
-        start_time = tz.localize(dt)
-        end_time = start_time + timedelta(minutes=30)
-
-        # 3. 📅 Book the rescheduled event
-        book_slot(
-            start={
-                "dateTime": start_time.isoformat(),
-                "timeZone": "Asia/Kolkata"
-            },
-            end={
-                "dateTime": end_time.isoformat(),
-                "timeZone": "Asia/Kolkata"
-            },
-            summary=title,
-            description=f"Rescheduled via Assistant on {datetime.now().strftime('%Y-%m-%d')}"
-        )
-
-        result = (
-            f"🔁 Meeting rescheduled:\n\n"
-            f"**{title}**\n"
-            f"🗓️ New Date: {start_time.strftime('%Y-%m-%d')}\n"
-            f"⏰ Time: {start_time.strftime('%I:%M %p')} to {end_time.strftime('%I:%M %p')}"
-        )
-        return result.strip() or "✅ Meeting rescheduled successfully."
-
+        if not is_unambiguous(title, tier, matching_events):
+            return title_confirmation(title, matching_events, "reschedule")
+        event_to_move = _nearest_event(matching_events)
+
+        start_time, end_time = _reschedule_window(new_date, new_time, _event_duration(event_to_move))
+        await async_calendar.move_event(event_to_move['id'], start_time, end_time, "Asia/Kolkata", old_event=event_to_move)
+        return _reschedule_confirmation(event_to_move.get("summary", title), start_time, end_time)
+
+    except ToolInputError as e:
+        return str(e)
+    except SlotUnavailableError as e:
+        return f"⚠️ {e}"
     except Exception as e:
-        print(f"[ERROR:reschedule_meeting] {e}")
+        log.error("reschedule_meeting_async failed: %s", e)
         return f"❌ Failed to reschedule meeting: {e}"
-    
-tools = [
-    Tool.from_function(
-        func=check_availability,
-        name="CheckAvailability",
-        description="Use this tool to check available 30-minute meeting slots for a given date (format: YYYY-MM-DD)."
-    ),
-    Tool.from_function(
-        func=book_meeting,
-        name="BookMeeting",
-        description="Use this tool to book a 30-minute meeting. You must provide: time (e.g., '2 PM'), date (YYYY-MM-DD), and title (e.g., 'Project Update')."
-    ),
-    Tool.from_function(
-        func=reschedule_meeting,
-        name="RescheduleMeeting",
-        description="Use this to reschedule an existing meeting. Provide the meeting title, new date (YYYY-MM-DD), and new time (e.g., '3 PM')."
-    ),
-    Tool.from_function(
-        func=delete_event,
-        name="DeleteMeeting",
-        description="Use this to delete a meeting. Provide both the title and date (YYYY-MM-DD) of the meeting."
-    )
-]
-
-llm = get_llm()
-
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-
-agent_executor = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.OPENAI_FUNCTIONS,
-    memory=ConversationBufferMemory(
-        memory_key="chat_history",
-        input_key="input",
-        output_key="output",
-        return_messages=True
-    ),
-    handle_parsing_errors=True,
-    return_intermediate_steps=True,  # Keep if you want tool output logs
-    verbose=True
-)
 
+async def find_meeting_time_async(
+    duration_minutes: int = 30,
+    start_date: str = None,
+    days: int = None,
+    preference: str = None,
+    attendees: str = None
+) -> str:
+    try:
+        log.info("[TOOL:find_meeting_time_async] %sm from %s over %s days, preference=%s", duration_minutes, start_date or "today", days, preference)
+        args, preference = _meeting_search_args(duration_minutes, start_date, days, preference, attendees)
+        candidates = await async_calendar.find_meeting_slots(**args, timezone="Asia/Kolkata")
+        return _format_meeting_options(args["duration_minutes"], candidates, args["calendar_ids"], preference)
 
-def run_with_agent(user_input: str) -> str:
-    result = agent_executor.invoke({"input": user_input})
+    except ToolInputError as e:
+        return str(e)
+    except Exception as e:
+        log.error("find_meeting_time_async failed: %s", e)
+        return f"❌ Failed to search for a meeting time: {e}"
+
+# 🧭 Tool calls chosen by the manual router, run by either the sync or async path
+ToolCall = namedtuple("ToolCall", ["name", "kwargs"])
+
+SYNC_TOOLS = {
+    "check_availability": check_availability,
+    "book_meeting": book_meeting,
+    "reschedule_meeting": reschedule_meeting,
+    "delete_event": delete_event,
+    "find_meeting_time": find_meeting_time,
+}
+
+ASYNC_TOOLS = {
+    "check_availability": check_availability_async,
+    "book_meeting": book_meeting_async,
+    "reschedule_meeting": reschedule_meeting_async,
+    "delete_event": async_calendar.delete_event,
+    "find_meeting_time": find_meeting_time_async,
+}
+
+# 🦥 LangChain, the Gemini client and the executor are only loaded when an LLM turn actually runs
+_agent_executor = None
+_agent_executor_lock = threading.Lock()
+
+def _build_agent_executor():
+    from langchain.agents import initialize_agent, Tool
+    from langchain_core.tools import StructuredTool
+    from langchain.agents.agent_types import AgentType
+    from langchain_core.prompts import MessagesPlaceholder
+    from llm_setup import get_llm
+
+    tools = [
+        # Structured so the LLM can pass attendees as well as the date
+        StructuredTool.from_function(
+            func=check_availability,
+            name="CheckAvailability",
+            description="Use this tool to check available 30-minute meeting slots for a given date (format: YYYY-MM-DD). Optionally pass attendees as comma-separated emails to find slots free for everyone."
+        ),
+        StructuredTool.from_function(
+            func=book_meeting,
+            name="BookMeeting",
+            description="Use this tool to book a meeting. You must provide: time (e.g., '2 PM'), date (YYYY-MM-DD), and summary, the meeting title (e.g., 'Project Update'). Optionally pass duration_minutes as a whole number (default 30)."
+        ),
+        Tool.from_function(
+            func=reschedule_meeting,
+            name="RescheduleMeeting",
+            description="Use this to reschedule an existing meeting. Provide the meeting title, new date (YYYY-MM-DD), and new time (e.g., '3 PM')."
+        ),
+        Tool.from_function(
+            func=delete_event,
+            name="DeleteMeeting",
+            description="Use this to delete a meeting. Provide both the title and date (YYYY-MM-DD) of the meeting."
+        ),
+        StructuredTool.from_function(
+            func=find_meeting_time,
+            name="FindMeetingTime",
+            description="Use this when the user wants a meeting of some length 'sometime' rather than at a fixed time. Provide duration_minutes as a whole number (e.g. 90); optionally start_date (YYYY-MM-DD), days to search as a whole number, preference (morning/afternoon/evening/night) and attendees as comma-separated emails. Returns the best candidate slots."
+        )
+    ]
+
+    return initialize_agent(
+        tools=tools,
+        llm=get_llm(),
+        agent=AgentType.OPENAI_FUNCTIONS,
+        # No executor-wide memory: the executor is shared, so each turn passes its own session's history
+        agent_kwargs={"extra_prompt_messages": [MessagesPlaceholder(variable_name="chat_history")]},
+        handle_parsing_errors=True,
+        return_intermediate_steps=True,  # Keep if you want tool output logs
+        verbose=True
+    )
 
+# ✅ Exportable getter; builds the executor on first use
+def get_agent_executor():
+    global _agent_executor
+    if _agent_executor is None:
+        with _agent_executor_lock:
+            if _agent_executor is None:
+                _agent_executor = _build_agent_executor()
+    return _agent_executor
+
+
+# 🧠 LLM chat history lives in the session, so one chat's turns never reach another's prompt
+def _agent_inputs(user_input: str) -> dict:
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    history = []
+    for human, assistant in current_context().llm_history or []:
+        history += [HumanMessage(content=human), AIMessage(content=assistant)]
+    return {"input": user_input, "chat_history": history}
+
+def _remember_turn(user_input: str, reply: str):
+    context = current_context()
+    context.llm_history = ((context.llm_history or []) + [[user_input, reply]])[-LLM_HISTORY_MAX_TURNS:]
+
+def run_with_agent(user_input: str, session_id: str = None) -> str:
+    with session_scope(session_id):
+        with span("llm_call"):
+            result = get_agent_executor().invoke(_agent_inputs(user_input))
+        reply = _agent_reply(result)
+        _remember_turn(user_input, reply)
+    return reply
+
+# 📡 Same agent turn, reporting LLM tokens and tool results as they happen
+async def astream_with_agent(user_input: str, session_id: str = None) -> str:
+    executor = await asyncio.to_thread(get_agent_executor)
+    result = {}
+    with session_scope(session_id), span("llm_call", streamed=True):
+        async for event in executor.astream_events(_agent_inputs(user_input), version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                token = event["data"]["chunk"].content
+                if token:
+                    emit("token", text=token)
+            elif kind == "on_tool_end":
+                emit("tool_output", tool=event["name"], output=str(event["data"].get("output")))
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                result = event["data"].get("output") or {}
+        reply = _agent_reply(result)
+        _remember_turn(user_input, reply)
+    return reply
+
+def _agent_reply(result) -> str:
     tool_output = None
     if "intermediate_steps" in result and result["intermediate_steps"]:
         tool_output = result["intermediate_steps"][-1][1]
-        print(f"[DEBUG] Tool output: {tool_output}")
+        log.debug("Tool output: %s", tool_output)
 
     final_output = result.get("output", None)
 
@@ -316,19 +606,246 @@ def run_with_agent(user_input: str) -> str:
     else:
         return "⚠️ Assistant could not generate a valid response."
 
-# ✅ Exportable getter for FastAPI global agent
-def get_agent_executor():
-    return agent_executor
-
-from dateparser import parse as parse_date
-from dateparser.search import search_dates
-import re
+from intent_router import (
+    classify, WEEKDAYS, TIME_BLOCKS, QUOTED_TITLE, RESCHEDULE_TITLE, RESCHEDULE_TITLE_SHORT, DELETE_TITLE,
+    TO_CLAUSE, FROM_ON_CLAUSE, DAY_MONTH, LEADING_DAY_NUMBER, DATE_TOKEN_HINT, ISO_DATE, TIME_OF_DAY, EMAIL,
+    DURATION, WEEK_HORIZON
+)
 
 # 🔁 Main routing logic (manual agent)
-def run_agent(user_input: str) -> str:
-    print(f"📥 Received message: {user_input}")
+def run_agent(user_input: str, session_id: str = None) -> str:
+    with session_scope(session_id):
+        routed = route_message(user_input)
+        if isinstance(routed, ToolCall):
+            return SYNC_TOOLS[routed.name](**routed.kwargs)
+        return routed
+
+# ⚡ Same routing, with calendar I/O awaited instead of blocking a thread
+async def run_agent_async(user_input: str, session_id: str = None) -> str:
+    with session_scope(session_id):
+        # Routing may fall back to dateparser (milliseconds of CPU); keep it off the event loop.
+        # to_thread copies the context, so the session and trace spans carry over
+        routed = await asyncio.to_thread(route_message, user_input)
+        if isinstance(routed, ToolCall):
+            return await ASYNC_TOOLS[routed.name](**routed.kwargs)
+        return routed
+
+# ------------------------------
+# 🔀 Hybrid dispatch: manual router when it's sure, LLM agent otherwise
+# ------------------------------
+ACTION_INTENTS = {"availability", "booking", "reschedule", "delete"}
+
+def score_route(user_input: str, routed, was_pending: bool) -> float:
+    """How much to trust the manual router's answer for this message (0..1)."""
+    if isinstance(routed, ToolCall):
+        return 0.95
+    if was_pending:
+        # Mid multi-turn flow: the manual router owns the conversation state
+        return 0.9
+    if routed.startswith("Sorry, I didn't"):
+        return 0.1
+
+    intents = classify(user_input.lower())
+    if intents & {"greeting", "help"} and not intents & ACTION_INTENTS:
+        return 0.9
+    if routed.startswith("❌"):
+        return 0.3
+    # A follow-up question about a recognised action is fine; anything else is a guess
+    return 0.7 if intents & ACTION_INTENTS else 0.4
+
+class RouteStats:
+    """Which path served each /agent request, and how long it took."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._latencies = {}
+        self._window = window
+
+    def record(self, path: str, seconds: float, confidence: float):
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            self._latencies.setdefault(path, deque(maxlen=self._window)).append(seconds * 1000)
+        log.debug("[ROUTER] path=%s confidence=%.2f latency=%.1fms", path, confidence, seconds * 1000)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self._counts.values())
+            paths = {}
+            for path, count in self._counts.items():
+                latencies = sorted(self._latencies[path])
+                paths[path] = {
+                    "count": count,
+                    "p50_ms": round(latencies[len(latencies) // 2], 1),
+                    "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+                    "max_ms": round(latencies[-1], 1),
+                }
+            llm = sum(c for p, c in self._counts.items() if p.startswith("llm"))
+            return {
+                "mode": AGENT_ROUTER,
+                "threshold": HYBRID_CONFIDENCE_THRESHOLD,
+                "requests": total,
+                "llm_share": round(llm / total, 4) if total else 0.0,
+                "paths": paths,
+            }
+
+route_stats = RouteStats()
+
+def _route_with_confidence(user_input: str):
+    context = current_context()
+    snapshot = context.dumps()
+    was_pending = context.is_pending()
+    routed = route_message(user_input)
+    confidence = score_route(user_input, routed, was_pending)
+    if confidence < HYBRID_CONFIDENCE_THRESHOLD:
+        # The LLM takes this turn; undo any multi-turn state the manual router set up
+        context.restore(snapshot)
+    return routed, confidence
+
+def _run_local(routed, confidence: float) -> str:
+    if not isinstance(routed, ToolCall):
+        emit("route", path="local", confidence=confidence)
+        return routed
+    emit("route", path="local", confidence=confidence, tool=routed.name)
+    reply = SYNC_TOOLS[routed.name](**routed.kwargs)
+    emit("tool_output", tool=routed.name, output=reply)
+    return reply
+
+async def _run_local_async(routed, confidence: float) -> str:
+    if not isinstance(routed, ToolCall):
+        emit("route", path="local", confidence=confidence)
+        return routed
+    emit("route", path="local", confidence=confidence, tool=routed.name)
+    reply = await ASYNC_TOOLS[routed.name](**routed.kwargs)
+    emit("tool_output", tool=routed.name, output=reply)
+    return reply
+
+async def _llm_reply_async(user_input: str, session_id: str = None) -> str:
+    if is_streaming():
+        return await astream_with_agent(user_input, session_id)
+    # LangChain's executor and tools are synchronous; keep them off the event loop
+    return await asyncio.to_thread(run_with_agent, user_input, session_id)
+
+def run_hybrid(user_input: str, session_id: str = None) -> str:
+    start = time.perf_counter()
+    with session_scope(session_id):
+        routed, confidence = _route_with_confidence(user_input)
+        if confidence >= HYBRID_CONFIDENCE_THRESHOLD:
+            reply = _run_local(routed, confidence)
+            route_stats.record("local", time.perf_counter() - start, confidence)
+            return reply
+
+    emit("route", path="llm", confidence=confidence)
+    try:
+        reply = run_with_agent(user_input, session_id)
+        path = "llm"
+    except Exception as e:
+        log.error("LLM agent failed, answering with the manual router: %s", e)
+        reply = run_agent(user_input, session_id)
+        path = "llm_failed_local"
+    route_stats.record(path, time.perf_counter() - start, confidence)
+    return reply
+
+async def run_hybrid_async(user_input: str, session_id: str = None) -> str:
+    start = time.perf_counter()
+    with session_scope(session_id):
+        routed, confidence = await asyncio.to_thread(_route_with_confidence, user_input)
+        if confidence >= HYBRID_CONFIDENCE_THRESHOLD:
+            reply = await _run_local_async(routed, confidence)
+            route_stats.record("local", time.perf_counter() - start, confidence)
+            return reply
+
+    emit("route", path="llm", confidence=confidence)
+    try:
+        reply = await _llm_reply_async(user_input, session_id)
+        path = "llm"
+    except Exception as e:
+        log.error("LLM agent failed, answering with the manual router: %s", e)
+        reply = await run_agent_async(user_input, session_id)
+        path = "llm_failed_local"
+    route_stats.record(path, time.perf_counter() - start, confidence)
+    return reply
+
+# 🎛️ Entry point for /agent, honouring AGENT_ROUTER
+async def respond_async(user_input: str, session_id: str = None) -> str:
+    if AGENT_ROUTER == "manual":
+        return await run_agent_async(user_input, session_id)
+    if AGENT_ROUTER == "llm":
+        return await _llm_reply_async(user_input, session_id)
+    return await run_hybrid_async(user_input, session_id)
+
+_background_turns = set()
+
+# 📡 One /agent turn as a stream of (event, data); always ends with ("final", {...})
+async def stream_agent(user_input: str, session_id: str = None):
+    queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def sink(event, data):
+        # Tools may emit from worker threads
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    async def run_turn():
+        revision = calendar_utils.calendar_revision
+        with event_sink(sink):
+            try:
+                reply = await respond_async(user_input, session_id)
+            except Exception as e:
+                log.exception("Error in streamed turn: %s", e)
+                emit("error", message=str(e))
+                reply = f"❌ Server error: {e}"
+            # Tells the UI to refresh its today view without guessing from the reply text
+            emit("final", response=reply, calendar_changed=calendar_utils.calendar_revision != revision)
+
+    # A client that disconnects mid-turn doesn't cancel a booking halfway through
+    task = asyncio.create_task(run_turn())
+    _background_turns.add(task)
+    task.add_done_callback(_background_turns.discard)
+
+    while True:
+        event, data = await queue.get()
+        yield event, data
+        if event == "final":
+            return
+
+# ⏱️ Meeting length and search range mentioned in a message
+def _parse_duration(text: str):
+    """Minutes in the first duration phrase ("90 minutes", "1.5 hours", "half an hour"), or None."""
+    match = DURATION.search(text)
+    if not match:
+        return None
+    amount, unit = match.group(1).lower(), match.group(2).lower()
+    value = 0.5 if amount.startswith("half") else 1 if amount in ("a", "an") else float(amount)
+    return int(round(value * 60 if unit.startswith("h") else value)) or None
+
+def _search_horizon(user_input_lower: str, parsed_dates):
+    """(start_date, days) to search: this / next week, the one day mentioned, or the default horizon."""
+    today = datetime.now(pytz.timezone("Asia/Kolkata")).date()
+    week = WEEK_HORIZON.search(user_input_lower)
+    if week:
+        if week.group(1) == "this":
+            return today.strftime("%Y-%m-%d"), 7 - today.weekday()
+        return (today + timedelta(days=7 - today.weekday())).strftime("%Y-%m-%d"), 7
+    if parsed_dates:
+        return parsed_dates[0][1].strftime("%Y-%m-%d"), 1
+    return None, MEETING_SEARCH_HORIZON_DAYS
+
+@traced("intent_routing")
+def route_message(user_input: str):
+    """
+    Decide what to do with a message and update the chat context.
+    Returns either a reply string or a ToolCall for the caller to run.
+    """
+    log.debug("Routing message: %s", user_input)
+    chat_context = current_context()
     settings = {"PREFER_DATES_FROM": "future"}
     user_input_lower = user_input.lower()
+    # 🧭 Every keyword intent in the message, found in one pass
+    intents = classify(user_input_lower)
+    emit("intent", intents=sorted(intents))
+    # "90 minutes" would otherwise be read as a time 90 minutes from now
+    duration = _parse_duration(user_input_lower)
+    date_text = DURATION.sub(" ", user_input) if duration else user_input
 
     # 🔁 Step 1: Awaiting reschedule title
     if getattr(chat_context, "pending_reschedule", False) and not getattr(chat_context, "pending_reschedule_title", None):
@@ -338,7 +855,7 @@ def run_agent(user_input: str) -> str:
     # 🔁 Step 2: Awaiting reschedule date/time
     if getattr(chat_context, "pending_reschedule", False) and getattr(chat_context, "pending_reschedule_title", None):
         try:
-            parsed = parse_date(user_input, settings=settings)
+            parsed = resolve_date(user_input, settings)
             if not parsed:
                 return "❌ Please provide a valid date and time like 'tomorrow at 3 PM'."
 
@@ -346,27 +863,22 @@ def run_agent(user_input: str) -> str:
             chat_context.pending_reschedule = False
             chat_context.pending_reschedule_title = None
 
-            return reschedule_meeting(
-                title,
-                parsed.strftime("%Y-%m-%d"),
-                parsed.strftime("%I:%M %p")
-            )
+            return ToolCall("reschedule_meeting", {
+                "title": title,
+                "new_date": parsed.strftime("%Y-%m-%d"),
+                "new_time": parsed.strftime("%I:%M %p")
+            })
         except Exception as e:
-            print(f"[ERROR] Parsing failed during reschedule flow: {e}")
+            log.error("Parsing failed during reschedule flow: %s", e)
             return "❌ Couldn't parse the new time. Try something like 'next Friday at 11 AM'."
 
     # 🔁 Reschedule (multi-turn)
-    if any(kw in user_input_lower for kw in [
-        "reschedule", "change", "postpone", "move",
-        "shift", "delay", "update", "edit", "modify",
-        "adjust", "rearrange", "push back", "bring forward",
-        "change the time", "resched"
-    ]):
-        title_match = re.search(r"['\"](.+?)['\"]", user_input) or re.search(r"(?:reschedule|change)\s+(.*?)\s+to", user_input_lower)
+    if "reschedule" in intents:
+        title_match = QUOTED_TITLE.search(user_input) or RESCHEDULE_TITLE.search(user_input_lower)
         if title_match:
             title = title_match.group(1).strip()
-            to_match = re.search(r"\bto\s+(.+)", user_input_lower)
-            new_dt = parse_date(to_match.group(1), settings=settings) if to_match else None
+            to_match = TO_CLAUSE.search(user_input_lower)
+            new_dt = resolve_date(to_match.group(1), settings) if to_match else None
 
             if not new_dt:
                 # Partial input — enter multi-turn mode
@@ -374,11 +886,11 @@ def run_agent(user_input: str) -> str:
                 chat_context.pending_reschedule_title = title
                 return "📅 What new date and time should I reschedule it to?"
 
-            return reschedule_meeting(
-                title,
-                new_dt.strftime("%Y-%m-%d"),
-                new_dt.strftime("%I:%M %p")
-            )
+            return ToolCall("reschedule_meeting", {
+                "title": title,
+                "new_date": new_dt.strftime("%Y-%m-%d"),
+                "new_time": new_dt.strftime("%I:%M %p")
+            })
         else:
             # Start multi-turn flow
             chat_context.pending_reschedule = True
@@ -393,7 +905,7 @@ def run_agent(user_input: str) -> str:
     # 🗑 Step 2: Awaiting delete date
     if getattr(chat_context, "pending_delete", False) and getattr(chat_context, "pending_delete_title", None):
         try:
-            parsed = parse_date(user_input, settings=settings)
+            parsed = resolve_date(user_input, settings)
             if not parsed:
                 return "❌ I couldn't understand the date. Try something like 'tomorrow' or 'July 10'."
 
@@ -401,23 +913,23 @@ def run_agent(user_input: str) -> str:
             chat_context.pending_delete = False
             chat_context.pending_delete_title = None
 
-            from calendar_utils import delete_event
-            return delete_event(title, parsed.strftime("%Y-%m-%d"))
+            return ToolCall("delete_event", {"title": title, "date": parsed.strftime("%Y-%m-%d")})
         except Exception as e:
-            print(f"[ERROR] Parsing failed during delete flow: {e}")
+            log.error("Parsing failed during delete flow: %s", e)
             return "❌ Couldn't parse the date. Try something like 'July 10'."
 
     # 🗓 Step 1: Awaiting time
     if chat_context.pending_booking and chat_context.pending_booking.get("awaiting_time"):
         time_input = user_input.strip()
         date_str = chat_context.pending_booking["date"]
-        combined_dt = parse_date(f"{date_str} {time_input}", settings=settings)
+        combined_dt = resolve_date(f"{date_str} {time_input}", settings)
         if combined_dt:
             chat_context.pending_booking = {
                 "time": combined_dt.strftime("%I:%M %p"),
-                "date": date_str
+                "date": date_str,
+                "duration_minutes": chat_context.pending_booking.get("duration_minutes", 30)
             }
-            print(f"[DEBUG] Time parsed for pending booking: {combined_dt}")
+            log.debug("Time parsed for pending booking: %s", combined_dt)
             return "📝 What should I title the event?"
         else:
             return "❌ I couldn't understand that time."
@@ -427,79 +939,75 @@ def run_agent(user_input: str) -> str:
         pending = chat_context.pending_booking
         chat_context.pending_booking = None
         chat_context.last_date = None
-        print(f"[DEBUG] Booking final with title: {user_input.strip()}, date={pending['date']}, time={pending['time']}")
-        return book_meeting(
-            time=pending["time"],
-            date=pending["date"],
-            summary=user_input.strip()
-        )
+        log.debug("Booking final with title: %s, date=%s, time=%s", user_input.strip(), pending["date"], pending["time"])
+        return ToolCall("book_meeting", {
+            "time": pending["time"],
+            "date": pending["date"],
+            "summary": user_input.strip(),
+            "duration_minutes": pending.get("duration_minutes", 30)
+        })
 
     # 🧠 Step 3: Date/time parsing
     parsed_dates = []
 
     # Manual: "8 July"
-    manual_match = re.search(
-        r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(january|february|march|april|may|june|july|august|september|october|november|december)\b",
-        user_input_lower
-    )
+    manual_match = DAY_MONTH.search(user_input_lower)
     if manual_match:
         day = manual_match.group(1)
         month = manual_match.group(2)
         try:
             forced_date = datetime.strptime(f"{day} {month} {datetime.now().year}", "%d %B %Y")
             parsed_dates = [(f"{day} {month}", forced_date)]
-            print(f"[DEBUG] Manually forced date parsing: {forced_date}")
+            log.debug("Manually forced date parsing: %s", forced_date)
 
             # ✅ Enhancement: allow search_dates to extract more complete datetime like "8 July at 2 PM"
             try:
-                parsed_dates_raw = search_dates(user_input, settings=settings)
+                parsed_dates_raw = search_date_mentions(date_text, settings)
                 if parsed_dates_raw:
                     for txt, dt in parsed_dates_raw:
                         if dt.date() == forced_date.date() and (dt.hour != 0 or dt.minute != 0):
                             parsed_dates = [(txt, dt)]
-                            print(f"[DEBUG] Overriding with datetime from search_dates: {dt}")
+                            log.debug("Overriding with datetime from search_dates: %s", dt)
             except Exception as e:
-                print(f"[ERROR] Fallback search_dates failed: {e}")
+                log.error("Fallback search_dates failed: %s", e)
 
         except Exception as e:
-            print(f"[DEBUG] Manual date parsing failed: {e}")
+            log.debug("Manual date parsing failed: %s", e)
 
     # General parsing
     if not parsed_dates:
         try:
-            parsed_dates_raw = search_dates(user_input, settings=settings)
+            parsed_dates_raw = search_date_mentions(date_text, settings)
             parsed_dates = list(parsed_dates_raw) if parsed_dates_raw else []
         except Exception as e:
-            print(f"[ERROR] search_dates() failed: {e}")
+            log.error("search_dates() failed: %s", e)
 
         parsed_dates = [
             (text, dt)
             for (text, dt) in parsed_dates
-            if re.match(r"\d{1,2}", text) or re.search(
-                r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|today|july|august|am|pm)\b",
-                text.lower()
-            )
+            if LEADING_DAY_NUMBER.match(text) or DATE_TOKEN_HINT.search(text.lower())
         ]
 
     # ISO + time
-    iso_date_match = re.search(r"\b(20\d{2}-\d{2}-\d{2})\b", user_input)
-    time_match = re.search(r"\b(\d{1,2}(:\d{2})?\s*(am|pm))\b", user_input_lower)
+    iso_date_match = ISO_DATE.search(user_input)
+    time_match = TIME_OF_DAY.search(user_input_lower)
     if iso_date_match:
         iso_date = iso_date_match.group(1)
         if time_match:
-            dt = parse_date(f"{iso_date} {time_match.group(1)}", settings=settings)
+            dt = resolve_date(f"{iso_date} {time_match.group(1)}", settings)
             if dt:
                 parsed_dates = [(f"{iso_date} {time_match.group(1)}", dt)]
         else:
-            dt = parse_date(iso_date, settings=settings)
+            dt = resolve_date(iso_date, settings)
             if dt:
                 parsed_dates = [(iso_date, dt)]
 
     # Weekday fallback
     if not parsed_dates or all(dt.hour == 0 and dt.minute == 0 for _, dt in parsed_dates):
-        weekdays = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
         today = datetime.now()
-        for i, day in enumerate(weekdays):
+        for i, day in enumerate(WEEKDAYS):
+            if day not in intents:
+                continue
             if f"this {day}" in user_input_lower:
                 offset = (i - today.weekday()) % 7 or 7
                 parsed_dates = [(f"this {day}", today + timedelta(days=offset))]
@@ -508,26 +1016,20 @@ def run_agent(user_input: str) -> str:
                 offset = ((i - today.weekday()) % 7) + 7
                 parsed_dates = [(f"next {day}", today + timedelta(days=offset))]
                 break
-            elif day in user_input_lower:
+            else:
                 offset = (i - today.weekday()) % 7
                 parsed_dates = [(day, today + timedelta(days=offset))]
                 break
 
         if parsed_dates and time_match:
-            combined_dt = parse_date(f"{parsed_dates[0][1].strftime('%Y-%m-%d')} {time_match.group(1)}", settings=settings)
+            combined_dt = resolve_date(f"{parsed_dates[0][1].strftime('%Y-%m-%d')} {time_match.group(1)}", settings)
             if combined_dt:
                 parsed_dates = [(f"{parsed_dates[0][0]} {time_match.group(1)}", combined_dt)]
 
     # Vague time
-    vague_time_block = None
-    if "morning" in user_input_lower: vague_time_block = (9, 12)
-    elif "afternoon" in user_input_lower: vague_time_block = (12, 17)
-    elif "evening" in user_input_lower: vague_time_block = (17, 20)
-    elif "night" in user_input_lower: vague_time_block = (20, 22)
+    vague_time = next((block for block in TIME_BLOCKS if block in intents), None)
 
-    print("🔍 All matched date tokens:")
-    for text, dt in parsed_dates:
-        print(f" - '{text}' -> {dt}")
+    log.debug("Matched date tokens: %s", parsed_dates)
 
     # ⏳ Awaiting date → user now sent it
     if chat_context.pending_booking and chat_context.pending_booking.get("awaiting_date") and parsed_dates:
@@ -549,27 +1051,40 @@ def run_agent(user_input: str) -> str:
             return "📝 What should I title the event?"
         return "⏰ What time should I schedule it?"
 
+    # 🔎 "Book 90 minutes sometime next week": search for the best slots instead of asking for a time
+    if ("find_time" in intents or (duration and intents & {"booking", "availability"})) and not time_match:
+        start_date, days = _search_horizon(user_input_lower, parsed_dates)
+        chat_context.pending_booking = None
+        attendees = EMAIL.findall(user_input)
+        return ToolCall("find_meeting_time", {
+            "duration_minutes": duration or 30,
+            "start_date": start_date,
+            "days": days,
+            "preference": vague_time,
+            "attendees": ", ".join(attendees) or None
+        })
+
     # 🔁 Reschedule intent without full info
-    if not parsed_dates and any(kw in user_input_lower for kw in ["reschedule", "change", "postpone", "move"]):
+    if not parsed_dates and "reschedule_prompt" in intents:
         chat_context.pending_reschedule = True
         return "📝 Please specify the event name you'd like to reschedule."
 
     # 🗑 Delete intent without full info
-    if not parsed_dates and any(kw in user_input_lower for kw in ["delete", "remove", "cancel"]):
+    if not parsed_dates and "delete_prompt" in intents:
         chat_context.pending_delete = True
         return "📝 Please specify the event name you'd like to delete."
 
     # 🗓 Booking intent without date
-    if not parsed_dates and any(kw in user_input_lower for kw in ["book", "schedule", "meeting", "set up", "add", "lock", "event"]):
+    if not parsed_dates and "booking_prompt" in intents:
         chat_context.pending_booking = {"awaiting_date": True}
         return "📅 What date should I schedule the meeting?"
 
     # ❌ No date parsed and no clear intent
     if not parsed_dates:
-        if any(kw in user_input_lower for kw in ["hi", "hello", "hey"]):
+        if "greeting" in intents:
             return "👋 Hi there! I can help you manage your calendar — try saying something like 'Book meeting on Friday' or 'Check availability on July 10'."
 
-        if any(kw in user_input_lower for kw in ["what can you do", "help", "who are you", "abilities", "features"]):
+        if "help" in intents:
             return (
                 "🧠 I'm your Calendar Assistant! Here's what I can do:\n"
                 "- 📅 Book a meeting (e.g., 'Schedule a call on Friday at 4 PM')\n"
@@ -587,26 +1102,14 @@ def run_agent(user_input: str) -> str:
     chat_context.update_date(date_str)
 
     # ✅ Check Availability
-    if any(kw in user_input_lower for kw in [
-        "availability", "available", "free", "slots",
-        "check my calendar", "check availability",
-        "what's open", "open times", "free times",
-        "calendar openings", "any slot", "do i have time",
-        "can i book", "am i free", "is my calendar free"
-    ]):
-        return check_availability(date_str)
+    if "availability" in intents:
+        # 👥 Attendee emails in the message → common availability via FreeBusy
+        attendees = EMAIL.findall(user_input)
+        return ToolCall("check_availability", {"date": date_str, "attendees": ", ".join(attendees) or None})
 
     # 🔁 Reschedule
-    if any(kw in user_input_lower for kw in [
-        "reschedule", "change", "postpone", "move",
-        "shift", "delay", "update", "edit", "modify",
-        "adjust", "rearrange", "push back", "bring forward",
-        "change the time", "resched"
-    ]):
-        title_match = (
-            re.search(r"['\"](.+?)['\"]", user_input) or
-            re.search(r"reschedule (.*?) to", user_input_lower)
-        )
+    if "reschedule" in intents:
+        title_match = QUOTED_TITLE.search(user_input) or RESCHEDULE_TITLE_SHORT.search(user_input_lower)
 
         # Support memory fallback
         title = chat_context.pending_reschedule_title if hasattr(chat_context, "pending_reschedule_title") else None
@@ -617,26 +1120,23 @@ def run_agent(user_input: str) -> str:
             return "❌ Please specify which meeting to reschedule using quotes or like `reschedule Team Sync to 3 PM`"
 
         title = title_match.group(1).strip()
-        to_match = re.search(r"\bto\s+(.+)", user_input_lower)
-        new_dt = parse_date(to_match.group(1), settings=settings) if to_match else parsed_dates[-1][1]
+        to_match = TO_CLAUSE.search(user_input_lower)
+        new_dt = resolve_date(to_match.group(1), settings) if to_match else parsed_dates[-1][1]
 
         if not new_dt:
             return "❌ Please specify the new date and time clearly."
         
         chat_context.pending_reschedule_title = None
 
-        return reschedule_meeting(title, new_dt.strftime("%Y-%m-%d"), new_dt.strftime("%I:%M %p"))
+        return ToolCall("reschedule_meeting", {
+            "title": title,
+            "new_date": new_dt.strftime("%Y-%m-%d"),
+            "new_time": new_dt.strftime("%I:%M %p")
+        })
 
     # 🗑 Delete
-    if any(kw in user_input_lower for kw in [
-        "delete", "remove", "cancel", "clear", "discard",
-        "drop", "terminate", "cancel meeting", "erase",
-        "get rid of", "trash", "kill", "stop", "unschedule"
-    ]):
-        title_match = (
-            re.search(r"['\"](.+?)['\"]", user_input) or
-            re.search(r"(?:delete|remove|cancel)\s+(.*?)($|from|on)", user_input_lower)
-        )
+    if "delete" in intents:
+        title_match = QUOTED_TITLE.search(user_input) or DELETE_TITLE.search(user_input_lower)
 
         # Use fallback if title isn't in this message
         title = chat_context.pending_delete_title if hasattr(chat_context, "pending_delete_title") else None
@@ -650,8 +1150,8 @@ def run_agent(user_input: str) -> str:
             return "📝 Please specify the event name you'd like to delete."
 
         # Try to find date from message
-        date_match = re.search(r"(?:from|on)\s+(.+)", user_input_lower)
-        parsed = parse_date(date_match.group(1), settings=settings) if date_match else None
+        date_match = FROM_ON_CLAUSE.search(user_input_lower)
+        parsed = resolve_date(date_match.group(1), settings) if date_match else None
 
         if not parsed:
             chat_context.pending_delete = True
@@ -662,29 +1162,26 @@ def run_agent(user_input: str) -> str:
         chat_context.pending_delete = False
         chat_context.pending_delete_title = None
 
-        from calendar_utils import delete_event
-        return delete_event(title, parsed.strftime("%Y-%m-%d"))
+        return ToolCall("delete_event", {"title": title, "date": parsed.strftime("%Y-%m-%d")})
 
     # 📅 Booking intent
-    if any(kw in user_input_lower for kw in [
-        "book", "schedule", "meeting", "set up", "add",
-        "lock", "event", "create", "plan", "make appointment",
-        "put on calendar", "register", "arrange", "organize",
-        "invite", "fix", "log", "block time", "set meeting",
-        "new meeting"
-    ]):
+    if "booking" in intents:
         if not parsed_dates:
             chat_context.pending_booking = {"awaiting_date": True}
             return "📅 What date should I schedule the meeting?"
 
         if not (date_obj.hour or date_obj.minute):
             chat_context.pending_booking = {"date": date_str, "awaiting_time": True}
+            if duration:
+                chat_context.pending_booking["duration_minutes"] = duration
             return "⏰ What time should I schedule it?"
 
         chat_context.pending_booking = {
             "date": date_str,
             "time": date_obj.strftime("%I:%M %p")
         }
+        if duration:
+            chat_context.pending_booking["duration_minutes"] = duration
         return "📝 What should I title the event?"
 
     # 🧩 Fallback
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# ------------------------------
+# 📡 Progress events for streamed /agent replies
+# ------------------------------
+# The sink is a callable(event, data) installed for one request. Context
+# variables follow asyncio tasks and asyncio.to_thread, so tools and calendar
+# helpers can emit from anywhere in the turn without being passed a handle.
+_sink = ContextVar("agent_event_sink", default=None)
+
+
+def emit(event: str, **data):
+    """Report progress to the current stream; a no-op for non-streamed requests."""
+    sink = _sink.get()
+    if sink is not None:
+        sink(event, data)
+
+
+def is_streaming() -> bool:
+    return _sink.get() is not None
+
+
+@contextmanager
+def event_sink(callback):
+    token = _sink.set(callback)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
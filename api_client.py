@@ -0,0 +1,102 @@
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Statuses that mean the backend didn't act on the request (overloaded, or still
+# waking up behind the proxy), so even a booking POST is safe to send again
+RETRY_STATUSES = (429, 503)
+
+
+# ------------------------------
+# 🌐 Keep-alive HTTP client for the backend API
+# ------------------------------
+class ApiCall:
+    """What one request cost: time to response headers and attempts made (1 + retries)."""
+
+    __slots__ = ("latency", "attempts")
+
+    def __init__(self):
+        self.latency = None
+        self.attempts = 0
+
+    def label(self) -> str:
+        attempts = f"{self.attempts} attempt{'s' if self.attempts != 1 else ''}"
+        if self.latency is None:
+            return attempts
+        return f"headers after {self.latency:.2f}s, {attempts}"
+
+
+class ApiClient:
+    """
+    One pooled `requests.Session` for every call to the backend.
+
+    Connections are kept alive and reused, so only the first request pays the
+    TCP + TLS handshake. Responses are gzip-compressed by the backend and
+    decoded transparently. Connection failures and 429 / 503 replies are
+    retried with exponential backoff (honouring Retry-After); a request that
+    may have reached the agent is never sent twice.
+    """
+
+    def __init__(self, base_url, pool_size=10, retries=3, backoff_seconds=0.5, timeout=(10, 60)):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            other=0,
+            allowed_methods=None,  # the status list above is safe for every method
+            status_forcelist=RETRY_STATUSES,
+            backoff_factor=backoff_seconds,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        self._retries = retries
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def _send(self, method, path, call=None, **kwargs):
+        call = call if call is not None else ApiCall()
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except (requests.ConnectionError, requests.exceptions.RetryError):
+            call.attempts = self._retries + 1
+            raise
+        retries = getattr(response.raw, "retries", None)
+        call.attempts = 1 + len(retries.history) if retries is not None else 1
+        call.latency = response.elapsed.total_seconds()
+        return response
+
+    def post_json(self, path: str, payload: dict, call: ApiCall = None) -> dict:
+        response = self._send("POST", path, call, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    # 📡 Read Server-Sent Events as (event, data) pairs
+    def stream_events(self, path: str, payload: dict, call: ApiCall = None):
+        with self._send("POST", path, call, json=payload, stream=True) as response:
+            response.raise_for_status()
+            event, data = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data.append(line[len("data:"):].strip())
+                elif not line and event:
+                    yield event, json.loads("\n".join(data) or "{}")
+                    event, data = None, []
+
+    def close(self):
+        self.session.close()
+
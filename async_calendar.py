@@ -0,0 +1,445 @@
+import asyncio
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import httpx
+import pytz
+from dateutil.parser import parse
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+
+from config import GOOGLE_CALENDAR_ID, GOOGLE_SERVICE_ACCOUNT_FILE
+from busy_index import BusyIndex
+from calendar_client import CALENDAR_SCOPES, EVENT_FIELDS
+from agent_events import emit
+from tracing import span
+import calendar_utils
+from calendar_utils import (
+    event_cache, invalidate_event, working_day_slots, free_slot_dicts, render_today_events, today_view,
+    FREEBUSY_MAX_CALENDARS, booking_ledger, busy_overlap, index_event, unindex_event,
+    day_bounds, exact_title_matches, title_confirmation, meeting_search_days, meeting_candidates
+)
+from booking_ledger import SlotUnavailableError
+from title_index import is_unambiguous
+from log_setup import get_logger
+
+CALENDAR_API_URL = "https://www.googleapis.com/calendar/v3"
+WRITE_OPS = {"POST": "insert", "PATCH": "patch", "PUT": "update", "DELETE": "delete"}
+
+log = get_logger("async_calendar")
+
+
+# ------------------------------
+# ⚡ asyncio-native Google Calendar client
+# ------------------------------
+class AsyncCalendarClient:
+    """
+    Calendar REST client on a pooled httpx.AsyncClient.
+
+    One instance is shared by every request on the event loop. Keep-alive
+    connections are reused, and the service-account token is refreshed (off the
+    loop) only when it has expired.
+    """
+
+    def __init__(self, service_account_file=None, max_connections=100, max_keepalive=20, timeout=30, transport=None, credentials=None):
+        self._credentials = credentials
+        self._service_account_file = service_account_file or GOOGLE_SERVICE_ACCOUNT_FILE
+        self._token_lock = asyncio.Lock()
+        self._http = httpx.AsyncClient(
+            base_url=CALENDAR_API_URL,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            transport=transport,
+        )
+
+    async def _auth_headers(self):
+        async with self._token_lock:
+            if self._credentials is None:
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    self._service_account_file,
+                    scopes=CALENDAR_SCOPES
+                )
+            if not self._credentials.valid:
+                # google-auth refresh is blocking; keep it off the event loop
+                await asyncio.to_thread(self._credentials.refresh, Request())
+            return {"Authorization": f"Bearer {self._credentials.token}"}
+
+    async def _request(self, method, path, **kwargs):
+        # Reads (including FreeBusy, a POST) are fetches; everything else writes events
+        if method == "GET" or path == "/freeBusy":
+            stage, attrs = "calendar_fetch", {"source": "freebusy" if method == "POST" else "list"}
+        else:
+            stage, attrs = "booking_write", {"op": WRITE_OPS.get(method, method.lower())}
+        with span(stage, **attrs):
+            response = await self._http.request(method, path, headers=await self._auth_headers(), **kwargs)
+            response.raise_for_status()
+        return response.json() if response.content else None
+
+    @staticmethod
+    def _events_path(calendar_id, event_id=None):
+        path = f"/calendars/{quote(calendar_id, safe='')}/events"
+        return f"{path}/{quote(event_id, safe='')}" if event_id else path
+
+    async def iter_events(self, time_min=None, time_max=None, q=None, calendar_id=None, page_size=250):
+        """Yield events in start-time order, fetching each result page only when it is reached."""
+        params = {
+            "singleEvents": "true",
+            "orderBy": "startTime",
+            "maxResults": page_size,
+            "fields": f"items({EVENT_FIELDS}),nextPageToken",
+        }
+        if time_min:
+            params["timeMin"] = time_min
+        if time_max:
+            params["timeMax"] = time_max
+        if q:
+            params["q"] = q
+
+        path = self._events_path(calendar_id or GOOGLE_CALENDAR_ID)
+        while True:
+            result = await self._request("GET", path, params=params)
+            for event in result.get("items", []):
+                yield event
+            if not result.get("nextPageToken"):
+                return
+            params["pageToken"] = result["nextPageToken"]
+
+    async def list_events(self, time_min=None, time_max=None, q=None, calendar_id=None):
+        """All events in the window, following every result page."""
+        return [event async for event in self.iter_events(time_min, time_max, q, calendar_id)]
+
+    async def insert_event(self, body, calendar_id=None):
+        return await self._request("POST", self._events_path(calendar_id or GOOGLE_CALENDAR_ID), json=body)
+
+    async def patch_event(self, event_id, body, calendar_id=None):
+        return await self._request("PATCH", self._events_path(calendar_id or GOOGLE_CALENDAR_ID, event_id), json=body)
+
+    async def delete_event(self, event_id, calendar_id=None):
+        await self._request("DELETE", self._events_path(calendar_id or GOOGLE_CALENDAR_ID, event_id))
+
+    async def freebusy(self, body):
+        return await self._request("POST", "/freeBusy", json=body)
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+_client = None
+
+
+def get_async_client() -> AsyncCalendarClient:
+    global _client
+    if _client is None:
+        _client = AsyncCalendarClient()
+    return _client
+
+
+def configure_async_client(**kwargs) -> AsyncCalendarClient:
+    """Replace the shared client (e.g. with an httpx.MockTransport for offline runs)."""
+    global _client
+    _client = AsyncCalendarClient(**kwargs)
+    return _client
+
+
+async def close_async_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ------------------------------
+# 📅 Async mirrors of calendar_utils
+# ------------------------------
+def _day_bounds(date: str, timezone: str):
+    tz = pytz.timezone(timezone)
+    start_of_day = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
+    return tz, start_of_day, start_of_day + timedelta(days=1)
+
+
+async def list_day_events(date: str, timezone="Asia/Kolkata"):
+    """Same per-day cache as calendar_utils.list_day_events; misses are fetched without blocking."""
+    if calendar_utils.calendar_mirror is not None:
+        # Mirror reads are local; an occasional delta sync runs off the loop
+        return await asyncio.to_thread(calendar_utils.list_day_events, date, timezone)
+
+    key = (GOOGLE_CALENDAR_ID, date, timezone)
+    events = event_cache.get(key)
+    source = "cache"
+    if events is None:
+        _, start_of_day, end_of_day = _day_bounds(date, timezone)
+        # Another turn can write while this awaits; its invalidation keeps our result out of the cache
+        generation = event_cache.begin_load(key)
+        try:
+            events = await get_async_client().list_events(start_of_day.isoformat(), end_of_day.isoformat())
+        except BaseException:
+            event_cache.cancel_load(key)
+            raise
+        event_cache.put(key, events, generation)
+        source = "api"
+    emit("calendar_fetched", date=date, events=len(events), source=source)
+    return events
+
+
+async def get_common_busy_index(calendar_ids, start: datetime, end: datetime, timezone="Asia/Kolkata") -> BusyIndex:
+    tz = pytz.timezone(timezone)
+    ids = list(dict.fromkeys([GOOGLE_CALENDAR_ID, *calendar_ids]))
+    chunks = [ids[i:i + FREEBUSY_MAX_CALENDARS] for i in range(0, len(ids), FREEBUSY_MAX_CALENDARS)]
+    results = await asyncio.gather(*[
+        get_async_client().freebusy({
+            "timeMin": start.isoformat(),
+            "timeMax": end.isoformat(),
+            "timeZone": timezone,
+            "items": [{"id": calendar_id} for calendar_id in chunk]
+        })
+        for chunk in chunks
+    ])
+
+    intervals, errors = [], {}
+    for result in results:
+        for calendar_id, info in result.get("calendars", {}).items():
+            if info.get("errors"):
+                errors[calendar_id] = ", ".join(err.get("reason", "unknown") for err in info["errors"])
+            intervals.extend(
+                (parse(b["start"]).astimezone(tz), parse(b["end"]).astimezone(tz))
+                for b in info.get("busy", [])
+            )
+    if errors:
+        details = "; ".join(f"{calendar_id} ({reason})" for calendar_id, reason in errors.items())
+        raise ValueError(f"Could not read busy times for: {details}")
+    index = BusyIndex(intervals)
+    emit("calendar_fetched", calendars=len(ids), busy_blocks=len(index), source="freebusy")
+    return index
+
+
+async def get_day_slots(date: str, timezone="Asia/Kolkata", calendar_ids=None):
+    tz, start_of_day, end_of_day = _day_bounds(date, timezone)
+    if calendar_ids:
+        busy = await get_common_busy_index(calendar_ids, start_of_day, end_of_day, timezone)
+    else:
+        events = await list_day_events(date, timezone)
+        log.debug("Fetched %s events for %s", len(events), date)
+        busy = BusyIndex.from_events(events, tz)
+    return working_day_slots(start_of_day, busy)
+
+
+async def get_free_slots(date: str, timezone="Asia/Kolkata", calendar_ids=None):
+    log.debug("async get_free_slots called with date: %s, calendars: %s", date, calendar_ids)
+    try:
+        return free_slot_dicts(await get_day_slots(date, timezone, calendar_ids))
+    except Exception as e:
+        log.error("async get_free_slots failed: %s", e)
+        return [{
+            "start": None,
+            "end": None,
+            "note": f"❌ Failed to fetch free slots due to error: {e}"
+        }]
+
+
+async def find_meeting_slots(duration_minutes=30, start_date: str = None, days=7, work_hours=(9, 17), preference=None,
+                             count=3, calendar_ids=None, timezone="Asia/Kolkata"):
+    """Same search as calendar_utils.find_meeting_slots, with the range fetched on the loop."""
+    tz = pytz.timezone(timezone)
+    search_days = meeting_search_days(start_date, days, skip_weekends=days > 1, timezone=timezone)
+    range_start = tz.localize(search_days[0])
+    range_end = tz.localize(search_days[-1] + timedelta(days=1))
+
+    if calendar_ids:
+        busy = await get_common_busy_index(calendar_ids, range_start, range_end, timezone)
+    else:
+        if calendar_utils.calendar_mirror is not None:
+            events = await asyncio.to_thread(lambda: list(calendar_utils.events_between(range_start, range_end)))
+        else:
+            events = [
+                e async for e in get_async_client().iter_events(range_start.isoformat(), range_end.isoformat(), page_size=2500)
+            ]
+        busy = BusyIndex.from_events(events, tz)
+        emit("calendar_fetched", days=len(search_days), busy_blocks=len(busy), source="range")
+
+    return meeting_candidates(
+        busy, search_days, duration_minutes, work_hours, preference, count,
+        not_before=datetime.now(tz), timezone=timezone
+    )
+
+
+async def ensure_slot_free(start: datetime, end: datetime, timezone="Asia/Kolkata", ignore_event_id: str = None):
+    day = start.astimezone(pytz.timezone(timezone)).strftime("%Y-%m-%d")
+    events = [e for e in await list_day_events(day, timezone) if not ignore_event_id or e.get("id") != ignore_event_id]
+    if busy_overlap(events, start, end, timezone):
+        raise SlotUnavailableError(start, end)
+
+
+async def book_slot(start: dict, end: dict, summary="Meeting", description="Booked via AI assistant"):
+    log.debug("async book_slot called with: start=%s, end=%s, summary=%s", start, end, summary)
+    start_dt, end_dt = parse(start["dateTime"]), parse(end["dateTime"])
+    # 🔒 Same reservation ledger as the sync path, so both can't book one slot twice
+    with booking_ledger.hold(GOOGLE_CALENDAR_ID, start_dt, end_dt) as token:
+        await ensure_slot_free(start_dt, end_dt, start["timeZone"])
+        created_event = await get_async_client().insert_event({
+            'summary': summary,
+            'description': description,
+            'start': {'dateTime': start["dateTime"], 'timeZone': start["timeZone"]},
+            'end': {'dateTime': end["dateTime"], 'timeZone': end["timeZone"]},
+        })
+        invalidate_event(created_event)
+        index_event(created_event)
+        booking_ledger.commit(token, created_event["id"])
+
+    log.debug("Event created: %s", created_event["id"])
+    return {
+        "id": created_event["id"],
+        "summary": created_event["summary"],
+        "start": created_event["start"]["dateTime"],
+        "end": created_event["end"]["dateTime"]
+    }
+
+
+async def move_event(event_id: str, new_start: datetime, new_end: datetime, timezone="Asia/Kolkata", old_event: dict = None):
+    booking_ledger.forget_event(event_id)
+    # 🔒 Claimed and re-checked like a booking, so a reschedule can't double-book
+    with booking_ledger.hold(GOOGLE_CALENDAR_ID, new_start, new_end) as token:
+        await ensure_slot_free(new_start, new_end, timezone, ignore_event_id=event_id)
+        updated_event = await get_async_client().patch_event(event_id, {
+            'start': {'dateTime': new_start.isoformat(), 'timeZone': timezone},
+            'end': {'dateTime': new_end.isoformat(), 'timeZone': timezone}
+        })
+        invalidate_event(old_event)
+        invalidate_event(updated_event)
+        index_event(updated_event)
+        booking_ledger.commit(token, event_id)
+    return updated_event
+
+
+# 🔎 Title index reads; a rebuild is fetched on the loop like any other listing
+async def refresh_title_index(force=False):
+    index = calendar_utils.title_index
+    if index is None or not (force or index.needs_refresh()):
+        return
+    if calendar_utils.calendar_mirror is not None:
+        await asyncio.to_thread(calendar_utils.refresh_title_index, force)
+        return
+    window = index.begin_refresh()
+    if window is None:
+        return
+    try:
+        start, end = window
+        events = [e async for e in get_async_client().iter_events(start.isoformat(), end.isoformat(), page_size=2500)]
+    except BaseException:
+        index.abort_refresh()
+        raise
+    index.finish_refresh(events, window)
+
+
+async def find_indexed_events(title: str, start: datetime = None, end: datetime = None):
+    index = calendar_utils.title_index
+    if index is None:
+        return None
+    try:
+        await refresh_title_index()
+    except Exception as e:
+        log.error("async title index refresh failed: %s", e)
+    return index.match(title, start, end or index.window_end())
+
+
+async def events_titled(title: str, date: str, timezone="Asia/Kolkata"):
+    matched = await find_indexed_events(title, *day_bounds(date, timezone))
+    if matched and matched[1]:
+        return matched
+    return "exact", exact_title_matches(await list_day_events(date, timezone), title)
+
+
+async def update_event_time(title: str, date: str, new_start: datetime, new_end: datetime, timezone="Asia/Kolkata") -> str:
+    try:
+        tier, events = await events_titled(title, date, timezone)
+        if not events:
+            return f"❌ No event found with title **{title}** on {date}."
+        if not is_unambiguous(title, tier, events):
+            return title_confirmation(title, events, "reschedule", timezone)
+        event = events[0]
+        await move_event(event["id"], new_start, new_end, timezone, old_event=event)
+        return f"✅ Rescheduled **{event.get('summary', title)}** to {new_start.strftime('%Y-%m-%d %I:%M %p')}"
+    except SlotUnavailableError as e:
+        return f"⚠️ {e}"
+    except Exception as e:
+        log.error("async update_event_time failed: %s", e)
+        return f"❌ Failed to reschedule meeting: {str(e)}"
+
+
+async def match_events_by_title(title: str):
+    try:
+        now = datetime.now(pytz.utc)
+        indexed = await find_indexed_events(title, start=now)
+        if indexed and indexed[0] == "exact" and indexed[1]:
+            return indexed
+
+        if calendar_utils.calendar_mirror is not None:
+            return await asyncio.to_thread(calendar_utils.match_events_by_title, title)
+
+        # Exact matches past the index horizon win over its looser ones
+        exact = exact_title_matches(
+            [e async for e in get_async_client().iter_events(time_min=now.isoformat(), q=title)], title
+        )
+        log.debug("Found %s events matching %r", len(exact), title)
+        if exact:
+            return "exact", exact
+        return indexed if indexed else ("none", [])
+    except Exception as e:
+        log.error("async match_events_by_title failed: %s", e)
+        return "none", []
+
+
+async def find_events_by_title(title: str):
+    return (await match_events_by_title(title))[1]
+
+
+async def get_today_events():
+    try:
+        tz = pytz.timezone("Asia/Kolkata")
+        today = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+        events = await list_day_events(today.strftime("%Y-%m-%d"), "Asia/Kolkata")
+        return render_today_events(events, today, tz)
+    except Exception as e:
+        log.error("async get_today_events failed: %s", e)
+        return ["⚠️ Could not load events. Try again later."]
+
+
+async def get_today_view(timezone="Asia/Kolkata") -> dict:
+    tz = pytz.timezone(timezone)
+    today = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    events = await list_day_events(today.strftime("%Y-%m-%d"), timezone)
+    return today_view(events, today, tz)
+
+
+async def delete_event_by_id(event_id: str):
+    try:
+        await get_async_client().delete_event(event_id)
+        booking_ledger.forget_event(event_id)
+        unindex_event(event_id)
+        invalidate_event()
+        log.debug("Successfully deleted event ID: %s", event_id)
+    except Exception as e:
+        log.error("async delete_event_by_id failed: %s", e)
+
+
+async def delete_event(title: str, date: str, timezone="Asia/Kolkata") -> str:
+    try:
+        log.info("[TOOL:async delete_event] Attempting to delete event titled %r on %s", title, date)
+        if not title.strip():
+            return "❌ Please provide a valid event title to delete."
+
+        tier, events = await events_titled(title, date, timezone)
+        if not events:
+            return f"⚠️ No matching event found with title '**{title}**' on {date}."
+        if not is_unambiguous(title, tier, events):
+            return title_confirmation(title, events, "delete", timezone)
+
+        event = events[0]
+        await get_async_client().delete_event(event["id"])
+        booking_ledger.forget_event(event["id"])
+        unindex_event(event["id"])
+        invalidate_event(event)
+        log.debug("Deleted event: %s", event["id"])
+        return f"🗑️ Event deleted:\n\n**{event.get('summary', title)}** on {date}"
+    except Exception as e:
+        log.error("async delete_event failed: %s", e)
+        return f"❌ Failed to delete event '{title}' on {date}: {e}"
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+# ------------------------------
+# 🧮 Compact per-day availability: one bit per slot
+# ------------------------------
+class DayAvailability:
+    """
+    Occupancy of `count` fixed-size slots starting at `base`.
+
+    Bit i of `busy` is set when slot i (base + i * slot_minutes) overlaps busy
+    time, so a whole working day is a single small int and combining people or
+    calendars is one bitwise operation. Iterating yields the same
+    (slot_start, slot_end, is_busy) tuples as `BusyIndex.slots`; dicts, text
+    and JSON are only produced by the `to_*` renderers at the API edge.
+    """
+
+    __slots__ = ("base", "slot_minutes", "count", "busy")
+
+    def __init__(self, base: datetime, slot_minutes: int, count: int, busy: int = 0):
+        self.base = base
+        self.slot_minutes = slot_minutes
+        self.count = count
+        self.busy = busy & ((1 << count) - 1)
+
+    @classmethod
+    def from_busy(cls, busy_index, window_start: datetime, window_end: datetime, slot_minutes=30):
+        """Mark every slot in the window that a BusyIndex interval overlaps."""
+        step = timedelta(minutes=slot_minutes)
+        count = -(-(window_end - window_start) // step)
+        bits = 0
+        for busy_start, busy_end in busy_index.between(window_start, window_start + count * step):
+            first = max(0, (busy_start - window_start) // step)
+            last = min(count, -((window_start - busy_end) // step))
+            if last > first:
+                bits |= ((1 << (last - first)) - 1) << first
+        return cls(window_start, slot_minutes, count, bits)
+
+    @classmethod
+    def from_mask(cls, base: datetime, slot_minutes: int, busy_mask):
+        """Pack a boolean NumPy row (True = busy) into a bitset."""
+        packed = np.packbits(np.asarray(busy_mask, dtype=bool), bitorder="little")
+        return cls(base, slot_minutes, len(busy_mask), int.from_bytes(packed.tobytes(), "little"))
+
+    # 🔢 Bits
+    @property
+    def step(self) -> timedelta:
+        return timedelta(minutes=self.slot_minutes)
+
+    @property
+    def free(self) -> int:
+        return ~self.busy & ((1 << self.count) - 1)
+
+    def free_count(self) -> int:
+        return bin(self.free).count("1")
+
+    def is_busy(self, index: int) -> bool:
+        return bool(self.busy >> index & 1)
+
+    def slot_start(self, index: int) -> datetime:
+        return self.base + index * self.step
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        step = self.step
+        for i in range(self.count):
+            start = self.base + i * step
+            yield start, start + step, self.is_busy(i)
+
+    def __eq__(self, other):
+        return isinstance(other, DayAvailability) and self._grid() == other._grid() and self.busy == other.busy
+
+    def __repr__(self):
+        return f"DayAvailability({self.base.isoformat()}, {self.slot_minutes} min, {self.free_count()}/{self.count} free)"
+
+    # 🔀 Set operations on free time
+    def _grid(self):
+        return self.base, self.slot_minutes, self.count
+
+    def _check_grid(self, other):
+        if self._grid() != other._grid():
+            raise ValueError("Availabilities must share base time, slot size and slot count")
+
+    def intersect(self, other: "DayAvailability") -> "DayAvailability":
+        """Slots free in both (e.g. common free time of two people)."""
+        self._check_grid(other)
+        return DayAvailability(self.base, self.slot_minutes, self.count, self.busy | other.busy)
+
+    def union(self, other: "DayAvailability") -> "DayAvailability":
+        """Slots free in either."""
+        self._check_grid(other)
+        return DayAvailability(self.base, self.slot_minutes, self.count, self.busy & other.busy)
+
+    __and__ = intersect
+    __or__ = union
+
+    def first_fit(self, slots=1, not_before: datetime = None):
+        """Index of the first run of `slots` contiguous free slots (starting at or after `not_before`), or None."""
+        if slots <= 0 or slots > self.count:
+            return None
+        runs = self.free
+        # Bit i survives only if slots i .. i+slots-1 are all free
+        for k in range(1, slots):
+            runs &= self.free >> k
+        if not_before is not None and not_before > self.base:
+            runs &= ~((1 << -((self.base - not_before) // self.step)) - 1)
+        return (runs & -runs).bit_length() - 1 if runs else None
+
+    def first_fit_window(self, slots=1, not_before: datetime = None):
+        """(start, end) of `first_fit`, or None."""
+        index = self.first_fit(slots, not_before)
+        if index is None:
+            return None
+        return self.slot_start(index), self.slot_start(index + slots)
+
+    # 🧾 Renderers (API edge only)
+    def to_dicts(self) -> list:
+        """Free slots as [{"start": iso, "end": iso}, ...]."""
+        return [
+            {"start": start.isoformat(), "end": end.isoformat()}
+            for start, end, is_busy in self
+            if not is_busy
+        ]
+
+    def to_text(self, columns=2, width=30) -> str:
+        """Every slot labelled free / booked, laid out in columns."""
+        labels = [
+            f"{'🔴 Booked' if is_busy else '🟢 Free'} - {start.strftime('%I:%M %p')} to {end.strftime('%I:%M %p')}"
+            for start, end, is_busy in self
+        ]
+        rows = []
+        for i in range(0, len(labels), columns):
+            row = labels[i:i + columns]
+            row += [""] * (columns - len(row))
+            rows.append(" ".join([label.ljust(width) for label in row[:-1]] + [row[-1]]))
+        return "\n".join(rows)
+
+    def to_json(self) -> dict:
+        """Compact JSON-safe form: the grid plus busy bits as a hex string."""
+        return {
+            "base": self.base.isoformat(),
+            "slot_minutes": self.slot_minutes,
+            "slots": self.count,
+            "busy": format(self.busy, "x"),
+        }
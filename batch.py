@@ -0,0 +1,148 @@
+import asyncio
+import json
+import time
+import uuid
+
+from config import BATCH_CONCURRENCY, BATCH_MAX_ITEMS
+from agent import respond_async, search_date_mentions, ACTION_INTENTS
+from intent_router import classify, ISO_DATE
+from session_store import session_store
+import async_calendar
+from log_setup import get_logger
+
+log = get_logger("batch")
+
+# Chains still finishing an item after their consumer went away
+_background_chains = set()
+
+
+# ------------------------------
+# 📥 Input: a JSON list, {"messages": [...]}, or JSONL (one item per line)
+# ------------------------------
+def _normalize_item(item, index):
+    if isinstance(item, str):
+        item = {"message": item}
+    if not isinstance(item, dict) or not isinstance(item.get("message"), str) or not item["message"].strip():
+        raise ValueError(f"Item {index} needs a non-empty 'message' string.")
+    return {
+        "id": item.get("id", item.get("request_id")),
+        "message": item["message"],
+        "session_id": item.get("session_id"),
+    }
+
+
+def parse_batch_items(payload) -> list:
+    """Accept already-decoded JSON or raw text; raise ValueError on anything unusable."""
+    if isinstance(payload, (bytes, str)):
+        text = payload.decode() if isinstance(payload, bytes) else payload
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                payload = [json.loads(line) for line in text.splitlines() if line.strip()]
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Body is neither JSON nor JSONL: {e}") from e
+
+    if isinstance(payload, dict):
+        payload = payload.get("messages")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a list of messages, {\"messages\": [...]}, or JSONL.")
+    if len(payload) > BATCH_MAX_ITEMS:
+        raise ValueError(f"At most {BATCH_MAX_ITEMS} messages per batch (got {len(payload)}).")
+    return [_normalize_item(item, i) for i, item in enumerate(payload)]
+
+
+# ------------------------------
+# 📅 Fetch each target day once, before the items fan out
+# ------------------------------
+def _target_date(message: str):
+    """Best-effort YYYY-MM-DD the message is about; only used to warm the cache."""
+    if not classify(message.lower()) & ACTION_INTENTS:
+        return None
+    iso = ISO_DATE.search(message)
+    if iso:
+        return iso.group(1)
+    # Same memo the router reads, so this parse isn't repeated later
+    found = search_date_mentions(message)
+    return found[0][1].strftime("%Y-%m-%d") if found else None
+
+
+def _target_dates(messages) -> list:
+    return sorted({day for day in map(_target_date, messages) if day})
+
+
+async def prefetch_days(messages) -> list:
+    # Up to BATCH_MAX_ITEMS date parses: one worker-thread hop instead of blocking the loop
+    days = await asyncio.to_thread(_target_dates, list(messages))
+    results = await asyncio.gather(*(async_calendar.list_day_events(day) for day in days), return_exceptions=True)
+    for day, result in zip(days, results):
+        if isinstance(result, Exception):
+            # The item itself will hit the same error and report it
+            log.debug("Batch prefetch failed for %s: %s", day, result)
+    return days
+
+
+# ------------------------------
+# 🚀 Run: items sharing a session stay in order, everything else runs concurrently
+# ------------------------------
+async def run_batch(items, concurrency=BATCH_CONCURRENCY):
+    """Yield one result dict per item, in input order, as soon as each is ready."""
+    batch_id = uuid.uuid4().hex[:8]
+    days = await prefetch_days(item["message"] for item in items)
+    log.debug("Batch %s: %s messages, prefetched %s days", batch_id, len(items), len(days))
+
+    loop = asyncio.get_running_loop()
+    results = [loop.create_future() for _ in items]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Items without a session each get a throwaway one, so they can't interfere
+    chains = {}
+    for index, item in enumerate(items):
+        session_id = item["session_id"] or f"batch-{batch_id}-{index}"
+        chains.setdefault(session_id, []).append(index)
+
+    stopped = False
+
+    async def run_item(index, session_id):
+        item = items[index]
+        start = time.perf_counter()
+        try:
+            async with semaphore:
+                if stopped:
+                    return None
+                reply, ok = await respond_async(item["message"], session_id), True
+        except Exception as e:
+            reply, ok = f"❌ Server error: {e}", False
+        return {
+            "index": index,
+            "id": item["id"],
+            "message": item["message"],
+            "response": reply,
+            "ok": ok,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    async def run_chain(session_id, indices):
+        try:
+            for index in indices:
+                result = await run_item(index, session_id)
+                if result is None:
+                    break
+                results[index].set_result(result)
+        finally:
+            if not items[indices[0]]["session_id"]:
+                session_store.reset(session_id)
+
+    tasks = [asyncio.create_task(run_chain(session_id, indices)) for session_id, indices in chains.items()]
+    try:
+        for result in results:
+            yield await result
+    finally:
+        # Only matters if the consumer went away early: don't start the rest, but let
+        # items already inside a turn finish, so a write isn't cut off before its
+        # ledger, cache and index updates
+        stopped = True
+        for task in tasks:
+            if not task.done():
+                _background_chains.add(task)
+                task.add_done_callback(_background_chains.discard)
@@ -0,0 +1,74 @@
+"""
+Send many scheduling messages at once and print the replies as they arrive.
+
+Input is a JSONL file (one {"message": ..., "id"?: ..., "session_id"?: ...}
+object or plain JSON string per line), a JSON list, or "-" for stdin. Results
+are printed as NDJSON in input order.
+
+    python batch_cli.py benchmarks/messages.jsonl
+    python batch_cli.py requests.jsonl --url https://calendar-booking-assistant.onrender.com
+    cat messages.jsonl | python batch_cli.py - --local
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import requests
+
+DEFAULT_URL = os.getenv("AGENT_API_URL", "http://127.0.0.1:8000")
+
+
+def read_input(path: str) -> str:
+    if path == "-":
+        return sys.stdin.read()
+    with open(path) as f:
+        return f.read()
+
+
+def run_remote(payload: str, url: str):
+    with requests.post(
+        f"{url.rstrip('/')}/agent/batch",
+        data=payload.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+        stream=True,
+        timeout=(10, 300),
+    ) as response:
+        if response.status_code == 400:
+            raise SystemExit(f"❌ {response.json().get('detail')}")
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                print(line, flush=True)
+
+
+async def run_local(payload: str, concurrency: int):
+    # Imported here so the remote mode doesn't load the backend
+    from batch import parse_batch_items, run_batch
+
+    try:
+        items = parse_batch_items(payload)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    async for result in run_batch(items, concurrency=concurrency):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL / JSON file, or - for stdin")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Backend base URL (default: %(default)s)")
+    parser.add_argument("--local", action="store_true", help="Run in-process instead of calling the API")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent items with --local")
+    args = parser.parse_args()
+
+    payload = read_input(args.input)
+    if args.local:
+        asyncio.run(run_local(payload, args.concurrency))
+    else:
+        run_remote(payload, args.url)
+
+
+if __name__ == "__main__":
+    main()
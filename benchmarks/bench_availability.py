@@ -0,0 +1,107 @@
+"""
+Availability as per-day bitsets vs lists of slot dicts.
+
+Builds `--days` x `--people` availabilities from random busy times, then
+compares memory (tracemalloc) and the time to find slots free for everyone,
+including the first run of `--fit` contiguous free slots.
+
+    python benchmarks/bench_availability.py --days 90 --people 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytz
+
+from availability import DayAvailability
+from busy_index import BusyIndex
+
+
+def random_busy(rng, day, blocks):
+    intervals = []
+    for _ in range(blocks):
+        start = day + timedelta(hours=9, minutes=30 * rng.randrange(16))
+        intervals.append((start, start + timedelta(minutes=30 * rng.randrange(1, 4))))
+    return BusyIndex(intervals)
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--people", type=int, default=20)
+    parser.add_argument("--blocks", type=int, default=3, help="Busy blocks per person per day")
+    parser.add_argument("--fit", type=int, default=2, help="Contiguous free slots wanted")
+    args = parser.parse_args()
+
+    tz = pytz.timezone("Asia/Kolkata")
+    rng = random.Random(11)
+    first = tz.localize(datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
+    days = [first + timedelta(days=d) for d in range(args.days)]
+    busy = [[random_busy(rng, day, args.blocks) for day in days] for _ in range(args.people)]
+
+    def bounds(day):
+        return day.replace(hour=9), day.replace(hour=17)
+
+    # 📋 Before: every person's day as a list of free-slot dicts, intersected by ISO strings
+    def dict_lists():
+        return [
+            [
+                [{"start": s.isoformat(), "end": e.isoformat()} for s, e, is_busy in index.slots(*bounds(day)) if not is_busy]
+                for index, day in zip(person, days)
+            ]
+            for person in busy
+        ]
+
+    def dict_common(lists):
+        common = []
+        for d in range(args.days):
+            starts = set.intersection(*({slot["start"] for slot in person[d]} for person in lists))
+            common.append(sorted(starts))
+        return common
+
+    # 🧮 After: one int per person per day, intersected with bitwise OR of busy bits
+    def bitsets():
+        return [[DayAvailability.from_busy(index, *bounds(day)) for index, day in zip(person, days)] for person in busy]
+
+    def bitset_common(sets):
+        common = []
+        for d in range(args.days):
+            shared = sets[0][d]
+            for person in sets[1:]:
+                shared = shared & person[d]
+            common.append((shared, shared.first_fit(args.fit)))
+        return common
+
+    lists, list_build, list_mem = measure(dict_lists)
+    sets, set_build, set_mem = measure(bitsets)
+    list_common, list_join, _ = measure(lambda: dict_common(lists))
+    set_common, set_join, _ = measure(lambda: bitset_common(sets))
+
+    assert [sorted(s["start"] for s in day.to_dicts()) for day, _ in set_common] == list_common
+    found = sum(1 for _, fit in set_common if fit is not None)
+
+    print(f"🧮 {args.people} people x {args.days} days, 16 half-hour slots per day")
+    print(f"{'':<16} {'build':>10} {'peak memory':>13} {'common slots':>13}")
+    print(f"{'slot dicts':<16} {list_build * 1e3:>8.1f}ms {list_mem / 1024:>11.0f}KB {list_join * 1e3:>11.1f}ms")
+    print(f"{'bitsets':<16} {set_build * 1e3:>8.1f}ms {set_mem / 1024:>11.0f}KB {set_join * 1e3:>11.1f}ms")
+    print(f"days with {args.fit} contiguous slots free for everyone: {found}/{args.days}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Concurrency stress test for booking: many clients race for a handful of slots.
+
+Fires `--requests` bookings at `--slots` half-hour slots, from a thread pool
+(sync `calendar_utils.book_slot`) and from asyncio tasks
+(`async_calendar.book_slot`) at the same time, against the in-process fake
+calendar with `--latency` seconds per API call. Afterwards every pair of events
+in the fake is checked for overlap: the run fails if any slot was booked twice,
+or if any attempt errored instead of booking or being rejected.
+
+`--naive` runs the same load through check-then-insert without the reservation
+ledger, to show the race it closes.
+
+    python benchmarks/bench_booking_concurrency.py --requests 400 --slots 8 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_CALENDAR_ID", "primary")
+
+import pytz
+
+from benchmarks.fake_calendar import FakeCalendarService, FakeCredentials, _event_bounds
+import calendar_client
+import async_calendar
+import calendar_utils
+from booking_ledger import SlotUnavailableError
+
+
+def slot_bounds(tz, index):
+    day = tz.localize(datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)) + timedelta(days=30)
+    start = day + timedelta(minutes=30 * index)
+    return (
+        {"dateTime": start.isoformat(), "timeZone": tz.zone},
+        {"dateTime": (start + timedelta(minutes=30)).isoformat(), "timeZone": tz.zone},
+    )
+
+
+def naive_book_slot(start, end, summary):
+    # Check-then-insert with no reservation: the pre-ledger behaviour
+    start_dt, end_dt = calendar_utils.parse(start["dateTime"]), calendar_utils.parse(end["dateTime"])
+    calendar_utils.ensure_slot_free(start_dt, end_dt, start["timeZone"])
+    with calendar_client.calendar_service() as service:
+        created = service.events().insert(calendarId=calendar_utils.GOOGLE_CALENDAR_ID, body={
+            "summary": summary, "start": start, "end": end,
+        }).execute()
+    calendar_utils.invalidate_event(created)
+    return created
+
+
+def double_bookings(fake):
+    events = sorted(
+        (_event_bounds(e) for e in fake._events.values() if e.get("status") != "cancelled"),
+        key=lambda bounds: bounds[0],
+    )
+    return sum(1 for (s1, e1), (s2, e2) in zip(events, events[1:]) if s2 < e1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="Total booking attempts")
+    parser.add_argument("--slots", type=int, default=8, help="Distinct slots competed for")
+    parser.add_argument("--threads", type=int, default=32, help="Sync worker threads")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per API call")
+    parser.add_argument("--naive", action="store_true", help="Skip the reservation ledger (sync path only)")
+    args = parser.parse_args()
+
+    tz = pytz.timezone("Asia/Kolkata")
+    fake = FakeCalendarService(latency=args.latency)
+    calendar_client.configure_pool(service_factory=lambda: fake, max_size=args.threads)
+
+    outcomes = {"booked": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def record(key):
+        with lock:
+            outcomes[key] += 1
+
+    def sync_attempt(i):
+        start, end = slot_bounds(tz, i % args.slots)
+        try:
+            if args.naive:
+                naive_book_slot(start, end, f"sync-{i}")
+            else:
+                calendar_utils.book_slot(start, end, summary=f"sync-{i}")
+            record("booked")
+        except SlotUnavailableError:
+            record("rejected")
+        except Exception as e:
+            print(f"[ERROR] sync attempt {i}: {e}")
+            record("errors")
+
+    async def async_attempts(indices):
+        async_calendar.configure_async_client(transport=fake.httpx_transport(), credentials=FakeCredentials())
+
+        async def attempt(i):
+            start, end = slot_bounds(tz, i % args.slots)
+            try:
+                await async_calendar.book_slot(start, end, summary=f"async-{i}")
+                record("booked")
+            except SlotUnavailableError:
+                record("rejected")
+            except Exception as e:
+                print(f"[ERROR] async attempt {i}: {e}")
+                record("errors")
+
+        await asyncio.gather(*(attempt(i) for i in indices))
+        await async_calendar.close_async_client()
+
+    sync_indices = list(range(0, args.requests, 2)) if not args.naive else list(range(args.requests))
+    async_indices = [] if args.naive else list(range(1, args.requests, 2))
+
+    started = time.perf_counter()
+    async_thread = threading.Thread(target=lambda: asyncio.run(async_attempts(async_indices)))
+    async_thread.start()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(sync_attempt, sync_indices))
+    async_thread.join()
+    elapsed = time.perf_counter() - started
+
+    doubles = double_bookings(fake)
+    mode = "naive check-then-insert" if args.naive else "reservation ledger"
+    print(f"🔒 {mode}: {args.requests} attempts on {args.slots} slots, {args.latency * 1000:.0f} ms/API call")
+    print(f"booked {outcomes['booked']}, rejected {outcomes['rejected']}, errors {outcomes['errors']}")
+    print(f"throughput {args.requests / elapsed:.0f} attempts/s over {elapsed:.2f}s")
+    print(f"API calls: insert {fake.call_count('insert')}, list {fake.call_count('list')}")
+    if not args.naive:
+        print(f"ledger: {calendar_utils.booking_ledger.stats()}")
+    print(f"double bookings: {doubles}")
+    if doubles and not args.naive:
+        raise SystemExit("❌ Double booking detected")
+    if outcomes["errors"]:
+        raise SystemExit(f"❌ {outcomes['errors']} attempts failed with errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cold-start cost of the FastAPI backend.
+
+Each run starts a fresh interpreter, imports `main`, runs the app's startup
+hooks and posts one message to /agent against the in-process fake calendar.
+Reports import time, startup time and time-to-first-response, and whether
+LangChain / google-genai were loaded along the way (they shouldn't be for the
+manual router).
+
+    python benchmarks/bench_cold_start.py --runs 5 --message "Check availability tomorrow"
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_calendar import FakeCalendarService, FakeCredentials
+import calendar_client
+import async_calendar
+fake = FakeCalendarService()
+calendar_client.configure_pool(service_factory=lambda: fake)
+async_calendar.configure_async_client(transport=fake.httpx_transport(), credentials=FakeCredentials())
+
+import main
+t_import = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    t_startup = time.perf_counter()
+    response = client.post("/agent", json={"message": MESSAGE})
+    t_first = time.perf_counter()
+
+print(json.dumps({
+    "import_s": t_import - t0,
+    "startup_s": t_startup - t_import,
+    "first_response_s": t_first - t_startup,
+    "time_to_first_response_s": t_first - t0,
+    "status": response.status_code,
+    "reply": response.json()["response"][:60],
+    "langchain_loaded": "langchain" in sys.modules or "langchain_google_genai" in sys.modules,
+}))
+"""
+
+
+def run_once(message):
+    code = CHILD.replace("ROOT", repr(ROOT)).replace("MESSAGE", repr(message))
+    env = {**os.environ, "GOOGLE_CALENDAR_ID": os.environ.get("GOOGLE_CALENDAR_ID", "primary")}
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    # The app prints debug lines; the result is the last line
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--message", default="Check availability tomorrow")
+    args = parser.parse_args()
+
+    runs = [run_once(args.message) for _ in range(args.runs)]
+    print(f"📦 {args.runs} cold starts, message: {args.message!r}")
+    for key in ("import_s", "startup_s", "first_response_s", "time_to_first_response_s"):
+        values = [r[key] for r in runs]
+        print(f"{key:<26} median {statistics.median(values):6.3f}s   max {max(values):6.3f}s")
+    print(f"HTTP status: {sorted({r['status'] for r in runs})}, reply: {runs[-1]['reply']!r}")
+    print(f"LangChain loaded: {any(r['langchain_loaded'] for r in runs)}")
+
+
+if __name__ == "__main__":
+    main()
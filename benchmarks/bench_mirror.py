@@ -0,0 +1,100 @@
+"""
+Exercise CalendarMirror against the in-process fake events endpoint.
+
+Seeds a calendar, runs a full sync, applies inserts/updates/deletes, and checks
+that the mirror converges to the fake's state using only incremental pulls.
+Prints API round trips per read on a warm mirror.
+
+    python benchmarks/bench_mirror.py --events 2000 --reads 500
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytz
+
+from benchmarks.fake_calendar import FakeCalendarService
+from calendar_mirror import CalendarMirror
+
+
+def seed(fake, n_events, days, tz):
+    base = tz.localize(datetime.now().replace(hour=9, minute=0, second=0, microsecond=0))
+    for i in range(n_events):
+        start = base + timedelta(days=i % days, minutes=30 * (i % 16))
+        fake._insert({
+            "summary": f"Event {i}",
+            "start": {"dateTime": start.isoformat(), "timeZone": tz.zone},
+            "end": {"dateTime": (start + timedelta(minutes=30)).isoformat(), "timeZone": tz.zone},
+        })
+    return base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    tz = pytz.timezone("Asia/Kolkata")
+    fake = FakeCalendarService()
+    base = seed(fake, args.events, args.days, tz)
+
+    @contextmanager
+    def provider():
+        yield fake
+
+    mirror = CalendarMirror(calendar_id="fake", max_staleness=3600, service_provider=provider, page_size=250)
+
+    t0 = time.perf_counter()
+    mirror.sync()
+    full_ms = (time.perf_counter() - t0) * 1000
+
+    # ✏️ Mutate behind the mirror's back: insert, move and cancel
+    events = fake.events()
+    created = events.insert(calendarId="fake", body={
+        "summary": "Added later",
+        "start": {"dateTime": base.isoformat()},
+        "end": {"dateTime": (base + timedelta(hours=1)).isoformat()},
+    }).execute()
+    events.patch(calendarId="fake", eventId="evt2", body={"summary": "Renamed"}).execute()
+    events.delete(calendarId="fake", eventId="evt3").execute()
+
+    mirror.mark_stale()
+    calls_before = mirror.api_calls
+    t0 = time.perf_counter()
+    day = mirror.events_between(base - timedelta(hours=9), base + timedelta(hours=15))
+    delta_ms = (time.perf_counter() - t0) * 1000
+
+    ids = {e["id"] for e in day}
+    assert created["id"] in ids, "inserted event missing from mirror"
+    assert "evt3" not in ids, "cancelled event still mirrored"
+    assert mirror.find_by_title("Renamed"), "patched title not mirrored"
+    live = [e for e in fake._events.values() if e.get("status") != "cancelled"]
+    assert mirror.stats()["events"] == len(live), "mirror diverged from source"
+
+    # 🔥 Warm reads
+    t0 = time.perf_counter()
+    for i in range(args.reads):
+        start = base + timedelta(days=i % args.days) - timedelta(hours=9)
+        mirror.events_between(start, start + timedelta(days=1))
+    warm_us = (time.perf_counter() - t0) * 1e6 / args.reads
+
+    print(f"full sync:        {full_ms:8.1f} ms  ({mirror.full_syncs} full, {calls_before} page calls)")
+    print(f"incremental sync: {delta_ms:8.1f} ms  ({mirror.api_calls - calls_before} call)")
+    print(f"warm day read:    {warm_us:8.1f} µs  ({mirror.incremental_syncs - 1} extra syncs over {args.reads} reads)")
+
+    # ♻️ Expired token falls back to a full resync
+    fake.expire_sync_tokens()
+    mirror.sync()
+    assert mirror.full_syncs == 2 and mirror.stats()["events"] == len(live)
+    print(f"stats after 410 resync: {mirror.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Per-message routing cost: compiled intent router vs the old keyword scans.
+
+Reads JSONL messages (one {"message": ...} object per line, the same shape the
+/agent endpoint receives), checks that the one-pass router finds exactly the
+intents the old `any(kw in text for kw in [...])` scans would, then times both,
+plus the date/title regexes as string patterns vs precompiled.
+
+    python benchmarks/bench_router.py --input benchmarks/messages.jsonl --rounds 2000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import intent_router
+from intent_router import INTENT_KEYWORDS, classify
+
+DEFAULT_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "messages.jsonl")
+
+# (string pattern, compiled pattern, applies to lowercased text?)
+PATTERNS = [
+    (r"['\"](.+?)['\"]", intent_router.QUOTED_TITLE, False),
+    (r"(?:reschedule|change)\s+(.*?)\s+to", intent_router.RESCHEDULE_TITLE, True),
+    (r"(?:delete|remove|cancel)\s+(.*?)($|from|on)", intent_router.DELETE_TITLE, True),
+    (r"\bto\s+(.+)", intent_router.TO_CLAUSE, True),
+    (r"(?:from|on)\s+(.+)", intent_router.FROM_ON_CLAUSE, True),
+    (intent_router.DAY_MONTH.pattern, intent_router.DAY_MONTH, True),
+    (r"\b(20\d{2}-\d{2}-\d{2})\b", intent_router.ISO_DATE, False),
+    (r"\b(\d{1,2}(:\d{2})?\s*(am|pm))\b", intent_router.TIME_OF_DAY, True),
+    (r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+", intent_router.EMAIL, False),
+]
+
+
+def legacy_classify(text_lower):
+    return {intent for intent, keywords in INTENT_KEYWORDS.items() if any(kw in text_lower for kw in keywords)}
+
+
+def legacy_patterns(text, text_lower):
+    for pattern, _, lower in PATTERNS:
+        re.search(pattern, text_lower if lower else text)
+
+
+def compiled_patterns(text, text_lower):
+    for _, compiled, lower in PATTERNS:
+        compiled.search(text_lower if lower else text)
+
+
+def load_messages(path):
+    with open(path) as f:
+        return [json.loads(line)["message"] for line in f if line.strip()]
+
+
+def time_per_message(fn, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text, text_lower in messages:
+            fn(text, text_lower)
+    return (time.perf_counter() - start) / (rounds * len(messages)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=DEFAULT_INPUT)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    messages = [(m, m.lower()) for m in load_messages(args.input)]
+    mismatches = [text for text, lower in messages if classify(lower) != legacy_classify(lower)]
+    if mismatches:
+        raise SystemExit(f"❌ Router disagrees with keyword scans on: {mismatches}")
+    print(f"✅ {len(messages)} messages, router intents match the keyword scans")
+
+    results = [
+        ("keyword scans (old)", lambda text, lower: legacy_classify(lower)),
+        ("compiled router", lambda text, lower: classify(lower)),
+        ("regex from strings (old)", legacy_patterns),
+        ("precompiled regex", compiled_patterns),
+    ]
+    for label, fn in results:
+        print(f"{label:<26} {time_per_message(fn, messages, args.rounds):8.2f} µs/message")
+
+
+if __name__ == "__main__":
+    main()
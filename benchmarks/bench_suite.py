@@ -0,0 +1,308 @@
+"""
+Offline benchmark suite for the calendar tools and the agent.
+
+Seeds the in-process fake calendar with `--density` events per working day
+for `--days` days, adds `--latency` seconds to every simulated API round
+trip, then times each scenario `--iterations` times:
+
+    get_free_slots      calendar_utils.get_free_slots(date)
+    check_availability  the CheckAvailability tool
+    book_meeting        booking a free slot (the booking is removed untimed)
+    reschedule_meeting  moving an existing meeting to another free slot
+    delete_event        deleting a meeting by title and date
+    run_agent           a whole chat: book, title, reschedule, delete
+
+Reports p50 / p95 / p99 latency, throughput and peak allocations per
+operation (from a separate tracemalloc pass, so tracing doesn't skew the
+timings). By default the event cache is cleared before each timed call so
+every operation pays its calendar fetches; `--warm` keeps it.
+
+    python benchmarks/bench_suite.py --latency 0.05 --density 8 --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_suite.py --latency 0.05 --density 8 --baseline benchmarks/baseline.json
+
+With `--baseline`, results are compared against a stored run and the script
+exits non-zero when p50, p95 or allocations regress by more than `--tolerance`.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_CALENDAR_ID", "primary")
+
+import pytz
+
+from benchmarks.fake_calendar import FakeCalendarService, FakeCredentials
+import agent
+import async_calendar
+import calendar_client
+import calendar_utils
+
+# Lower is better for all of these. Only GATED ones fail a run: p99 of a few dozen
+# samples is close to the maximum and swings with GC pauses, and throughput follows p50
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "alloc_kb")
+GATED = ("p50_ms", "p95_ms", "alloc_kb")
+SCENARIOS = {}
+
+
+def scenario(fn):
+    """
+    Register a scenario. It is a generator taking (bench, i): code before the
+    first `yield` is untimed setup, the yielded callable is the timed
+    operation, and the operation's result is sent back in for checks and
+    untimed cleanup.
+    """
+    SCENARIOS[fn.__name__] = fn
+    return fn
+
+
+class Bench:
+    """Seeded calendar days and helpers shared by the scenarios."""
+
+    def __init__(self, fake, days, timezone="Asia/Kolkata"):
+        self.fake = fake
+        self.tz = pytz.timezone(timezone)
+        # Start tomorrow so no booking lands in the past
+        first = datetime.now(self.tz).date() + timedelta(days=1)
+        self.dates = [(first + timedelta(days=d)).isoformat() for d in range(days)]
+        self.api_calls = 0  # made by timed operations only
+
+    def date(self, i):
+        # Scenarios take the date as a string, as the tools do
+        return self.dates[i % len(self.dates)]
+
+    def free_times(self, date, count=1):
+        """The first `count` free half-hour slots of a day, as "3:30 PM" strings."""
+        day = calendar_utils.get_day_slots(date)
+        times = [start.strftime("%I:%M %p").lstrip("0") for start, _, is_busy in day if not is_busy][:count]
+        if len(times) < count:
+            raise RuntimeError(f"{date} has fewer than {count} free slots; lower --density")
+        return times
+
+
+def expect(result, ok):
+    if not ok:
+        raise RuntimeError(f"unexpected result: {str(result)[:200]}")
+
+
+@scenario
+def get_free_slots(bench, i):
+    slots = yield lambda: calendar_utils.get_free_slots(bench.date(i))
+    expect(slots, not slots[0].get("note", "").startswith("❌ Failed"))
+
+
+@scenario
+def check_availability(bench, i):
+    reply = yield lambda: agent.check_availability(bench.date(i))
+    expect(reply, not reply.startswith("❌"))
+
+
+@scenario
+def book_meeting(bench, i):
+    date, title = bench.date(i), f"Bench booking {i}"
+    (at,) = bench.free_times(date)
+    reply = yield lambda: agent.book_meeting(at, date=date, summary=title)
+    expect(reply, reply.startswith("✅"))
+    calendar_utils.delete_event(title, date)
+
+
+@scenario
+def reschedule_meeting(bench, i):
+    date, title = bench.date(i), f"Bench reschedule {i}"
+    at, new_at = bench.free_times(date, 2)
+    agent.book_meeting(at, date=date, summary=title)
+    reply = yield lambda: agent.reschedule_meeting(title, date, new_at)
+    expect(reply, reply.startswith("🔁"))
+    calendar_utils.delete_event(title, date)
+
+
+@scenario
+def delete_event(bench, i):
+    date, title = bench.date(i), f"Bench delete {i}"
+    (at,) = bench.free_times(date)
+    agent.book_meeting(at, date=date, summary=title)
+    reply = yield lambda: calendar_utils.delete_event(title, date)
+    expect(reply, reply.startswith("🗑️"))
+
+
+@scenario
+def run_agent(bench, i):
+    date, title = bench.date(i), f"Bench flow {i}"
+    at, new_at = bench.free_times(date, 2)
+    messages = [
+        f"Book a meeting on {date} at {at}",
+        title,
+        f"Reschedule '{title}' to {date} at {new_at}",
+        f"Delete '{title}' on {date}",
+    ]
+    replies = yield lambda: [agent.run_agent(message, session_id=f"bench-{i}") for message in messages]
+    expect(replies, replies[-1].startswith("🗑️"))
+
+
+# ------------------------------
+# ⏱️ Running and measuring
+# ------------------------------
+def run_once(bench, fn, i, cold, measure=None):
+    """Run one iteration; returns seconds spent in the timed operation (or `measure`'s result)."""
+    steps = fn(bench, i)
+    operation = next(steps)
+    if cold:
+        calendar_utils.event_cache.clear()
+    calls = bench.fake.call_count()
+    if measure is None:
+        started = time.perf_counter()
+        result = operation()
+        value = time.perf_counter() - started
+    else:
+        result, value = measure(operation)
+    bench.api_calls += bench.fake.call_count() - calls
+    try:
+        steps.send(result)
+    except StopIteration:
+        pass
+    return value
+
+
+def peak_allocation(operation):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = operation()
+    return result, tracemalloc.get_traced_memory()[1] - before
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(bench, name, args):
+    fn = SCENARIOS[name]
+    offset = 0
+    for _ in range(args.warmup):
+        run_once(bench, fn, offset, not args.warm)
+        offset += 1
+
+    timings = []
+    for _ in range(args.iterations):
+        timings.append(run_once(bench, fn, offset, not args.warm))
+        offset += 1
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(args.alloc_iterations):
+            peaks.append(run_once(bench, fn, offset, not args.warm, measure=peak_allocation))
+            offset += 1
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1e3, 3),
+        "p95_ms": round(percentile(timings, 95) * 1e3, 3),
+        "p99_ms": round(percentile(timings, 99) * 1e3, 3),
+        "ops_per_s": round(len(timings) / sum(timings), 1),
+        "alloc_kb": round(statistics.median(peaks) / 1024, 1) if peaks else None,
+    }
+
+
+# ------------------------------
+# 📊 Baselines
+# ------------------------------
+def compare(results, config, baseline, tolerance, noise_ms):
+    """Print changes against a stored run; returns the regressed (scenario, metric) pairs."""
+    if baseline.get("config") != config:
+        print(f"⚠️ Baseline was recorded with different settings: {baseline.get('config')}")
+
+    regressions = []
+    print(f"\n📊 vs baseline ({baseline.get('python', '?')}, tolerance {tolerance:.0%})")
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            print(f"{name:<20} (not in baseline)")
+            continue
+        changes = []
+        for metric in COMPARED:
+            old, new = before.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            # Sub-`noise_ms` differences are timer jitter, not regressions
+            regressed = metric in GATED and change > tolerance and not (metric.endswith("_ms") and new - old < noise_ms)
+            if regressed:
+                regressions.append((name, metric))
+            changes.append(f"{metric} {change:+.0%}{' ❌' if regressed else ''}")
+        print(f"{name:<20} {', '.join(changes)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per calendar API call")
+    parser.add_argument("--density", type=int, default=8, help="Seeded events per day (16 half-hour slots per day)")
+    parser.add_argument("--days", type=int, default=14, help="Days of seeded events the scenarios cycle through")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--alloc-iterations", type=int, default=10, help="Extra runs under tracemalloc")
+    parser.add_argument("--warm", action="store_true", help="Keep the event cache between calls")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these (repeatable)")
+    parser.add_argument("--baseline", help="Compare against this stored run")
+    parser.add_argument("--save-baseline", help="Write this run's results here")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing, e.g. 0.25")
+    parser.add_argument("--noise-ms", type=float, default=0.5, help="Ignore latency changes smaller than this")
+    args = parser.parse_args()
+    if not 0 <= args.density <= 14:
+        parser.error("--density must leave at least two free slots a day (0-14)")
+
+    fake = FakeCalendarService(latency=args.latency)
+    calendar_client.configure_pool(service_factory=lambda: fake)
+    async_calendar.configure_async_client(transport=fake.httpx_transport(), credentials=FakeCredentials())
+
+    bench = Bench(fake, args.days)
+    fake.populate(args.days, args.density, start=date.fromisoformat(bench.dates[0]), timezone=bench.tz.zone)
+
+    config = {
+        "latency": args.latency,
+        "density": args.density,
+        "days": args.days,
+        "iterations": args.iterations,
+        "warm": args.warm,
+    }
+    names = args.scenario or list(SCENARIOS)
+
+    print(f"🧪 {len(fake._events)} seeded events, {args.density}/day over {args.days} days, "
+          f"{args.latency * 1e3:.0f}ms per API call, {'warm' if args.warm else 'cold'} cache")
+    print(f"{'scenario':<20} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>9} {'alloc':>9} {'API calls':>10}")
+    results = {}
+    for name in names:
+        bench.api_calls = 0
+        results[name] = result = run_scenario(bench, name, args)
+        per_iteration = bench.api_calls / (args.warmup + args.iterations + args.alloc_iterations)
+        print(f"{name:<20} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+              f"{result['ops_per_s']:>9.1f} {result['alloc_kb']:>7.1f}KB {per_iteration:>10.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "python": platform.python_version(), "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, config, baseline, args.tolerance, args.noise_ms)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(f'{s}.{m}' for s, m in regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Title lookups: the local title index vs a `q=` search against the calendar API.
+
+Fills the in-process fake calendar with `--events` events spread over the
+next 60 days, then resolves the same titles both ways. `--latency` adds a
+simulated round trip to every API call, which the index never pays after its
+one-off rebuild.
+
+    python benchmarks/bench_title_index.py --events 5000 --latency 0.05
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytz
+
+from benchmarks.fake_calendar import FakeCalendarService
+import calendar_client
+import calendar_utils
+
+TOPICS = ["Marketing", "Design", "Budget", "Hiring", "Roadmap", "Support", "Sales", "Security", "Platform", "Data"]
+KINDS = ["Review", "Sync", "Standup", "Planning", "Retro", "1:1", "Demo", "Workshop"]
+
+# (what the user typed, the title it should resolve to)
+QUERIES = [
+    ("Marketing Review", "Marketing Review"),
+    ("the marketing review", "Marketing Review"),
+    ("budget plan", "Budget Planning"),
+    ("Roadmap Sycn", "Roadmap Sync"),
+    ("security retro", "Security Retro"),
+]
+
+
+def fill(fake, count, tz):
+    rng = random.Random(7)
+    today = tz.localize(datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
+    for i in range(count):
+        start = today + timedelta(days=rng.randrange(1, 60), hours=rng.randrange(9, 17), minutes=rng.choice([0, 30]))
+        fake._insert({
+            "summary": f"{rng.choice(TOPICS)} {rng.choice(KINDS)}",
+            "description": "Agenda and notes " * 20,
+            "start": {"dateTime": start.isoformat(), "timeZone": tz.zone},
+            "end": {"dateTime": (start + timedelta(minutes=30)).isoformat(), "timeZone": tz.zone},
+        })
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return result, statistics.median(samples)
+
+
+def fmt(seconds):
+    return f"{seconds * 1e6:9.1f} µs" if seconds < 1e-3 else f"{seconds * 1e3:9.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000, help="Events in the fake calendar")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per API call")
+    parser.add_argument("--runs", type=int, default=5, help="Repetitions per lookup (median is reported)")
+    args = parser.parse_args()
+
+    tz = pytz.timezone("Asia/Kolkata")
+    fake = FakeCalendarService(latency=args.latency)
+    calendar_client.configure_pool(service_factory=lambda: fake)
+    fill(fake, args.events, tz)
+
+    index = calendar_utils.title_index
+    if index is None:
+        raise SystemExit("Set TITLE_INDEX_ENABLED=true to run this benchmark")
+
+    calls_before = fake.call_count("list")
+    _, rebuild = timed(lambda: calendar_utils.refresh_title_index(force=True), 1)
+    print(f"🔎 {args.events} events, {args.latency * 1000:.0f} ms/API call")
+    print(f"index rebuild: {fmt(rebuild)}  ({fake.call_count('list') - calls_before} list calls, {index.stats()['titles']} titles)")
+    print()
+    print(f"{'query':<24} {'API q= search':>14} {'hits':>5}   {'index':>12} {'hits':>5}  resolved to")
+
+    now = datetime.now(pytz.utc)
+    for query, expected in QUERIES:
+        api_hits, api_time = timed(
+            lambda: calendar_utils.exact_title_matches(calendar_utils.iter_events(time_min=now, q=query), query),
+            args.runs,
+        )
+        indexed, index_time = timed(lambda: index.lookup(query, start=now, end=index.window_end()), args.runs)
+        titles = sorted({e["summary"] for e in indexed})
+        ok = "✅" if titles == [expected] else "❌"
+        print(f"{query:<24} {fmt(api_time)}  {len(api_hits):>5}   {fmt(index_time)} {len(indexed):>5}  {ok} {', '.join(titles) or '-'}")
+
+    print()
+    print(f"stats: {index.stats()}")
+
+
+if __name__ == "__main__":
+    main()
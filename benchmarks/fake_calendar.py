@@ -0,0 +1,370 @@
+"""
+In-process stand-in for the Google Calendar `events` endpoint.
+
+Implements the subset of the discovery client used by this project
+(`service.events().list/get/insert/update/patch/delete(...).execute()` and
+`service.freebusy().query(...)`, plus `new_batch_http_request`), including `pageToken` pagination,
+`fields=` partial responses and `syncToken` incremental sync with cancelled tombstones, so calendar code can
+run without network access. `httpx_transport()` serves the same calendar
+over the REST routes used by the async client. `latency` adds a simulated
+round trip to every request on both paths, and `populate()` seeds days of
+events at a chosen density.
+
+    from calendar_client import configure_pool
+    fake = FakeCalendarService()
+    configure_pool(service_factory=lambda: fake)
+    configure_async_client(transport=fake.httpx_transport(), credentials=FakeCredentials())
+"""
+import asyncio
+import copy
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import unquote
+
+import httplib2
+import httpx
+import pytz
+from dateutil.parser import parse
+from googleapiclient.errors import HttpError
+
+
+def _http_error(status, message):
+    body = json.dumps({"error": {"code": status, "message": message}}).encode()
+    return HttpError(httplib2.Response({"status": status}), body)
+
+
+def _parse(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return parse(value)
+
+
+def _event_bounds(event):
+    start, end = event["start"], event["end"]
+    if "dateTime" in start:
+        return _parse(start["dateTime"]), _parse(end["dateTime"])
+    # All-day events are stored as UTC midnights
+    return parse(start["date"] + "T00:00:00Z"), parse(end["date"] + "T00:00:00Z")
+
+
+def _partial_response(result, fields):
+    """Apply a `fields=` mask of the form "items(a,b,c),topLevel,..." like the real API."""
+    if not fields:
+        return result
+    item_fields = None
+    top_level = set()
+    for part in re.findall(r"\w+(?:\([^)]*\))?", fields):
+        name, _, inner = part.partition("(")
+        top_level.add(name)
+        if name == "items" and inner:
+            item_fields = set(inner.rstrip(")").split(","))
+    masked = {key: value for key, value in result.items() if key in top_level}
+    if "items" in masked and item_fields is not None:
+        masked["items"] = [{k: v for k, v in item.items() if k in item_fields} for item in masked["items"]]
+    return masked
+
+
+class FakeCredentials:
+    """Always-valid stand-in for service-account credentials."""
+    valid = True
+    token = "fake-token"
+
+    def refresh(self, request):
+        pass
+
+
+class FakeRequest:
+    def __init__(self, fn, latency=0.0):
+        self._fn = fn
+        self._latency = latency
+
+    def execute(self, num_retries=0):
+        if self._latency:
+            # Simulated network round trip, outside the calendar lock
+            time.sleep(self._latency)
+        return self._fn()
+
+
+class FakeBatchRequest:
+    """Mimics BatchHttpRequest: one round trip, per-request callbacks."""
+
+    def __init__(self, calendar, callback=None):
+        self._calendar = calendar
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        request_id = request_id if request_id is not None else str(len(self._requests))
+        self._requests.append((request_id, request, callback or self._callback))
+
+    def execute(self):
+        if not self._requests:
+            return
+        self._calendar.calls.append(("batch", {"size": len(self._requests)}))
+        if self._calendar.latency:
+            time.sleep(self._calendar.latency)
+        for request_id, request, callback in self._requests:
+            try:
+                # One round trip for the whole batch, so skip per-request latency
+                response, exception = request._fn(), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback:
+                callback(request_id, response, exception)
+
+
+class FakeEventsResource:
+    def __init__(self, calendar):
+        self._calendar = calendar
+
+    def _request(self, fn):
+        return FakeRequest(fn, self._calendar.latency)
+
+    def list(self, calendarId=None, timeMin=None, timeMax=None, q=None, syncToken=None,
+             pageToken=None, maxResults=250, showDeleted=False, singleEvents=False,
+             orderBy=None, fields=None, **kwargs):
+        return self._request(lambda: self._calendar._list(
+            timeMin, timeMax, q, syncToken, pageToken, maxResults, showDeleted, orderBy, fields
+        ))
+
+    def get(self, calendarId=None, eventId=None, **kwargs):
+        return self._request(lambda: self._calendar._get(eventId))
+
+    def insert(self, calendarId=None, body=None, **kwargs):
+        return self._request(lambda: self._calendar._insert(body))
+
+    def update(self, calendarId=None, eventId=None, body=None, **kwargs):
+        return self._request(lambda: self._calendar._update(eventId, body, replace=True))
+
+    def patch(self, calendarId=None, eventId=None, body=None, **kwargs):
+        return self._request(lambda: self._calendar._update(eventId, body, replace=False))
+
+    def delete(self, calendarId=None, eventId=None, **kwargs):
+        return self._request(lambda: self._calendar._delete(eventId))
+
+
+class FakeFreeBusyResource:
+    def __init__(self, calendar):
+        self._calendar = calendar
+
+    def query(self, body=None, **kwargs):
+        return FakeRequest(lambda: self._calendar._freebusy(body), self._calendar.latency)
+
+
+class FakeCalendarService:
+    """A single shared calendar; safe to hand the same instance to every pooled borrower."""
+
+    def __init__(self, events=None, latency=0.0):
+        self.latency = latency  # seconds added to every request, sync or async
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._seq = 0
+        self._events = {}
+        self._changes = {}  # event id -> seq of its last change
+        self._token_epoch = 0
+        self._other_busy = {}  # attendee calendar id -> [(start, end)]
+        self.calls = []
+        for event in events or []:
+            self._insert(event)
+
+    # 🔌 Discovery-client surface
+    def events(self):
+        return FakeEventsResource(self)
+
+    def freebusy(self):
+        return FakeFreeBusyResource(self)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatchRequest(self, callback)
+
+    def close(self):
+        pass
+
+    def httpx_transport(self):
+        """An httpx.MockTransport answering the Calendar REST routes from this fake."""
+        def handler(request: httpx.Request):
+            parts = [unquote(p) for p in request.url.path.split("/") if p][2:]  # drop "calendar", "v3"
+            params = dict(request.url.params)
+            body = json.loads(request.content) if request.content else None
+            try:
+                if parts == ["freeBusy"]:
+                    return httpx.Response(200, json=self._freebusy(body))
+                if len(parts) == 3 and parts[2] == "events":
+                    if request.method == "GET":
+                        return httpx.Response(200, json=self._list(
+                            params.get("timeMin"), params.get("timeMax"), params.get("q"), params.get("syncToken"),
+                            params.get("pageToken"), int(params.get("maxResults", 250)),
+                            params.get("showDeleted") == "true", params.get("orderBy"), params.get("fields")
+                        ))
+                    return httpx.Response(200, json=self._insert(body))
+                if len(parts) == 4 and parts[2] == "events":
+                    event_id = parts[3]
+                    if request.method == "GET":
+                        return httpx.Response(200, json=self._get(event_id))
+                    if request.method in ("PUT", "PATCH"):
+                        return httpx.Response(200, json=self._update(event_id, body, replace=request.method == "PUT"))
+                    if request.method == "DELETE":
+                        self._delete(event_id)
+                        return httpx.Response(204)
+            except HttpError as e:
+                return httpx.Response(e.resp.status, content=e.content)
+            return httpx.Response(404, json={"error": {"code": 404, "message": "Unknown route"}})
+
+        async def delayed_handler(request: httpx.Request):
+            await asyncio.sleep(self.latency)
+            return handler(request)
+
+        return httpx.MockTransport(delayed_handler if self.latency else handler)
+
+    # 🧰 Test helpers
+    def call_count(self, method=None):
+        return sum(1 for name, _ in self.calls if method is None or name == method)
+
+    def add_busy(self, calendar_id, start, end):
+        """Register a busy block on another (attendee) calendar for FreeBusy queries."""
+        with self._lock:
+            self._other_busy.setdefault(calendar_id, []).append((start, end))
+
+    def populate(self, days, per_day, start=None, timezone="Asia/Kolkata", work_hours=(9, 17), seed=0):
+        """
+        Seed `per_day` half-hour events on each of `days` days from `start`
+        (a date; default today), at random distinct slots within working hours.
+        Returns the seeded events. Not recorded in `calls`.
+        """
+        tz = pytz.timezone(timezone)
+        rng = random.Random(seed)
+        first = start or datetime.now(tz).date()
+        slots = list(range(int((work_hours[1] - work_hours[0]) * 2)))
+        seeded = []
+        with self._lock:
+            calls = len(self.calls)
+            for d in range(days):
+                day = tz.localize(datetime.combine(first + timedelta(days=d), datetime.min.time()))
+                for slot in sorted(rng.sample(slots, min(per_day, len(slots)))):
+                    begin = day + timedelta(hours=work_hours[0], minutes=30 * slot)
+                    seeded.append(self._insert({
+                        "summary": f"Seeded {d}-{slot}",
+                        "description": "Agenda and notes " * 10,
+                        "start": {"dateTime": begin.isoformat(), "timeZone": tz.zone},
+                        "end": {"dateTime": (begin + timedelta(minutes=30)).isoformat(), "timeZone": tz.zone},
+                    }))
+            del self.calls[calls:]
+        return seeded
+
+    def expire_sync_tokens(self):
+        """Make every previously issued sync token return 410 Gone."""
+        with self._lock:
+            self._token_epoch += 1
+
+    # 📋 Endpoint implementations
+    def _bump(self, event_id):
+        self._seq += 1
+        self._changes[event_id] = self._seq
+
+    def _list(self, time_min, time_max, q, sync_token, page_token, max_results, show_deleted, order_by, fields=None):
+        with self._lock:
+            self.calls.append(("list", {"timeMin": time_min, "timeMax": time_max, "q": q, "syncToken": sync_token, "pageToken": page_token}))
+
+            if sync_token is not None:
+                epoch, _, since = sync_token.partition("-")
+                if int(epoch) != self._token_epoch:
+                    raise _http_error(410, "Sync token is no longer valid, a full sync is required.")
+                items = [e for e in self._events.values() if self._changes[e["id"]] > int(since)]
+            else:
+                items = [e for e in self._events.values() if show_deleted or e.get("status") != "cancelled"]
+
+            if time_min or time_max:
+                lo = parse(time_min) if time_min else None
+                hi = parse(time_max) if time_max else None
+                items = [
+                    e for e in items
+                    if (hi is None or _event_bounds(e)[0] < hi) and (lo is None or _event_bounds(e)[1] > lo)
+                ]
+            if q:
+                needle = q.lower()
+                items = [e for e in items if needle in e.get("summary", "").lower()]
+            if order_by == "startTime":
+                items.sort(key=lambda e: _event_bounds(e)[0])
+
+            offset = int(page_token or 0)
+            page = items[offset:offset + max_results]
+            result = {"items": copy.deepcopy(page)}
+            if offset + max_results < len(items):
+                result["nextPageToken"] = str(offset + max_results)
+            else:
+                result["nextSyncToken"] = f"{self._token_epoch}-{self._seq}"
+            return _partial_response(result, fields)
+
+    def _freebusy(self, body):
+        with self._lock:
+            self.calls.append(("freebusy", {"items": len(body["items"])}))
+            lo, hi = parse(body["timeMin"]), parse(body["timeMax"])
+            calendars = {}
+            for item in body["items"]:
+                calendar_id = item["id"]
+                if calendar_id in self._other_busy:
+                    blocks = self._other_busy[calendar_id]
+                elif "@" in calendar_id and not calendar_id.endswith("calendar.google.com"):
+                    calendars[calendar_id] = {"busy": [], "errors": [{"domain": "global", "reason": "notFound"}]}
+                    continue
+                else:
+                    # Any other id is treated as this fake's own calendar
+                    blocks = [
+                        _event_bounds(e) for e in self._events.values()
+                        if e.get("status") != "cancelled" and "dateTime" in e["start"]
+                    ]
+                calendars[calendar_id] = {"busy": [
+                    {"start": start.isoformat(), "end": end.isoformat()}
+                    for start, end in sorted(blocks) if start < hi and end > lo
+                ]}
+            return {"kind": "calendar#freeBusy", "calendars": calendars}
+
+    def _get(self, event_id):
+        with self._lock:
+            self.calls.append(("get", {"eventId": event_id}))
+            event = self._events.get(event_id)
+            if event is None:
+                raise _http_error(404, "Not Found")
+            return copy.deepcopy(event)
+
+    def _insert(self, body):
+        with self._lock:
+            self.calls.append(("insert", {}))
+            event = copy.deepcopy(body)
+            event["id"] = event.get("id") or f"evt{next(self._ids)}"
+            event.setdefault("status", "confirmed")
+            event["updated"] = datetime.utcnow().isoformat() + "Z"
+            self._events[event["id"]] = event
+            self._bump(event["id"])
+            return copy.deepcopy(event)
+
+    def _update(self, event_id, body, replace):
+        with self._lock:
+            self.calls.append(("update" if replace else "patch", {"eventId": event_id}))
+            current = self._events.get(event_id)
+            if current is None or current.get("status") == "cancelled":
+                raise _http_error(404, "Not Found")
+            event = copy.deepcopy(body) if replace else {**current, **copy.deepcopy(body)}
+            event["id"] = event_id
+            event.setdefault("status", "confirmed")
+            event["updated"] = datetime.utcnow().isoformat() + "Z"
+            self._events[event_id] = event
+            self._bump(event_id)
+            return copy.deepcopy(event)
+
+    def _delete(self, event_id):
+        with self._lock:
+            self.calls.append(("delete", {"eventId": event_id}))
+            current = self._events.get(event_id)
+            if current is None or current.get("status") == "cancelled":
+                raise _http_error(410, "Resource has been deleted")
+            # Keep a tombstone so incremental syncs can report the cancellation
+            self._events[event_id] = {"id": event_id, "status": "cancelled", "start": current["start"], "end": current["end"]}
+            self._bump(event_id)
+            return ""
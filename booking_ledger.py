@@ -0,0 +1,96 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class SlotUnavailableError(Exception):
+    """Raised when a requested time overlaps a booking that is in flight or already made."""
+
+    def __init__(self, start: datetime, end: datetime, reason="already booked"):
+        self.start = start
+        self.end = end
+        super().__init__(
+            f"The slot {start.strftime('%Y-%m-%d %I:%M %p')} to {end.strftime('%I:%M %p')} is {reason}. "
+            f"Please check availability and pick another time."
+        )
+
+
+# ------------------------------
+# 🔒 In-process reservation ledger for optimistic booking
+# ------------------------------
+class ReservationLedger:
+    """
+    Short-lived claims on time ranges, checked before any API call.
+
+    A booking first `reserve()`s its interval: if it overlaps another live
+    entry the request is rejected immediately. While holding the reservation
+    the caller re-checks the calendar and inserts; then it either `commit()`s
+    (the entry stays for `commit_ttl` seconds, covering reads of a day cached
+    just before the insert landed) or `release()`s on failure. Holds expire on
+    their own after `hold_ttl` in case a caller dies mid-booking.
+    """
+
+    def __init__(self, hold_ttl=30, commit_ttl=60):
+        self.hold_ttl = hold_ttl
+        self.commit_ttl = commit_ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # token -> [calendar_id, start, end, expires_at, event_id]
+        self._tokens = itertools.count(1)
+        self.rejections = 0
+
+    def _purge(self, now):
+        for token in [t for t, entry in self._entries.items() if entry[3] <= now]:
+            del self._entries[token]
+
+    def reserve(self, calendar_id, start: datetime, end: datetime) -> int:
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            for other_calendar, other_start, other_end, _, event_id in self._entries.values():
+                if other_calendar == calendar_id and other_start < end and start < other_end:
+                    self.rejections += 1
+                    raise SlotUnavailableError(start, end, "already booked" if event_id else "being booked right now")
+            token = next(self._tokens)
+            self._entries[token] = [calendar_id, start, end, now + self.hold_ttl, None]
+            return token
+
+    def commit(self, token: int, event_id: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                entry[3] = time.monotonic() + self.commit_ttl
+                entry[4] = event_id
+
+    def release(self, token: int):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def forget_event(self, event_id: str):
+        """Drop the committed entry of an event that was moved or deleted."""
+        with self._lock:
+            for token in [t for t, entry in self._entries.items() if entry[4] == event_id]:
+                del self._entries[token]
+
+    @contextmanager
+    def hold(self, calendar_id, start: datetime, end: datetime):
+        """Reserve for the duration of the block; call `commit(token, event_id)` inside to keep it."""
+        token = self.reserve(calendar_id, start, end)
+        try:
+            yield token
+        finally:
+            with self._lock:
+                entry = self._entries.get(token)
+                if entry is not None and entry[4] is None:
+                    del self._entries[token]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge(time.monotonic())
+            committed = sum(1 for entry in self._entries.values() if entry[4])
+            return {
+                "holds": len(self._entries) - committed,
+                "recent_bookings": committed,
+                "rejections": self.rejections,
+            }
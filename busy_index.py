@@ -0,0 +1,113 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import numpy as np
+from dateutil.parser import parse
+
+
+# ------------------------------
+# ⏱️ Sorted, merged busy intervals
+# ------------------------------
+class BusyIndex:
+    """
+    Busy time built once per fetched event set.
+
+    Intervals are sorted and merged on construction, so they never overlap and
+    both starts and ends are ascending. That gives O(log n) overlap checks via
+    bisect and a single linear sweep for free gaps.
+    """
+
+    def __init__(self, intervals=()):
+        merged = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+        self._epochs = None
+
+    @classmethod
+    def from_events(cls, events, tz):
+        """Build from Calendar API event dicts; all-day events don't block time slots."""
+        intervals = []
+        for event in events:
+            if 'dateTime' in event['start']:
+                busy_start = parse(event['start']['dateTime']).astimezone(tz)
+                busy_end = parse(event['end']['dateTime']).astimezone(tz)
+                intervals.append((busy_start, busy_end))
+        return cls(intervals)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends))
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """True if [start, end) intersects any busy interval."""
+        # The only candidate is the last interval starting before `end`
+        i = bisect_left(self._starts, end) - 1
+        return i >= 0 and self._ends[i] > start
+
+    def between(self, window_start: datetime, window_end: datetime):
+        """Yield the (start, end) busy intervals that overlap the window, in order."""
+        i = bisect_left(self._ends, window_start)
+        while i < len(self._starts) and self._ends[i] <= window_start:
+            i += 1
+        while i < len(self._starts) and self._starts[i] < window_end:
+            yield self._starts[i], self._ends[i]
+            i += 1
+
+    def free_gaps(self, window_start: datetime, window_end: datetime):
+        """Yield (start, end) free gaps inside the window, in order."""
+        cursor = window_start
+        i = bisect_left(self._ends, window_start)
+        # Skip intervals that finished at or before the window opens
+        while i < len(self._starts) and self._ends[i] <= window_start:
+            i += 1
+        while i < len(self._starts) and self._starts[i] < window_end:
+            if self._starts[i] > cursor:
+                yield cursor, self._starts[i]
+            cursor = max(cursor, self._ends[i])
+            i += 1
+        if cursor < window_end:
+            yield cursor, window_end
+
+    def slots(self, window_start: datetime, window_end: datetime, slot_minutes=30):
+        """Yield (slot_start, slot_end, is_busy) for fixed-size slots across the window."""
+        step = timedelta(minutes=slot_minutes)
+        i = 0
+        current = window_start
+        while current < window_end:
+            slot_end = current + step
+            # Slots advance monotonically, so the sweep pointer never moves back
+            while i < len(self._ends) and self._ends[i] <= current:
+                i += 1
+            is_busy = i < len(self._starts) and self._starts[i] < slot_end
+            yield current, slot_end, is_busy
+            current = slot_end
+
+    def busy_mask(self, slot_starts, slot_ends):
+        """
+        Vectorized overlap test for any-shaped arrays of POSIX timestamps.
+        Returns a boolean array of the same shape, True where a slot is busy.
+        """
+        if self._epochs is None:
+            self._epochs = (
+                np.array([start.timestamp() for start in self._starts], dtype=np.float64),
+                np.array([end.timestamp() for end in self._ends], dtype=np.float64),
+            )
+        starts, ends = self._epochs
+        if not len(starts):
+            return np.zeros(np.shape(slot_starts), dtype=bool)
+
+        # First busy interval still running at each slot start; busy if it begins before the slot ends
+        i = np.searchsorted(ends, slot_starts, side="right")
+        candidate = np.minimum(i, len(starts) - 1)
+        return (i < len(starts)) & (starts[candidate] < slot_ends)
@@ -0,0 +1,164 @@
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+import httplib2
+import google_auth_httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+
+from config import GOOGLE_SERVICE_ACCOUNT_FILE
+from log_setup import get_logger
+
+log = get_logger("calendar_client")
+
+CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar']
+# Event attributes this app reads; list calls ask for only these (partial response)
+EVENT_FIELDS = "id,summary,start,end,status"
+
+
+# ------------------------------
+# 🔌 Pooled Google Calendar clients
+# ------------------------------
+class CalendarClientPool:
+    """
+    Thread-safe pool of authorized Calendar service objects.
+
+    Credentials are loaded once and reused until the token expires. Every pooled
+    service owns its own HTTP transport, since httplib2 connections must not be
+    shared between threads.
+    """
+
+    def __init__(self, service_account_file=None, max_size=8, borrow_timeout=30, http_timeout=30, service_factory=None):
+        self.service_account_file = service_account_file or GOOGLE_SERVICE_ACCOUNT_FILE
+        self.max_size = max_size
+        self.borrow_timeout = borrow_timeout
+        self.http_timeout = http_timeout
+        self._service_factory = service_factory or self._build_service
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = LifoQueue()
+        self._credentials = None
+        self._generation = 0
+        self._closed = False
+
+    # 🔑 Shared credentials, refreshed only when the token is missing or expired
+    def _get_credentials(self):
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    self.service_account_file,
+                    scopes=CALENDAR_SCOPES
+                )
+            credentials = self._credentials
+
+            if not credentials.valid:
+                credentials.refresh(google_auth_httplib2.Request(httplib2.Http(timeout=self.http_timeout)))
+            return credentials
+
+    def _build_service(self):
+        authorized_http = google_auth_httplib2.AuthorizedHttp(
+            self._get_credentials(),
+            http=httplib2.Http(timeout=self.http_timeout)
+        )
+        return build('calendar', 'v3', http=authorized_http, cache_discovery=False)
+
+    @contextmanager
+    def borrow(self):
+        """Borrow a service for the duration of a `with` block."""
+        if self._closed:
+            raise RuntimeError("Calendar client pool has been shut down.")
+        if not self._slots.acquire(timeout=self.borrow_timeout):
+            raise TimeoutError(f"No calendar client available after {self.borrow_timeout}s.")
+
+        service = None
+        generation = self._generation
+        try:
+            try:
+                generation, service = self._idle.get_nowait()
+            except Empty:
+                service = self._service_factory()
+
+            if self._service_factory == self._build_service:
+                # ♻️ Make sure the shared token is still valid before handing it out
+                self._get_credentials()
+
+            yield service
+        finally:
+            if service is not None:
+                if generation == self._generation and not self._closed:
+                    self._idle.put((generation, service))
+                else:
+                    _close_service(service)
+            self._slots.release()
+
+    def refresh(self):
+        """Drop cached credentials and idle services; next borrow rebuilds them."""
+        with self._lock:
+            self._credentials = None
+            self._generation += 1
+        self._drain_idle()
+
+    def shutdown(self):
+        """Close every idle transport and refuse further borrows."""
+        self._closed = True
+        self._drain_idle()
+
+    def _drain_idle(self):
+        while True:
+            try:
+                _, service = self._idle.get_nowait()
+            except Empty:
+                return
+            _close_service(service)
+
+
+def _close_service(service):
+    close = getattr(service, "close", None)
+    if close:
+        try:
+            close()
+        except Exception as e:
+            log.error("Failed to close calendar service: %s", e)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> CalendarClientPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = CalendarClientPool()
+        return _pool
+
+
+def configure_pool(**kwargs) -> CalendarClientPool:
+    """Replace the process-wide pool (e.g. to change its size or plug in a fake service)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = CalendarClientPool(**kwargs)
+        return _pool
+
+
+# 📌 Borrow an authorized Calendar service from the process-wide pool
+@contextmanager
+def calendar_service():
+    with get_pool().borrow() as service:
+        yield service
+
+
+def refresh_pool():
+    get_pool().refresh()
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
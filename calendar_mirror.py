@@ -0,0 +1,195 @@
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import pytz
+from dateutil.parser import parse
+from googleapiclient.errors import HttpError
+
+from config import GOOGLE_CALENDAR_ID
+from calendar_client import calendar_service, EVENT_FIELDS
+from tracing import span
+from log_setup import get_logger
+
+log = get_logger("calendar_mirror")
+
+
+def _parse_datetime(value: str) -> datetime:
+    # RFC3339 from the API parses with the stdlib fast path; dateutil covers the rest
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return parse(value)
+
+
+# ------------------------------
+# 🪞 Local mirror of a calendar kept current with sync tokens
+# ------------------------------
+class CalendarMirror:
+    """
+    In-memory copy of one calendar.
+
+    The first `sync()` pulls every event and stores the returned `nextSyncToken`.
+    Later syncs send only that token, so Google returns just the events that
+    changed (cancelled ones included). Reads call `ensure_fresh()`, which syncs
+    only when the last sync is older than `max_staleness` seconds or a local
+    write marked the mirror stale.
+    """
+
+    def __init__(self, calendar_id=None, max_staleness=30, timezone="Asia/Kolkata", service_provider=None, page_size=2500):
+        self.calendar_id = calendar_id or GOOGLE_CALENDAR_ID
+        self.max_staleness = max_staleness
+        self.tz = pytz.timezone(timezone)
+        self.page_size = page_size
+        self._service_provider = service_provider or calendar_service
+
+        self._lock = threading.RLock()
+        self._events = {}
+        self._timeline = None  # sorted [(start, end, id)], rebuilt lazily
+        self._longest = timedelta(0)
+        self._sync_token = None
+        self._last_sync = None
+        self._stale = True
+
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.api_calls = 0
+
+    # 🔄 Sync
+    def sync(self):
+        with self._lock:
+            if self._sync_token is None:
+                self._full_sync()
+                return
+            try:
+                self._pull(sync_token=self._sync_token)
+                self.incremental_syncs += 1
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                # 410 Gone: token expired server-side, start over
+                log.debug("Sync token expired, running full calendar sync")
+                self._full_sync()
+
+    def _full_sync(self):
+        self._events = {}
+        self._timeline = None
+        self._sync_token = None
+        self._pull(sync_token=None)
+        self.full_syncs += 1
+
+    def _pull(self, sync_token):
+        page_token = None
+        changed = 0
+        with self._service_provider() as service:
+            while True:
+                params = {
+                    "calendarId": self.calendar_id,
+                    "singleEvents": True,
+                    "maxResults": self.page_size,
+                    "fields": f"items({EVENT_FIELDS}),nextPageToken,nextSyncToken",
+                }
+                if sync_token:
+                    params["syncToken"] = sync_token
+                if page_token:
+                    params["pageToken"] = page_token
+
+                with span("calendar_fetch", source="mirror_sync"):
+                    result = service.events().list(**params).execute()
+                self.api_calls += 1
+
+                for event in result.get("items", []):
+                    self._apply(event)
+                    changed += 1
+
+                page_token = result.get("nextPageToken")
+                if not page_token:
+                    self._sync_token = result.get("nextSyncToken")
+                    break
+
+        self._last_sync = time.monotonic()
+        self._stale = False
+        log.debug("Calendar mirror synced: %s changed, %s total", changed, len(self._events))
+
+    def _apply(self, event):
+        if event.get("status") == "cancelled":
+            self._events.pop(event["id"], None)
+        else:
+            self._events[event["id"]] = event
+        self._timeline = None
+
+    def ensure_fresh(self):
+        with self._lock:
+            age = None if self._last_sync is None else time.monotonic() - self._last_sync
+            if self._stale or age is None or age > self.max_staleness:
+                self.sync()
+
+    def mark_stale(self):
+        """Force the next read to pick up deltas (e.g. after one of our own writes)."""
+        with self._lock:
+            self._stale = True
+
+    # 🔍 Reads
+    def _bounds(self, event):
+        start, end = event["start"], event["end"]
+        if "dateTime" in start:
+            return _parse_datetime(start["dateTime"]), _parse_datetime(end["dateTime"])
+        return (
+            self.tz.localize(datetime.strptime(start["date"], "%Y-%m-%d")),
+            self.tz.localize(datetime.strptime(end["date"], "%Y-%m-%d")),
+        )
+
+    def _get_timeline(self):
+        if self._timeline is None:
+            timeline = []
+            longest = timedelta(0)
+            for event_id, event in self._events.items():
+                start, end = self._bounds(event)
+                timeline.append((start, end, event_id))
+                longest = max(longest, end - start)
+            timeline.sort(key=lambda item: item[0])
+            self._timeline = timeline
+            self._longest = longest
+        return self._timeline
+
+    def events_between(self, start: datetime, end: datetime):
+        """Events overlapping [start, end), ordered by start time."""
+        self.ensure_fresh()
+        with self._lock:
+            timeline = self._get_timeline()
+            # Nothing starting earlier than (start - longest event) can still be running at `start`
+            i = bisect_left(timeline, start - self._longest, key=lambda item: item[0])
+            matched = []
+            while i < len(timeline) and timeline[i][0] < end:
+                ev_start, ev_end, event_id = timeline[i]
+                if ev_end > start:
+                    matched.append(self._events[event_id])
+                i += 1
+            return matched
+
+    def find_by_title(self, title: str, after: datetime = None):
+        """
+        Events whose summary equals `title` (case-insensitive) and that end
+        after `after`, ordered by start. Like the API's timeMin, this keeps a
+        meeting that is already in progress.
+        """
+        self.ensure_fresh()
+        needle = title.strip().lower()
+        with self._lock:
+            return [
+                self._events[event_id]
+                for _, end, event_id in self._get_timeline()
+                if (after is None or end > after)
+                and self._events[event_id].get("summary", "").strip().lower() == needle
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "events": len(self._events),
+                "full_syncs": self.full_syncs,
+                "incremental_syncs": self.incremental_syncs,
+                "api_calls": self.api_calls,
+                "seconds_since_sync": None if self._last_sync is None else round(time.monotonic() - self._last_sync, 1),
+            }
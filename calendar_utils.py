@@ -1,96 +1,474 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from datetime import datetime, timedelta
 from dateutil.parser import parse
+import itertools
+import numpy as np
 import pytz
 
-from config import GOOGLE_CALENDAR_ID, GOOGLE_SERVICE_ACCOUNT_FILE
+from config import (
+    GOOGLE_CALENDAR_ID, EVENT_CACHE_TTL_SECONDS, EVENT_CACHE_MAX_DAYS,
+    CALENDAR_MIRROR_ENABLED, CALENDAR_MIRROR_MAX_STALENESS_SECONDS,
+    TITLE_INDEX_ENABLED, TITLE_INDEX_REFRESH_SECONDS, TITLE_INDEX_HORIZON_DAYS
+)
+from busy_index import BusyIndex
+from availability import DayAvailability
+from calendar_client import calendar_service, EVENT_FIELDS
+from calendar_mirror import CalendarMirror
+from event_cache import EventCache
+from title_index import TitleIndex, is_unambiguous
+from agent_events import emit
+from tracing import span, traced
+from booking_ledger import ReservationLedger, SlotUnavailableError
+from log_setup import get_logger
+
+log = get_logger("calendar")
+event_cache = EventCache(ttl_seconds=EVENT_CACHE_TTL_SECONDS, max_entries=EVENT_CACHE_MAX_DAYS)
+calendar_mirror = CalendarMirror(max_staleness=CALENDAR_MIRROR_MAX_STALENESS_SECONDS) if CALENDAR_MIRROR_ENABLED else None
+# Committed bookings stay in the ledger for as long as a pre-insert read of their day can be served
+booking_ledger = ReservationLedger(commit_ttl=max(EVENT_CACHE_TTL_SECONDS, CALENDAR_MIRROR_MAX_STALENESS_SECONDS))
+title_index = TitleIndex(max_age=TITLE_INDEX_REFRESH_SECONDS, horizon_days=TITLE_INDEX_HORIZON_DAYS) if TITLE_INDEX_ENABLED else None
+
+# 📜 Stream events page by page, asking only for the fields we read
+def iter_events(time_min: datetime = None, time_max: datetime = None, q: str = None, page_size=250):
+    """
+    Yield events in start-time order, following `nextPageToken` lazily: the
+    next page is requested only when the consumer reaches it. A pooled client
+    is held just while each page is fetched, so a consumer that stops early
+    never keeps one checked out.
+    """
+    params = {
+        "calendarId": GOOGLE_CALENDAR_ID,
+        "singleEvents": True,
+        "orderBy": "startTime",
+        "maxResults": page_size,
+        "fields": f"items({EVENT_FIELDS}),nextPageToken",
+    }
+    if time_min:
+        params["timeMin"] = time_min.isoformat()
+    if time_max:
+        params["timeMax"] = time_max.isoformat()
+    if q:
+        params["q"] = q
+
+    while True:
+        with span("calendar_fetch", source="list"), calendar_service() as service:
+            events_result = service.events().list(**params).execute()
+        yield from events_result.get('items', [])
+        page_token = events_result.get('nextPageToken')
+        if not page_token:
+            return
+        params["pageToken"] = page_token
+
+# 📤 Fetch all events on a local calendar day straight from the API
+def _fetch_day_events(date: str, timezone: str):
+    tz = pytz.timezone(timezone)
+    start_of_day = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
+    # Materialized because the day is cached; every page is read, not just the first
+    return list(iter_events(start_of_day, start_of_day + timedelta(days=1)))
+
+# 📤 Every event overlapping [start, end), as an iterable to consume once
+def events_between(start: datetime, end: datetime):
+    if calendar_mirror is not None:
+        return calendar_mirror.events_between(start, end)
+    return iter_events(start, end, page_size=2500)
+
+# 🗃️ Events on a local calendar day, served from the read-through cache
+def list_day_events(date: str, timezone="Asia/Kolkata"):
+    """
+    Return the events on `date` (YYYY-MM-DD) in `timezone`.
+    The returned list is shared with the cache and must not be mutated.
+    """
+    if calendar_mirror is not None:
+        tz = pytz.timezone(timezone)
+        start_of_day = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
+        events = calendar_mirror.events_between(start_of_day, start_of_day + timedelta(days=1))
+        emit("calendar_fetched", date=date, events=len(events), source="mirror")
+        return events
+
+    source = "cache"
+    def load():
+        nonlocal source
+        source = "api"
+        return _fetch_day_events(date, timezone)
+
+    events = event_cache.get_or_load((GOOGLE_CALENDAR_ID, date, timezone), load)
+    emit("calendar_fetched", date=date, events=len(events), source=source)
+    return events
+
+# ♻️ Drop cached days that overlap a written time range
+def invalidate_events_between(start: datetime, end: datetime):
+    def overlaps(key):
+        calendar_id, date, timezone = key
+        if calendar_id != GOOGLE_CALENDAR_ID:
+            return False
+        tz = pytz.timezone(timezone)
+        day_start = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
+        return day_start < end and start < day_start + timedelta(days=1)
 
-# 📌 Authenticate with Google Calendar
-def get_calendar_service():
-    credentials = service_account.Credentials.from_service_account_file(
-        GOOGLE_SERVICE_ACCOUNT_FILE,
-        scopes=['https://www.googleapis.com/auth/calendar']
-    )
-    service = build('calendar', 'v3', credentials=credentials)
-    return service
+    event_cache.invalidate_where(overlaps)
+
+# 🔢 Bumped by every write we make, so callers can tell a turn changed the calendar
+_revisions = itertools.count(1)
+calendar_revision = 0
 
-# ✅ Check available 30-min slots on a date
-def get_free_slots(date: str, timezone="Asia/Kolkata"):
-    print(f"[DEBUG] get_free_slots called with date: {date}")
+def invalidate_event(event: dict = None):
+    global calendar_revision
+    calendar_revision = next(_revisions)
+    if calendar_mirror is not None:
+        calendar_mirror.mark_stale()
     try:
-        service = get_calendar_service()
-        tz = pytz.timezone(timezone)
+        if event and 'dateTime' in event['start']:
+            invalidate_events_between(parse(event['start']['dateTime']), parse(event['end']['dateTime']))
+            return
+    except (KeyError, ValueError):
+        pass
+    # All-day or unknown times: drop everything cached for this calendar
+    event_cache.invalidate_where(lambda key: key[0] == GOOGLE_CALENDAR_ID)
+
+# 🔎 Title index: kept current by our own writes, rebuilt when it ages out
+def index_event(event: dict):
+    if title_index is not None:
+        title_index.upsert(event)
+
+def unindex_event(event_id: str):
+    if title_index is not None:
+        title_index.remove(event_id)
+
+def refresh_title_index(force=False):
+    if title_index is None or not (force or title_index.needs_refresh()):
+        return
+    window = title_index.begin_refresh()
+    if window is None:
+        return
+    try:
+        events = list(events_between(*window))
+    except BaseException:
+        title_index.abort_refresh()
+        raise
+    title_index.finish_refresh(events, window)
+
+def find_indexed_events(title: str, start: datetime = None, end: datetime = None):
+    """
+    (tier, events) for title matches starting in [start, end) from the index,
+    or None when it can't answer. With no `end`, the search runs to the edge
+    of the indexed window, so anything further out is not seen.
+    """
+    if title_index is None:
+        return None
+    try:
+        refresh_title_index()
+    except Exception as e:
+        # A stale index still answers; a missing one falls back to the API
+        log.error("Title index refresh failed: %s", e)
+    return title_index.match(title, start, end or title_index.window_end())
+
+def day_bounds(date: str, timezone: str):
+    start_of_day = pytz.timezone(timezone).localize(datetime.strptime(date, "%Y-%m-%d"))
+    return start_of_day, start_of_day + timedelta(days=1)
+
+def exact_title_matches(events, title: str):
+    wanted = title.strip().lower()
+    return [e for e in events if e.get("summary", "").strip().lower() == wanted]
+
+# 🔍 Events on a day matching a title, as (tier, events): the index first, then an exact match on the day listing
+def events_titled(title: str, date: str, timezone="Asia/Kolkata"):
+    matched = find_indexed_events(title, *day_bounds(date, timezone))
+    if matched and matched[1]:
+        log.debug("Title index matched %s events for %r on %s (%s)", len(matched[1]), title, date, matched[0])
+        return matched
+    events = list_day_events(date, timezone)
+    log.debug("Fetched %s events on %s", len(events), date)
+    return "exact", exact_title_matches(events, title)
+
+# 🤔 Loose title matches are offered back instead of being acted on
+def title_confirmation(title: str, events, action: str, timezone="Asia/Kolkata") -> str:
+    tz = pytz.timezone(timezone)
+    lines = []
+    for event in events[:5]:
+        start = event.get("start", {})
+        when = parse(start["dateTime"]).astimezone(tz).strftime("%Y-%m-%d %I:%M %p") if "dateTime" in start else start.get("date", "")
+        lines.append(f"- **{event.get('summary', 'No Title')}** · {when}")
+    return (
+        f"🤔 No meeting is titled exactly '**{title}**'. Did you mean:\n\n" + "\n".join(lines)
+        + f"\n\n💬 _Repeat the request with the full title to {action} it._"
+    )
 
-        # 📅 Localize start and end of the day
-        start_datetime = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
-        end_datetime = start_datetime + timedelta(days=1)
+# 👥 Busy times for many calendars / attendees in one FreeBusy request
+FREEBUSY_MAX_CALENDARS = 50  # per-request limit of freebusy().query
 
+def query_busy(calendar_ids, start: datetime, end: datetime, timezone="Asia/Kolkata"):
+    """
+    Return ({calendar_id: [(busy_start, busy_end), ...]}, {calendar_id: error}).
+    Calendars that can't be read (no access, unknown attendee) land in the error dict.
+    """
+    tz = pytz.timezone(timezone)
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    busy, errors = {}, {}
+
+    with span("calendar_fetch", source="freebusy", calendars=len(calendar_ids)), calendar_service() as service:
+        for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+            chunk = calendar_ids[i:i + FREEBUSY_MAX_CALENDARS]
+            result = service.freebusy().query(body={
+                "timeMin": start.isoformat(),
+                "timeMax": end.isoformat(),
+                "timeZone": timezone,
+                "items": [{"id": calendar_id} for calendar_id in chunk]
+            }).execute()
+
+            for calendar_id, info in result.get("calendars", {}).items():
+                if info.get("errors"):
+                    errors[calendar_id] = ", ".join(err.get("reason", "unknown") for err in info["errors"])
+                busy[calendar_id] = [
+                    (parse(b["start"]).astimezone(tz), parse(b["end"]).astimezone(tz))
+                    for b in info.get("busy", [])
+                ]
+
+    log.debug("FreeBusy returned %s busy blocks for %s calendars", sum(map(len, busy.values())), len(calendar_ids))
+    return busy, errors
+
+# 👥 One merged busy index for our calendar plus every attendee
+def get_common_busy_index(calendar_ids, start: datetime, end: datetime, timezone="Asia/Kolkata") -> BusyIndex:
+    busy, errors = query_busy([GOOGLE_CALENDAR_ID, *calendar_ids], start, end, timezone)
+    if errors:
+        # Treating an unreadable calendar as free would offer slots that aren't
+        details = "; ".join(f"{calendar_id} ({reason})" for calendar_id, reason in errors.items())
+        raise ValueError(f"Could not read busy times for: {details}")
+    index = BusyIndex(interval for intervals in busy.values() for interval in intervals)
+    emit("calendar_fetched", calendars=len(busy), busy_blocks=len(index), source="freebusy")
+    return index
+
+# 🧮 30-min slots from 9 AM to 5 PM on a date, each flagged busy or free
+def get_day_slots(date: str, timezone="Asia/Kolkata", calendar_ids=None) -> DayAvailability:
+    """
+    Return the working day as a DayAvailability bitset (it iterates as
+    (slot_start, slot_end, is_busy) tuples).
+    Shared by get_free_slots and the CheckAvailability tool. With
+    `calendar_ids` (other calendars or attendee emails), a slot is busy when
+    any of them, or our own calendar, is busy.
+    """
+    tz = pytz.timezone(timezone)
+
+    # 📅 Localize start of the day
+    start_datetime = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
+
+    if calendar_ids:
+        # 👥 One FreeBusy request covers every calendar
+        busy = get_common_busy_index(calendar_ids, start_datetime, start_datetime + timedelta(days=1), timezone)
+    else:
         # 📤 Fetch events for the date
-        events_result = service.events().list(
-            calendarId=GOOGLE_CALENDAR_ID,
-            timeMin=start_datetime.isoformat(),
-            timeMax=end_datetime.isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
-        print(f"[DEBUG] Fetched {len(events)} events for {date}")
-
-        # ⏳ Convert event times to timezone-aware datetime in local timezone
-        busy_times = []
-        for event in events:
-            if 'dateTime' in event['start']:
-                busy_start = parse(event['start']['dateTime']).astimezone(tz)
-                busy_end = parse(event['end']['dateTime']).astimezone(tz)
-                busy_times.append((busy_start, busy_end))
-
-        # 🧮 Generate 30-min time slots from 9 AM to 5 PM
-        slots = []
-        current = start_datetime.replace(hour=9, minute=0, second=0, microsecond=0)
-        work_end = start_datetime.replace(hour=17, minute=0, second=0, microsecond=0)
-
-        while current < work_end:
-            slot_start = current
-            slot_end = current + timedelta(minutes=30)
-            current = slot_end
-
-            # ❌ Check if this slot overlaps with any busy time
-            overlaps = any(slot_start < b_end and slot_end > b_start for b_start, b_end in busy_times)
-
-            if not overlaps:
-                slots.append({
-                    "start": slot_start.isoformat(),
-                    "end": slot_end.isoformat()
-                })
-
-        # ✅ Return fallback if no slots are available
-        if not slots:
-            print("[DEBUG] No free slots available. Returning fallback response.")
-            return [{
-                "start": None,
-                "end": None,
-                "note": "❌ No free slots available on this date."
-            }]
-
-        print(f"[DEBUG] Returning {len(slots)} free slots")
-        return slots
+        events = list_day_events(date, timezone)
+        log.debug("Fetched %s events for %s", len(events), date)
+
+        # ⏳ Merge busy times once, then sweep the slots against them
+        busy = BusyIndex.from_events(events, tz)
+
+    return working_day_slots(start_datetime, busy)
+
+# 🧮 Occupancy bits for the 9 AM – 5 PM slots of a localized day
+@traced("slot_computation")
+def working_day_slots(start_datetime: datetime, busy: BusyIndex) -> DayAvailability:
+    work_start = start_datetime.replace(hour=9, minute=0, second=0, microsecond=0)
+    work_end = start_datetime.replace(hour=17, minute=0, second=0, microsecond=0)
+
+    return DayAvailability.from_busy(busy, work_start, work_end, slot_minutes=30)
+
+# 🧾 Free-slot dicts for the API, with the "nothing free" fallback
+def free_slot_dicts(day_slots: DayAvailability):
+    slots = day_slots.to_dicts()
+
+    # ✅ Return fallback if no slots are available
+    if not slots:
+        log.debug("No free slots available. Returning fallback response.")
+        return [{
+            "start": None,
+            "end": None,
+            "note": "❌ No free slots available on this date."
+        }]
+
+    log.debug("Returning %s free slots", len(slots))
+    return slots
+
+# ✅ Check available 30-min slots on a date (optionally common to several calendars)
+def get_free_slots(date: str, timezone="Asia/Kolkata", calendar_ids=None):
+    log.debug("get_free_slots called with date: %s, calendars: %s", date, calendar_ids)
+    try:
+        return free_slot_dicts(get_day_slots(date, timezone, calendar_ids))
 
     except Exception as e:
-        print(f"❌ Error in get_free_slots: {e}")
+        log.error("get_free_slots failed: %s", e)
         return [{
             "start": None,
             "end": None,
             "note": f"❌ Failed to fetch free slots due to error: {e}"
         }]
 
+# 📆 Availability for every day in a date range, computed for all days at once
+def get_availability_range(start_date: str, end_date: str, slot_minutes=30, work_hours=(9, 17), timezone="Asia/Kolkata"):
+    """
+    {"YYYY-MM-DD": DayAvailability} for each day from start_date to end_date
+    (inclusive).
+
+    Events for the whole range are streamed from one paginated listing. Slot occupancy
+    is computed as a (days x slots) NumPy mask against the merged busy times
+    and packed into one bitset per day.
+    """
+    log.debug("get_availability_range called with %s → %s, %s min, hours=%s", start_date, end_date, slot_minutes, work_hours)
+    tz = pytz.timezone(timezone)
+    first_day = datetime.strptime(start_date, "%Y-%m-%d")
+    last_day = datetime.strptime(end_date, "%Y-%m-%d")
+    if last_day < first_day:
+        raise ValueError("end_date must not be before start_date")
+    if slot_minutes <= 0 or work_hours[1] <= work_hours[0]:
+        raise ValueError("slot_minutes must be positive and work_hours must be (start_hour, end_hour)")
+
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    range_start = tz.localize(days[0])
+    range_end = tz.localize(days[-1] + timedelta(days=1))
+
+    # 📤 One listing for the whole range, merged into busy times as pages arrive
+    busy = BusyIndex.from_events(events_between(range_start, range_end), tz)
+    log.debug("Fetched %s busy blocks for %s days", len(busy), len(days))
+
+    # 🧮 Slot grid as POSIX timestamps: one row per day, one column per slot
+    with span("slot_computation", days=len(days)):
+        work_start_minutes = int(work_hours[0] * 60)
+        work_end_minutes = int(work_hours[1] * 60)
+        # Whole slots only: one that would run past the end of working hours is dropped
+        slots_per_day = (work_end_minutes - work_start_minutes) // slot_minutes
+        slot_seconds = slot_minutes * 60
+
+        day_bases = [tz.localize(day + timedelta(minutes=work_start_minutes)) for day in days]
+        day_starts = np.array([base.timestamp() for base in day_bases])
+        slot_starts = day_starts[:, None] + (np.arange(slots_per_day) * slot_seconds)[None, :]
+        busy_mask = busy.busy_mask(slot_starts, slot_starts + slot_seconds)
+
+        return {
+            day.strftime("%Y-%m-%d"): DayAvailability.from_mask(base, slot_minutes, busy_mask[row])
+            for row, (day, base) in enumerate(zip(days, day_bases))
+        }
+
+# 📆 Free slots for every day in a date range
+def get_free_slots_range(start_date: str, end_date: str, slot_minutes=30, work_hours=(9, 17), timezone="Asia/Kolkata"):
+    """
+    Free slots for each day from start_date to end_date (inclusive, YYYY-MM-DD).
+    Returns {"YYYY-MM-DD": [{"start": iso, "end": iso}, ...], ...}; days with no
+    free time map to an empty list.
+    """
+    availability = get_availability_range(start_date, end_date, slot_minutes, work_hours, timezone)
+    result = {date: day.to_dicts() for date, day in availability.items()}
+    log.debug("Returning %s free slots across %s days", sum(map(len, result.values())), len(result))
+    return result
+
+# ⏭️ First free slot from now over the next few days (one range fetch)
+def get_next_free_slot(days=7, slot_minutes=30, work_hours=(9, 17), timezone="Asia/Kolkata"):
+    tz = pytz.timezone(timezone)
+    now = datetime.now(tz)
+    start_date = now.strftime("%Y-%m-%d")
+    end_date = (now + timedelta(days=days - 1)).strftime("%Y-%m-%d")
+
+    for day in get_availability_range(start_date, end_date, slot_minutes, work_hours, timezone).values():
+        window = day.first_fit_window(1, not_before=now)
+        if window:
+            return {"start": window[0].isoformat(), "end": window[1].isoformat()}
+    return None
+
+# 🔎 Best start times for a meeting of any length across several days
+def meeting_search_days(start_date: str = None, days=7, skip_weekends=True, timezone="Asia/Kolkata"):
+    """Naive midnights of the days to search; weekends are dropped unless that leaves nothing."""
+    first_day = datetime.strptime(start_date, "%Y-%m-%d") if start_date else datetime.now(pytz.timezone(timezone)).replace(
+        hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+    )
+    search_days = [first_day + timedelta(days=i) for i in range(max(days, 1))]
+    weekdays = [day for day in search_days if day.weekday() < 5]
+    return weekdays if skip_weekends and weekdays else search_days
+
+@traced("slot_computation")
+def meeting_candidates(busy: BusyIndex, search_days, duration_minutes=30, work_hours=(9, 17), preference=None,
+                       count=3, step_minutes=30, not_before: datetime = None, timezone="Asia/Kolkata"):
+    """
+    Sweep the free gaps between merged busy intervals and return up to `count`
+    non-overlapping (start, end) slots, best first.
+
+    Starts sit on a `step_minutes` grid from the start of working hours, plus
+    the moment a busy interval ends (never `not_before` itself). With
+    a `preference` block such as (9, 12), slots that fit inside it rank ahead
+    of the rest (and the search window stretches to cover it); otherwise, and
+    within each group, earlier is better.
+    """
+    tz = pytz.timezone(timezone)
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    hours = work_hours
+    if preference:
+        hours = (min(work_hours[0], preference[0]), max(work_hours[1], preference[1]))
+
+    ranked = []
+    for day in search_days:
+        base = tz.localize(day + timedelta(hours=hours[0]))
+        window_end = tz.localize(day + timedelta(hours=hours[1]))
+        preferred = None
+        if preference:
+            preferred = tz.localize(day + timedelta(hours=preference[0])), tz.localize(day + timedelta(hours=preference[1]))
+        window_start = max(base, not_before) if not_before else base
+
+        for gap_start, gap_end in busy.free_gaps(window_start, window_end):
+            # Right when the gap opens (back to back with the previous meeting), then each grid point.
+            # A gap opening at the window start is just the clip to `not_before`, not a meeting ending
+            grid_start = base + -((base - gap_start) // step) * step
+            starts = [gap_start] if window_start < gap_start < grid_start else []
+            starts.extend(grid_start + i * step for i in range((gap_end - duration - grid_start) // step + 1))
+            for start in starts:
+                if start + duration > gap_end:
+                    continue
+                outside = bool(preferred) and not (preferred[0] <= start and start + duration <= preferred[1])
+                ranked.append((outside, start))
+
+    ranked.sort()
+    picked = []
+    for _, start in ranked:
+        end = start + duration
+        if all(end <= other_start or start >= other_end for other_start, other_end in picked):
+            picked.append((start, end))
+            if len(picked) == count:
+                break
+    return picked
+
+def find_meeting_slots(duration_minutes=30, start_date: str = None, days=7, work_hours=(9, 17), preference=None,
+                       count=3, calendar_ids=None, timezone="Asia/Kolkata"):
+    """
+    Best `count` slots of `duration_minutes` over the next `days` days, from one
+    range fetch (or one FreeBusy query when `calendar_ids` are given).
+    """
+    tz = pytz.timezone(timezone)
+    search_days = meeting_search_days(start_date, days, skip_weekends=days > 1, timezone=timezone)
+    range_start = tz.localize(search_days[0])
+    range_end = tz.localize(search_days[-1] + timedelta(days=1))
+
+    if calendar_ids:
+        busy = get_common_busy_index(calendar_ids, range_start, range_end, timezone)
+    else:
+        busy = BusyIndex.from_events(events_between(range_start, range_end), tz)
+        emit("calendar_fetched", days=len(search_days), busy_blocks=len(busy), source="range")
+
+    return meeting_candidates(
+        busy, search_days, duration_minutes, work_hours, preference, count,
+        not_before=datetime.now(tz), timezone=timezone
+    )
+
+# 🔍 Re-check a slot against the (cached) day before writing
+def busy_overlap(events, start: datetime, end: datetime, timezone="Asia/Kolkata") -> bool:
+    return BusyIndex.from_events(events, pytz.timezone(timezone)).overlaps(start, end)
+
+def ensure_slot_free(start: datetime, end: datetime, timezone="Asia/Kolkata", ignore_event_id: str = None):
+    """Raise SlotUnavailableError if [start, end) overlaps an event (other than the one being moved)."""
+    day = start.astimezone(pytz.timezone(timezone)).strftime("%Y-%m-%d")
+    events = [e for e in list_day_events(day, timezone) if not ignore_event_id or e.get("id") != ignore_event_id]
+    if busy_overlap(events, start, end, timezone):
+        raise SlotUnavailableError(start, end)
+
 # ✅ Book an event
 def book_slot(start: dict, end: dict, summary="Meeting", description="Booked via AI assistant"):
     try:
-        print(f"[DEBUG] book_slot called with: start={start}, end={end}, summary={summary}")
-        
-        service = get_calendar_service()
+        log.debug("book_slot called with: start=%s, end=%s, summary=%s", start, end, summary)
 
         event = {
             'summary': summary,
@@ -105,9 +483,17 @@ def book_slot(start: dict, end: dict, summary="Meeting", description="Booked via
             },
         }
 
-        created_event = service.events().insert(calendarId=GOOGLE_CALENDAR_ID, body=event).execute()
-
-        print(f"[DEBUG] Event created: {created_event['id']}")
+        start_dt, end_dt = parse(start["dateTime"]), parse(end["dateTime"])
+        # 🔒 Claim the interval first: a clash with an in-flight or recent booking fails without any API call
+        with booking_ledger.hold(GOOGLE_CALENDAR_ID, start_dt, end_dt) as token:
+            ensure_slot_free(start_dt, end_dt, start["timeZone"])
+            with span("booking_write", op="insert"), calendar_service() as service:
+                created_event = service.events().insert(calendarId=GOOGLE_CALENDAR_ID, body=event).execute()
+            invalidate_event(created_event)
+            index_event(created_event)
+            booking_ledger.commit(token, created_event["id"])
+
+        log.debug("Event created: %s", created_event["id"])
         return {
             "id": created_event["id"],
             "summary": created_event["summary"],
@@ -115,141 +501,260 @@ def book_slot(start: dict, end: dict, summary="Meeting", description="Booked via
             "end": created_event["end"]["dateTime"]
         }
 
+    except SlotUnavailableError as e:
+        log.debug("book_slot rejected: %s", e)
+        raise
     except Exception as e:
-        print(f"❌ Error in book_slot: {e}")
+        log.error("book_slot failed: %s", e)
         raise e
     
-# Change event date and time (Reschedule)
-def update_event_time(title: str, date: str, new_start: datetime, new_end: datetime, timezone="Asia/Kolkata") -> str:
-    """
-    Update the time of an existing event matching the title on a given date.
-    """
+# 🔁 Move an existing event in one PATCH (keeps its id, attendees and description)
+def move_event(event_id: str, new_start: datetime, new_end: datetime, timezone="Asia/Kolkata", old_event: dict = None):
+    # The event's own recent booking must not block its move
+    booking_ledger.forget_event(event_id)
+    # 🔒 Same claim + re-check as book_slot, so a reschedule can't land on a slot being booked
+    with booking_ledger.hold(GOOGLE_CALENDAR_ID, new_start, new_end) as token:
+        ensure_slot_free(new_start, new_end, timezone, ignore_event_id=event_id)
+        with span("booking_write", op="patch"), calendar_service() as service:
+            updated_event = service.events().patch(
+                calendarId=GOOGLE_CALENDAR_ID,
+                eventId=event_id,
+                body={
+                    'start': {'dateTime': new_start.isoformat(), 'timeZone': timezone},
+                    'end': {'dateTime': new_end.isoformat(), 'timeZone': timezone}
+                }
+            ).execute()
+
+        if old_event is not None:
+            invalidate_event(old_event)
+        else:
+            invalidate_event()
+        invalidate_event(updated_event)
+        index_event(updated_event)
+        booking_ledger.commit(token, event_id)
+
+    log.debug("Event moved: %s → %s", event_id, new_start.isoformat())
+    return updated_event
+
+# 📦 Bulk inserts / updates / patches / deletes in Google API batch requests
+BATCH_MAX_REQUESTS = 50  # Calendar API limit per batch
+
+def _body_window(body):
+    """(start, end, timezone) of an event body with timed start and end, else None."""
     try:
-        print(f"[DEBUG] update_event_time: Looking for event '{title}' on {date} to reschedule")
-        service = get_calendar_service()
-        tz = pytz.timezone(timezone)
+        start, end = body["start"], body["end"]
+        return parse(start["dateTime"]), parse(end["dateTime"]), start.get("timeZone") or "Asia/Kolkata"
+    except (KeyError, TypeError, ValueError):
+        return None
 
-        # Define date window for the search
-        start_of_day = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
-        end_of_day = start_of_day + timedelta(days=1)
+def batch_mutate(operations: list) -> list:
+    """
+    Apply many event mutations with as few HTTP round trips as possible.
 
-        # Fetch events for the day
-        events_result = service.events().list(
-            calendarId=GOOGLE_CALENDAR_ID,
-            timeMin=start_of_day.isoformat(),
-            timeMax=end_of_day.isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+    Each operation is a dict:
+        {"method": "insert", "body": {...}}
+        {"method": "update" | "patch", "event_id": "...", "body": {...}}
+        {"method": "delete", "event_id": "..."}
 
-        events = events_result.get('items', [])
-        print(f"[DEBUG] Fetched {len(events)} events on {date}")
+    Returns one result per operation, in the same order:
+        {"ok": True, "result": <event or None>} or {"ok": False, "error": "..."}
 
-        # Try to find the event with the matching title
-        for event in events:
-            if event.get("summary", "").strip().lower() == title.strip().lower():
-                print(f"[DEBUG] Found event to reschedule: {event['id']}")
+    Operations whose body has a timed start and end are checked against the
+    booking ledger and the calendar first; a clash fails just that operation.
+    """
+    results = [None] * len(operations)
+
+    def callback(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            results[index] = {"ok": False, "error": str(exception)}
+        else:
+            results[index] = {"ok": True, "result": response or None}
+
+    # 🔒 Operations that set a time claim it in the ledger and re-check the calendar, like book_slot
+    tokens = {}  # operation index -> ledger token
+    for index, op in enumerate(operations):
+        window = _body_window(op.get("body"))
+        if window is None:
+            continue
+        start, end, timezone = window
+        try:
+            tokens[index] = booking_ledger.reserve(GOOGLE_CALENDAR_ID, start, end)
+            ensure_slot_free(start, end, timezone, ignore_event_id=op.get("event_id"))
+        except Exception as e:
+            if index in tokens:
+                booking_ledger.release(tokens.pop(index))
+            results[index] = {"ok": False, "error": str(e)}
 
-                event['start'] = {
-                    'dateTime': new_start.isoformat(),
-                    'timeZone': timezone
-                }
-                event['end'] = {
-                    'dateTime': new_end.isoformat(),
-                    'timeZone': timezone
-                }
+    try:
+        with span("booking_write", op="batch", operations=len(operations)), calendar_service() as service:
+            events = service.events()
+            for offset in range(0, len(operations), BATCH_MAX_REQUESTS):
+                batch = service.new_batch_http_request(callback=callback)
+                for index in range(offset, min(offset + BATCH_MAX_REQUESTS, len(operations))):
+                    if results[index] is not None:
+                        continue
+                    op = operations[index]
+                    method = op.get("method")
+                    if method == "insert":
+                        request = events.insert(calendarId=GOOGLE_CALENDAR_ID, body=op["body"])
+                    elif method in ("update", "patch"):
+                        request = getattr(events, method)(calendarId=GOOGLE_CALENDAR_ID, eventId=op["event_id"], body=op["body"])
+                    elif method == "delete":
+                        request = events.delete(calendarId=GOOGLE_CALENDAR_ID, eventId=op["event_id"])
+                    else:
+                        results[index] = {"ok": False, "error": f"Unsupported batch method: {method}"}
+                        continue
+                    batch.add(request, request_id=str(index))
+                if any(results[index] is None for index in range(offset, min(offset + BATCH_MAX_REQUESTS, len(operations)))):
+                    batch.execute()
+    except Exception as e:
+        # Earlier chunks are already applied: report the rest as failed instead of losing every result
+        log.error("batch_mutate stopped: %s", e)
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = {"ok": False, "error": f"Batch request failed: {e}"}
+    finally:
+        # ♻️ Deletes don't return the event, so drop the whole calendar from the cache
+        invalidate_event()
+        for index, (op, result) in enumerate(zip(operations, results)):
+            token = tokens.get(index)
+            if not result or not result["ok"]:
+                if token is not None:
+                    booking_ledger.release(token)
+                continue
+            if op.get("event_id"):
+                booking_ledger.forget_event(op["event_id"])
+            if op.get("method") == "delete":
+                unindex_event(op["event_id"])
+            else:
+                index_event(result["result"])
+                if token is not None:
+                    booking_ledger.commit(token, (result["result"] or {}).get("id") or op.get("event_id"))
+
+    failed = sum(1 for r in results if not r["ok"])
+    log.debug("batch_mutate: %s operations, %s failed", len(operations), failed)
+    return results
+
+# 🗑️ Delete many events by ID in batched requests
+def delete_events_by_id(event_ids: list) -> list:
+    return batch_mutate([{"method": "delete", "event_id": event_id} for event_id in event_ids])
 
-                updated_event = service.events().update(
-                    calendarId=GOOGLE_CALENDAR_ID,
-                    eventId=event["id"],
-                    body=event
-                ).execute()
+# Change event date and time (Reschedule)
+def update_event_time(title: str, date: str, new_start: datetime, new_end: datetime, timezone="Asia/Kolkata") -> str:
+    """
+    Update the time of an existing event matching the title on a given date.
+    """
+    try:
+        log.debug("update_event_time: Looking for event %r on %s to reschedule", title, date)
+        # Try to find the event with the matching title
+        tier, events = events_titled(title, date, timezone)
+        if not events:
+            return f"❌ No event found with title **{title}** on {date}."
+        if not is_unambiguous(title, tier, events):
+            return title_confirmation(title, events, "reschedule", timezone)
 
-                print(f"[DEBUG] Event rescheduled: {updated_event['id']}")
-                return f"✅ Rescheduled **{title}** to {new_start.strftime('%Y-%m-%d %I:%M %p')}"
+        cached_event = events[0]
+        log.debug("Found event to reschedule: %s", cached_event["id"])
+        updated_event = move_event(cached_event['id'], new_start, new_end, timezone, old_event=cached_event)
 
-        return f"❌ No event found with title **{title}** on {date}."
+        log.debug("Event rescheduled: %s", updated_event["id"])
+        return f"✅ Rescheduled **{cached_event.get('summary', title)}** to {new_start.strftime('%Y-%m-%d %I:%M %p')}"
 
+    except SlotUnavailableError as e:
+        return f"⚠️ {e}"
     except Exception as e:
-        print(f"[ERROR:update_event_time] {str(e)}")
+        log.error("update_event_time failed: %s", e)
         return f"❌ Failed to reschedule meeting: {str(e)}"
     
-# 🔍 Find events by title (across all future dates)
-def find_events_by_title(title: str):
+# 🔍 Find events by title (across all future dates), as (tier, events)
+def match_events_by_title(title: str):
+    """
+    The index answers within its horizon. Unless it found the exact title,
+    exact matches are also searched for past the horizon (mirror or `q=`),
+    and they win over the index's looser ones.
+    """
     try:
-        service = get_calendar_service()
-        now = datetime.utcnow().isoformat() + 'Z'
-
-        events_result = service.events().list(
-            calendarId=GOOGLE_CALENDAR_ID,
-            timeMin=now,
-            maxResults=10,
-            singleEvents=True,
-            orderBy='startTime',
-            q=title
-        ).execute()
-
-        matched_events = [e for e in events_result.get('items', []) if e.get('summary', '').lower() == title.lower()]
-        print(f"[DEBUG] Found {len(matched_events)} events matching '{title}'")
-        return matched_events
+        now = datetime.now(pytz.utc)
+        indexed = find_indexed_events(title, start=now)
+        if indexed and indexed[0] == "exact" and indexed[1]:
+            log.debug("Title index matched %s events for %r", len(indexed[1]), title)
+            return indexed
+
+        if calendar_mirror is not None:
+            exact = calendar_mirror.find_by_title(title, after=now)
+            log.debug("Found %s mirrored events matching %r", len(exact), title)
+        else:
+            # Every page of future events whose text matches, exact titles only
+            exact = exact_title_matches(iter_events(time_min=now, q=title), title)
+            log.debug("Found %s events matching %r", len(exact), title)
+        if exact:
+            return "exact", exact
+        return indexed if indexed else ("none", [])
 
     except Exception as e:
-        print(f"[ERROR] find_events_by_title: {e}")
-        return []
+        log.error("match_events_by_title failed: %s", e)
+        return "none", []
+
+def find_events_by_title(title: str):
+    return match_events_by_title(title)[1]
     
 
 def get_today_events():
     try:
         tz = pytz.timezone("Asia/Kolkata")
         today = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
-        tomorrow = today + timedelta(days=1)
-
-        service = get_calendar_service()
-        events_result = service.events().list(
-            calendarId=GOOGLE_CALENDAR_ID,
-            timeMin=today.isoformat(),
-            timeMax=tomorrow.isoformat(),
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-
-        events = events_result.get("items", [])
-        if not events:
-            return ["🟢 Nothing to do today."]
-
-        formatted = []
-        for event in events:
-            start_str = "All Day"
-            if 'dateTime' in event['start']:
-                start = parse(event['start']['dateTime']).astimezone(tz)
-                start_str = start.strftime("%I:%M %p")
-            elif 'date' in event['start']:
-                start = parse(event['start']['date'])
-                # optional: skip if not today
-                if start.date() != today.date():
-                    continue
 
-            summary = event.get("summary", "No Title")
-            formatted.append(f"""
-            <div style='margin-bottom:0.75rem; padding: 0.4rem 0.6rem; background-color: #2c2c2c; border-radius: 8px;'>
-                <span style="color:#f44336; font-weight:bold;">⏰ {start_str}</span><br>
-                <span style="color:#ddd;">{summary}</span>
-            </div>
-            """)
-        return formatted or ["🟢 Nothing to do today."]
+        events = list_day_events(today.strftime("%Y-%m-%d"), "Asia/Kolkata")
+        return render_today_events(events, today, tz)
 
     except Exception as e:
-        print(f"[ERROR:get_today_events] {e}")
+        log.error("get_today_events failed: %s", e)
         return ["⚠️ Could not load events. Try again later."]
 
+# 📋 Today's events as small JSON-safe entries (the /today payload)
+def today_entries(events, today: datetime, tz):
+    entries = []
+    for event in events:
+        start_str = "All Day"
+        if 'dateTime' in event['start']:
+            start = parse(event['start']['dateTime']).astimezone(tz)
+            start_str = start.strftime("%I:%M %p")
+        elif 'date' in event['start']:
+            start = parse(event['start']['date'])
+            # optional: skip if not today
+            if start.date() != today.date():
+                continue
+        entries.append({"id": event.get("id"), "time": start_str, "summary": event.get("summary", "No Title")})
+    return entries
+
+def today_view(events, today: datetime, tz) -> dict:
+    return {"date": today.strftime("%Y-%m-%d"), "timezone": tz.zone, "events": today_entries(events, today, tz)}
+
+# 🧾 Sidebar cards for today's events
+def render_today_events(events, today: datetime, tz):
+    entries = today_entries(events, today, tz)
+    if not entries:
+        return ["🟢 Nothing to do today."]
+    return [f"""
+            <div style='margin-bottom:0.75rem; padding: 0.4rem 0.6rem; background-color: #2c2c2c; border-radius: 8px;'>
+                <span style="color:#f44336; font-weight:bold;">⏰ {entry['time']}</span><br>
+                <span style="color:#ddd;">{entry['summary']}</span>
+            </div>
+            """ for entry in entries]
+
 # 🗑️ Delete event by ID
 def delete_event_by_id(event_id: str):
     try:
-        service = get_calendar_service()
-        service.events().delete(calendarId=GOOGLE_CALENDAR_ID, eventId=event_id).execute()
-        print(f"[DEBUG] Successfully deleted event ID: {event_id}")
+        with span("booking_write", op="delete"), calendar_service() as service:
+            service.events().delete(calendarId=GOOGLE_CALENDAR_ID, eventId=event_id).execute()
+        booking_ledger.forget_event(event_id)
+        unindex_event(event_id)
+        # The event's day is unknown here, so drop every cached day for this calendar
+        invalidate_event()
+        log.debug("Successfully deleted event ID: %s", event_id)
     except Exception as e:
-        print(f"[ERROR] delete_event_by_id: {e}")
+        log.error("delete_event_by_id failed: %s", e)
     
 
 def delete_event(title: str, date: str, timezone="Asia/Kolkata") -> str:
@@ -257,36 +762,26 @@ def delete_event(title: str, date: str, timezone="Asia/Kolkata") -> str:
     Deletes the first event matching the title on the given date.
     """
     try:
-        print(f"[TOOL:delete_event] Attempting to delete event titled '{title}' on {date}")
+        log.info("[TOOL:delete_event] Attempting to delete event titled %r on %s", title, date)
         if not title.strip():
             return "❌ Please provide a valid event title to delete."
 
-        service = get_calendar_service()
-        tz = pytz.timezone(timezone)
-
-        start_of_day = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
-        end_of_day = start_of_day + timedelta(days=1)
-
-        events_result = service.events().list(
-            calendarId=GOOGLE_CALENDAR_ID,
-            timeMin=start_of_day.isoformat(),
-            timeMax=end_of_day.isoformat(),
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-
-        events = events_result.get("items", [])
-        print(f"[DEBUG] Found {len(events)} events on {date}")
-
-        for event in events:
-            if event.get("summary", "").strip().lower() == title.strip().lower():
-                event_id = event["id"]
-                service.events().delete(calendarId=GOOGLE_CALENDAR_ID, eventId=event_id).execute()
-                print(f"[DEBUG] Deleted event: {event_id}")
-                return f"🗑️ Event deleted:\n\n**{title}** on {date}"
-
-        return f"⚠️ No matching event found with title '**{title}**' on {date}."
+        tier, events = events_titled(title, date, timezone)
+        if not events:
+            return f"⚠️ No matching event found with title '**{title}**' on {date}."
+        if not is_unambiguous(title, tier, events):
+            return title_confirmation(title, events, "delete", timezone)
+
+        event = events[0]
+        event_id = event["id"]
+        with span("booking_write", op="delete"), calendar_service() as service:
+            service.events().delete(calendarId=GOOGLE_CALENDAR_ID, eventId=event_id).execute()
+        booking_ledger.forget_event(event_id)
+        unindex_event(event_id)
+        invalidate_event(event)
+        log.debug("Deleted event: %s", event_id)
+        return f"🗑️ Event deleted:\n\n**{event.get('summary', title)}** on {date}"
 
     except Exception as e:
-        print(f"❌ Error in delete_event: {e}")
+        log.error("delete_event failed: %s", e)
         return f"❌ Failed to delete event '{title}' on {date}: {e}"
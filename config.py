@@ -5,4 +5,54 @@ load_dotenv()
 
 GOOGLE_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
 GOOGLE_SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
\ No newline at end of file
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# 🗃️ Per-day event cache
+EVENT_CACHE_TTL_SECONDS = int(os.getenv("EVENT_CACHE_TTL_SECONDS", "60"))
+EVENT_CACHE_MAX_DAYS = int(os.getenv("EVENT_CACHE_MAX_DAYS", "256"))
+
+# 🪞 Sync-token calendar mirror (answers reads locally with bounded staleness)
+CALENDAR_MIRROR_ENABLED = os.getenv("CALENDAR_MIRROR_ENABLED", "false").lower() == "true"
+CALENDAR_MIRROR_MAX_STALENESS_SECONDS = int(os.getenv("CALENDAR_MIRROR_MAX_STALENESS_SECONDS", "30"))
+
+# 📐 "Find me a time" meeting search
+MEETING_SEARCH_HORIZON_DAYS = int(os.getenv("MEETING_SEARCH_HORIZON_DAYS", "7"))
+MEETING_SEARCH_RESULTS = int(os.getenv("MEETING_SEARCH_RESULTS", "3"))
+
+# 🔎 Local title index for find / delete / reschedule by name
+TITLE_INDEX_ENABLED = os.getenv("TITLE_INDEX_ENABLED", "true").lower() == "true"
+TITLE_INDEX_REFRESH_SECONDS = int(os.getenv("TITLE_INDEX_REFRESH_SECONDS", "300"))
+TITLE_INDEX_HORIZON_DAYS = int(os.getenv("TITLE_INDEX_HORIZON_DAYS", "90"))
+
+# 📍 Streamlit sidebar: how long the cached today view is served before revalidating with /today
+TODAY_VIEW_TTL_SECONDS = int(os.getenv("TODAY_VIEW_TTL_SECONDS", "30"))
+
+# 🌐 Streamlit -> backend HTTP client (keep-alive pool, retries on connect errors / 429 / 503)
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+API_RETRIES = int(os.getenv("API_RETRIES", "3"))
+API_RETRY_BACKOFF_SECONDS = float(os.getenv("API_RETRY_BACKOFF_SECONDS", "0.5"))
+
+# 🧠 Per-session chat state ("memory", "sqlite", "redis" or "local-redis")
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_LOCAL = int(os.getenv("SESSION_MAX_LOCAL", "10000"))
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "sessions.db")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# 🧭 Which path answers /agent: "manual" (regex router), "llm" (LangChain agent) or "hybrid"
+AGENT_ROUTER = os.getenv("AGENT_ROUTER", "hybrid").lower()
+HYBRID_CONFIDENCE_THRESHOLD = float(os.getenv("HYBRID_CONFIDENCE_THRESHOLD", "0.5"))
+LLM_HISTORY_MAX_TURNS = int(os.getenv("LLM_HISTORY_MAX_TURNS", "10"))  # per session, kept in the session store
+
+# 📝 Logging: queued to a background writer; DEBUG is off unless LOG_LEVEL=DEBUG
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))  # share of DEBUG records kept per call site
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records beyond this are dropped, not waited on
+
+# 🔭 Per-request tracing: one JSON log line per request with its stage timings (/metrics is always on)
+TRACE_LOG_ENABLED = os.getenv("TRACE_LOG_ENABLED", "true").lower() == "true"
+
+# 📦 /agent/batch
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
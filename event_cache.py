@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# ------------------------------
+# 🗃️ Read-through cache for per-day event listings
+# ------------------------------
+class EventCache:
+    """
+    TTL + LRU cache keyed on (calendar_id, date, timezone).
+
+    Values are the raw `items` lists returned by `events().list`. Writers are
+    expected to invalidate the days they touch so reads stay correct right
+    after a booking, reschedule or delete.
+
+    Loads are bracketed by `begin_load` / `put(..., generation=)`: an
+    invalidation that lands while a key is loading bumps its generation, and
+    the load's (pre-write) result is then returned but not cached.
+    """
+
+    def __init__(self, ttl_seconds=60, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}      # key -> loads in flight
+        self._generations = {}  # key -> invalidations seen while loading
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_loads = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value, generation=None):
+        """
+        Cache `value`. With the `generation` from `begin_load`, it is dropped
+        (and False returned) if the key was invalidated since the load began.
+        """
+        with self._lock:
+            if generation is not None:
+                current = self._generations.get(key, 0)
+                self._end_load(key)
+                if current != generation:
+                    self.stale_loads += 1
+                    return False
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def begin_load(self, key) -> int:
+        """Mark `key` as loading; pass the returned generation to `put`."""
+        with self._lock:
+            self._loading[key] = self._loading.get(key, 0) + 1
+            return self._generations.get(key, 0)
+
+    def cancel_load(self, key):
+        """End a `begin_load` whose loader failed."""
+        with self._lock:
+            self._end_load(key)
+
+    def _end_load(self, key):
+        remaining = self._loading.get(key, 0) - 1
+        if remaining > 0:
+            self._loading[key] = remaining
+        else:
+            self._loading.pop(key, None)
+            self._generations.pop(key, None)
+
+    def _bump(self, key):
+        # Only loads in flight can put stale data back; idle keys need no generation
+        if key in self._loading:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` on a miss."""
+        value = self.get(key)
+        if value is None:
+            generation = self.begin_load(key)
+            try:
+                value = loader()
+            except BaseException:
+                self.cancel_load(key)
+                raise
+            self.put(key, value, generation)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._bump(key)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_where(self, predicate):
+        """Drop every entry whose key satisfies `predicate(key)`."""
+        with self._lock:
+            for key in self._loading:
+                if predicate(key):
+                    self._bump(key)
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            for key in self._loading:
+                self._bump(key)
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_loads": self.stale_loads,
+            }
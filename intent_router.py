@@ -0,0 +1,141 @@
+import re
+
+# ------------------------------
+# 🧭 Keyword lists per intent (matched as plain substrings of the lowercased message)
+# ------------------------------
+INTENT_KEYWORDS = {
+    "reschedule": [
+        "reschedule", "change", "postpone", "move",
+        "shift", "delay", "update", "edit", "modify",
+        "adjust", "rearrange", "push back", "bring forward",
+        "change the time", "resched"
+    ],
+    # Shorter lists used when no date was found in the message
+    "reschedule_prompt": ["reschedule", "change", "postpone", "move"],
+    "delete_prompt": ["delete", "remove", "cancel"],
+    "booking_prompt": ["book", "schedule", "meeting", "set up", "add", "lock", "event"],
+    "greeting": ["hi", "hello", "hey"],
+    "help": ["what can you do", "help", "who are you", "abilities", "features"],
+    "availability": [
+        "availability", "available", "free", "slots",
+        "check my calendar", "check availability",
+        "what's open", "open times", "free times",
+        "calendar openings", "any slot", "do i have time",
+        "can i book", "am i free", "is my calendar free"
+    ],
+    "delete": [
+        "delete", "remove", "cancel", "clear", "discard",
+        "drop", "terminate", "cancel meeting", "erase",
+        "get rid of", "trash", "kill", "stop", "unschedule"
+    ],
+    "booking": [
+        "book", "schedule", "meeting", "set up", "add",
+        "lock", "event", "create", "plan", "make appointment",
+        "put on calendar", "register", "arrange", "organize",
+        "invite", "fix", "log", "block time", "set meeting",
+        "new meeting"
+    ],
+    # "Find me a time" searches instead of a fixed start
+    "find_time": [
+        "sometime", "some time", "find a", "find me", "find time", "find some",
+        "suggest a time", "best time", "when can"
+    ],
+    # Vague times of day, in the order they take precedence
+    "morning": ["morning"],
+    "afternoon": ["afternoon"],
+    "evening": ["evening"],
+    "night": ["night"],
+}
+
+# Hours (start, end) each vague time of day stands for
+TIME_BLOCKS = {"morning": (9, 12), "afternoon": (12, 17), "evening": (17, 20), "night": (20, 22)}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+for _day in WEEKDAYS:
+    INTENT_KEYWORDS[_day] = [_day]
+
+
+def _trie_pattern(words):
+    """Regex alternation shaped like a trie, so each position is tried once per character."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        ends_here = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: the longest keyword from a position wins, shorter ones are implied
+        return f"(?:{body})?" if ends_here else body
+
+    return build(trie)
+
+
+class IntentRouter:
+    """
+    Finds every keyword intent in a message with one regex pass.
+
+    All keywords are compiled into a single trie-shaped pattern inside a
+    lookahead, so `finditer` visits each character position once and reports
+    the longest keyword starting there. Keywords that are prefixes of that
+    match (e.g. "change" inside "change the time") are folded into its intent
+    set at build time, which keeps plain-substring semantics: an intent hits
+    exactly when one of its keywords appears anywhere in the text.
+    """
+
+    def __init__(self, intent_keywords):
+        owners = {}
+        for intent, keywords in intent_keywords.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, set()).add(intent)
+
+        # Each keyword also carries the intents of every keyword that is its prefix
+        self._intents_for = {
+            keyword: frozenset().union(*(
+                intents for other, intents in owners.items() if keyword.startswith(other)
+            ))
+            for keyword in owners
+        }
+        self._pattern = re.compile(f"(?=({_trie_pattern(owners)}))")
+
+    def classify(self, text_lower: str) -> set:
+        """Names of all intents with at least one keyword in `text_lower`."""
+        hits = set()
+        intents_for = self._intents_for
+        for match in self._pattern.finditer(text_lower):
+            hits |= intents_for[match.group(1)]
+        return hits
+
+
+router = IntentRouter(INTENT_KEYWORDS)
+classify = router.classify
+
+
+# ------------------------------
+# 🔍 Precompiled date / title / attendee patterns
+# ------------------------------
+QUOTED_TITLE = re.compile(r"['\"](.+?)['\"]")
+RESCHEDULE_TITLE = re.compile(r"(?:reschedule|change)\s+(.*?)\s+to")
+RESCHEDULE_TITLE_SHORT = re.compile(r"reschedule (.*?) to")
+DELETE_TITLE = re.compile(r"(?:delete|remove|cancel)\s+(.*?)($|from|on)")
+TO_CLAUSE = re.compile(r"\bto\s+(.+)")
+FROM_ON_CLAUSE = re.compile(r"(?:from|on)\s+(.+)")
+
+DAY_MONTH = re.compile(
+    r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(january|february|march|april|may|june|july|august|september|october|november|december)\b"
+)
+LEADING_DAY_NUMBER = re.compile(r"\d{1,2}")
+DATE_TOKEN_HINT = re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|today|july|august|am|pm)\b")
+ISO_DATE = re.compile(r"\b(20\d{2}-\d{2}-\d{2})\b")
+TIME_OF_DAY = re.compile(r"\b(\d{1,2}(:\d{2})?\s*(am|pm))\b")
+
+# "90 minutes", "a 45-min", "1.5 hours", "an hour", "half an hour"
+DURATION = re.compile(r"\b(\d+(?:\.\d+)?|an?|half an?)\s*-?\s*(hours?|hrs?|minutes?|mins?)\b", re.IGNORECASE)
+WEEK_HORIZON = re.compile(r"\b(this|next|coming)\s+week\b")
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
@@ -1,8 +1,13 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.language_models.chat_models import BaseChatModel
+from typing import TYPE_CHECKING
 from config import GOOGLE_API_KEY
 
-def get_llm() -> BaseChatModel:
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+def get_llm() -> "BaseChatModel":
+    # Imported here so loading this module doesn't pull in LangChain / google-genai
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     return ChatGoogleGenerativeAI(
         model="gemini-2.0-flash", 
         google_api_key=GOOGLE_API_KEY,
@@ -0,0 +1,178 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from config import LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE, LOG_QUEUE_SIZE
+
+ROOT_LOGGER = "calendar_assistant"
+
+_request_id = None  # tracing.current_request_id, bound on first use to avoid an import cycle
+_listener = None
+_handler = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Module logger under the app root, e.g. get_logger("agent")."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+# ------------------------------
+# 🧵 Hand records to a background writer instead of writing in the caller
+# ------------------------------
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them, so %-style arguments are only
+    merged on the writer thread (and never for records that get dropped).
+    When the queue is full the record is dropped and counted rather than
+    blocking the request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.enqueued = 0
+
+    def prepare(self, record):
+        # The queue is in-process: nothing needs pickling, so skip the eager format
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # At shutdown, wait for room rather than failing on a full queue
+        self.queue.put(self._sentinel)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp each record with the current request id while still on the request's thread / task."""
+
+    def filter(self, record):
+        global _request_id
+        if _request_id is None:
+            from tracing import current_request_id
+            _request_id = current_request_id
+        record.request_id = _request_id() or "-"
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keep a `rate` share of DEBUG records from each call site (1.0 keeps all).
+    Sampling is deterministic per site: at 0.1 every tenth record from a
+    given line is kept, so a chatty loop is thinned without hiding rare ones.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self._seen = {}
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        site = (record.pathname, record.lineno)
+        n = self._seen.get(site, 0) + 1
+        self._seen[site] = n
+        if int(n * self.rate) > int((n - 1) * self.rate) or n == 1:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+# ------------------------------
+# 🧾 Output formats (applied on the writer thread)
+# ------------------------------
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = "-"
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        return f"{text} {json.dumps(fields, ensure_ascii=False, default=str)}" if fields else text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# ------------------------------
+# 🚀 Setup / teardown
+# ------------------------------
+def setup_logging(level=None, fmt=None, debug_sample_rate=None, queue_size=None, stream=None):
+    """
+    Route every `calendar_assistant.*` logger through a bounded queue to one
+    writer thread. Safe to call more than once; later calls are no-ops.
+    """
+    global _listener, _handler
+    with _setup_lock:
+        if _listener is not None:
+            return _handler
+
+        log_queue = queue.Queue(maxsize=queue_size or LOG_QUEUE_SIZE)
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if (fmt or LOG_FORMAT) == "json" else TextFormatter())
+
+        _handler = NonBlockingQueueHandler(log_queue)
+        _handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate))
+        _handler.addFilter(RequestContextFilter())
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers = [_handler]
+        root.setLevel((level or LOG_LEVEL).upper())
+        root.propagate = False
+
+        _listener = DrainingQueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _handler
+
+
+def shutdown_logging():
+    """Flush what is queued and stop the writer thread."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def logging_stats() -> dict:
+    if _handler is None:
+        return {"enabled": False}
+    sampler = next((f for f in _handler.filters if isinstance(f, DebugSampler)), None)
+    return {
+        "enabled": True,
+        "level": logging.getLevelName(logging.getLogger(ROOT_LOGGER).level),
+        "enqueued": _handler.enqueued,
+        "dropped": _handler.dropped,
+        "queued": _handler.queue.qsize(),
+        "debug_sampled_out": sampler.sampled_out if sampler else 0,
+    }
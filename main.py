@@ -1,7 +1,26 @@
-from fastapi import FastAPI
+import asyncio
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from agent import run_agent, get_agent_executor, check_availability  # ✅ NEW
+from fastapi.middleware.gzip import GZipMiddleware
+from agent import respond_async, stream_agent, check_availability_async, prewarm_date_parser, route_stats  # ✅ NEW
+from async_calendar import close_async_client, get_today_view
+from calendar_client import shutdown_pool
+import calendar_utils
+from calendar_utils import event_cache, calendar_mirror, booking_ledger, title_index
+from batch import parse_batch_items, run_batch
+from config import TRACE_LOG_ENABLED
+from tracing import TraceMiddleware, render_metrics
+from log_setup import get_logger, setup_logging, shutdown_logging, logging_stats
+
+# 📝 Logs go through a queue to one writer thread, so requests never block on stdout
+setup_logging()
+log = get_logger("api")
 
 app = FastAPI()
 
@@ -13,38 +32,121 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 🗜️ Compress larger JSON / NDJSON replies (each streamed chunk is flushed, SSE is left alone)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+# 🔭 Request id (X-Request-ID) and per-stage timings for every request
+app.add_middleware(TraceMiddleware, enabled=TRACE_LOG_ENABLED)
 
 class UserMessage(BaseModel):
     message: str
+    session_id: Optional[str] = None  # 🧠 Keeps multi-turn state apart per chat
 
 SANITY_TEST_MODE = False
 
-# ✅ Global memory + agent
-agent_executor = get_agent_executor()
+# 🔥 Load dateparser's language data before the first request arrives
+@app.on_event("startup")
+async def warm_date_parser():
+    await asyncio.to_thread(prewarm_date_parser)
+
+# 🔌 Close pooled Google Calendar transports on shutdown
+@app.on_event("shutdown")
+async def close_calendar_clients():
+    shutdown_pool()
+    await close_async_client()
+    shutdown_logging()
 
 @app.get("/")
 def read_root():
     return {"message": "🧠 Calendar Assistant API is running!"}
 
+# 🗃️ Event cache counters, for sizing TTL and capacity
+@app.get("/cache/stats")
+def cache_stats():
+    stats = {"event_cache": event_cache.stats(), "booking_ledger": booking_ledger.stats(), "logging": logging_stats()}
+    if calendar_mirror is not None:
+        stats["calendar_mirror"] = calendar_mirror.stats()
+    if title_index is not None:
+        stats["title_index"] = title_index.stats()
+    return stats
+
+# 🔀 Which path (manual router / LLM) served /agent, with latencies
+@app.get("/router/stats")
+def router_stats():
+    return route_stats.stats()
+
+# 📈 Stage and request latency histograms in Prometheus text format
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# 📍 Today's events for the sidebar. Served from the event cache, with an ETag
+# so a client polling an unchanged day gets an empty 304.
+@app.get("/today")
+async def today(request: Request):
+    try:
+        view = await get_today_view()
+    except Exception as e:
+        log.error("/today failed: %s", e)
+        raise HTTPException(status_code=502, detail=f"Could not load today's events: {e}")
+
+    body = json.dumps(view, ensure_ascii=False, sort_keys=True)
+    etag = f'"{hashlib.sha1(body.encode()).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(view, headers=headers)
+
 @app.post("/agent")
-def chat_with_agent(request: UserMessage):
-    print(f"\n📥 Received message: {request.message}")
+async def chat_with_agent(request: UserMessage):
+    log.info("📥 Received message: %s", request.message)
     try:
         if SANITY_TEST_MODE:
-            print("🧪 Using tool directly (Sanity Mode)")
+            log.info("🧪 Using tool directly (Sanity Mode)")
             return {
-                "response": check_availability("2025-07-07")
+                "response": await check_availability_async("2025-07-07")
             }
 
-        # ✅ Use persistent LLM-backed agent
-        reply = run_agent(request.message)
-        print(f"Agent reply: {reply}")
-        return {"response": reply}
+        # 🔀 Manual router for confident parses, LLM agent for the rest (AGENT_ROUTER)
+        # ⚡ Calendar I/O is awaited, so one worker serves many chats concurrently
+        revision = calendar_utils.calendar_revision
+        reply = await respond_async(request.message, session_id=request.session_id)
+        log.debug("Agent reply: %s", reply)
+        return {"response": reply, "calendar_changed": calendar_utils.calendar_revision != revision}
 
     except Exception as e:
-        print(f"❌ Error in /agent: {e}")
+        log.error("/agent failed: %s", e)
         return {"response": f"❌ Server error: {e}"}
-    
+
+# 📡 Same turn as /agent, streamed as Server-Sent Events: intent, route,
+# calendar_fetched, tool_output, token (LLM path), then final
+@app.post("/agent/stream")
+async def stream_chat_with_agent(request: UserMessage):
+    log.info("📥 Received message (stream): %s", request.message)
+
+    async def sse():
+        async for event, data in stream_agent(request.message, session_id=request.session_id):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # don't let a proxy buffer the stream
+    })
+
+# 📦 Many messages in one call: a JSON list, {"messages": [...]}, or JSONL.
+# Results stream back as NDJSON, one line per message, in input order.
+@app.post("/agent/batch")
+async def batch_chat_with_agent(request: Request):
+    try:
+        items = parse_batch_items(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    log.info("📥 Received batch of %s messages", len(items))
+
+    async def ndjson():
+        async for result in run_batch(items):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 
 # ✅ Run API: uvicorn main:app --reload
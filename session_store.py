@@ -0,0 +1,241 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from config import SESSION_BACKEND, SESSION_TTL_SECONDS, SESSION_MAX_LOCAL, SESSION_SQLITE_PATH, REDIS_URL
+
+DEFAULT_SESSION_ID = "default"
+
+
+# ------------------------------
+# 🧠 ChatContext to track memory (one per session)
+# ------------------------------
+class ChatContext:
+    __slots__ = (
+        "pending_booking",
+        "last_date",
+        "pending_delete",
+        "pending_delete_title",
+        "pending_reschedule",
+        "pending_reschedule_title",
+        "llm_history",
+    )
+
+    def __init__(self):
+        self.pending_booking = None
+        self.last_date = None
+        self.pending_delete = False
+        self.pending_delete_title = None
+        self.pending_reschedule = False
+        self.pending_reschedule_title = None
+        self.llm_history = None  # [[user, assistant], ...] of this session's LLM turns
+
+    def update_date(self, date_str):
+        self.last_date = date_str
+
+    def get_last_date(self):
+        return self.last_date
+
+    # 📦 Compact positional encoding for out-of-process backends
+    def dumps(self) -> str:
+        return json.dumps([getattr(self, name) for name in self.__slots__], separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, payload: str):
+        context = cls()
+        context.restore(payload)
+        return context
+
+    def restore(self, payload: str):
+        """Overwrite this context in place with state from dumps()."""
+        for name, value in zip(self.__slots__, json.loads(payload)):
+            setattr(self, name, value)
+
+    def is_pending(self) -> bool:
+        return bool(self.pending_booking or self.pending_delete or self.pending_reschedule)
+
+
+# ------------------------------
+# 🗄️ Backends
+# ------------------------------
+class MemorySessionBackend:
+    """In-process LRU + TTL store. Fine for one worker; use SQLite/Redis to share across processes."""
+
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS, max_sessions=SESSION_MAX_LOCAL):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            expires_at, context = entry
+            if expires_at <= time.monotonic():
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return context
+
+    def save(self, session_id, context):
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic() + self.ttl_seconds, context)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionBackend:
+    """Sessions in a local SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path=SESSION_SQLITE_PATH, ttl_seconds=SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS chat_sessions (id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id):
+        row = self._connect().execute(
+            "SELECT state FROM chat_sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        return ChatContext.loads(row[0]) if row else None
+
+    def save(self, session_id, context):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_sessions (id, state, expires_at) VALUES (?, ?, ?)",
+                (session_id, context.dumps(), time.time() + self.ttl_seconds)
+            )
+            # 🧹 Opportunistic cleanup of expired sessions
+            conn.execute("DELETE FROM chat_sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+
+
+class LocalRedis:
+    """Minimal in-process stand-in for the redis-py calls used below (get / set with ex / delete)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (None, None))
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+
+class RedisSessionBackend:
+    """Sessions in Redis (or anything exposing get / set(ex=) / delete), shared across hosts."""
+
+    def __init__(self, client=None, ttl_seconds=SESSION_TTL_SECONDS, prefix="chat_session:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("SESSION_BACKEND=redis needs the 'redis' package (pip install redis).") from e
+            client = redis.Redis.from_url(REDIS_URL)
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def load(self, session_id):
+        payload = self.client.get(self.prefix + session_id)
+        if payload is None:
+            return None
+        return ChatContext.loads(payload.decode() if isinstance(payload, bytes) else payload)
+
+    def save(self, session_id, context):
+        self.client.set(self.prefix + session_id, context.dumps(), ex=self.ttl_seconds)
+
+    def delete(self, session_id):
+        self.client.delete(self.prefix + session_id)
+
+
+# ------------------------------
+# 🗂️ Session store + the per-request "current context"
+# ------------------------------
+class SessionStore:
+    def __init__(self, backend=None):
+        self.backend = backend or MemorySessionBackend()
+
+    def load(self, session_id) -> ChatContext:
+        return self.backend.load(session_id or DEFAULT_SESSION_ID) or ChatContext()
+
+    def save(self, session_id, context):
+        self.backend.save(session_id or DEFAULT_SESSION_ID, context)
+
+    def reset(self, session_id):
+        self.backend.delete(session_id or DEFAULT_SESSION_ID)
+
+
+def _backend_from_config():
+    if SESSION_BACKEND == "sqlite":
+        return SQLiteSessionBackend()
+    if SESSION_BACKEND == "redis":
+        return RedisSessionBackend()
+    if SESSION_BACKEND == "local-redis":
+        return RedisSessionBackend(client=LocalRedis())
+    return MemorySessionBackend()
+
+
+session_store = SessionStore(_backend_from_config())
+
+_current_context = ContextVar("chat_context", default=None)
+
+
+def current_context() -> ChatContext:
+    """The ChatContext of the request being handled (default session outside a scope)."""
+    context = _current_context.get()
+    if context is None:
+        context = session_store.load(DEFAULT_SESSION_ID)
+        session_store.save(DEFAULT_SESSION_ID, context)
+    return context
+
+
+@contextmanager
+def session_scope(session_id=None):
+    """Load a session's context for the duration of a request and persist it afterwards."""
+    context = session_store.load(session_id)
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
+        session_store.save(session_id, context)
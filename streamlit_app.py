@@ -1,14 +1,46 @@
 import streamlit as st
 import requests
 import time
+import uuid
 import pytz
 from datetime import datetime, timedelta
 from dateutil.parser import parse
-from calendar_utils import get_today_events
+from api_client import ApiCall, ApiClient
+from config import TODAY_VIEW_TTL_SECONDS, API_POOL_SIZE, API_RETRIES, API_RETRY_BACKOFF_SECONDS
+from today_cache import TodayView
 
 # 🌐 FastAPI backend URL
 API_URL = "https://calendar-booking-assistant.onrender.com"
 
+# 🌐 One keep-alive connection pool per server process, reused by every rerun and browser tab
+@st.cache_resource
+def api_client() -> ApiClient:
+    return ApiClient(API_URL, pool_size=API_POOL_SIZE, retries=API_RETRIES, backoff_seconds=API_RETRY_BACKOFF_SECONDS)
+
+# 🧾 Sidebar cards for the /today payload
+def render_today_cards(view: dict):
+    if not view.get("events"):
+        return ["🟢 Nothing to do today."]
+    return [f"""
+            <div style='margin-bottom:0.75rem; padding: 0.4rem 0.6rem; background-color: #2c2c2c; border-radius: 8px;'>
+                <span style="color:#f44336; font-weight:bold;">⏰ {event['time']}</span><br>
+                <span style="color:#ddd;">{event['summary']}</span>
+            </div>
+            """ for event in view["events"]]
+
+# 📍 One today view per server process, shared by every rerun and browser tab
+@st.cache_resource
+def today_view() -> TodayView:
+    client = api_client()
+    return TodayView(client.url("/today"), ttl_seconds=TODAY_VIEW_TTL_SECONDS, render=render_today_cards, session=client.session)
+
+PROGRESS_LABELS = {
+    "intent": lambda d: f"🧭 Understood: {', '.join(d.get('intents') or ['chat'])}",
+    "route": lambda d: "🤖 Asking the AI agent..." if d.get("path") == "llm" else f"⚡ Handling it directly{' with ' + d['tool'] if d.get('tool') else ''}",
+    "calendar_fetched": lambda d: f"📅 Calendar loaded ({d.get('events', d.get('busy_blocks', 0))} items, {d.get('source')})",
+    "tool_output": lambda d: f"🛠️ {d.get('tool')} finished",
+}
+
 # 🛠️ Page config
 st.set_page_config(page_title="🧠 Calendar Assistant", layout="wide")
 
@@ -16,12 +48,12 @@ st.set_page_config(page_title="🧠 Calendar Assistant", layout="wide")
 st.title("📅 AI Calendar Assistant")
 st.caption("Chat with your assistant to check availability, book slots, or manage meetings.")
 
-# 🧭 Sidebar summary (Always fetch fresh)
+# 🧭 Sidebar summary (cached; refreshed after TTL or when the assistant changes the calendar)
 with st.sidebar:
     st.header("📍 Today at a Glance")
 
     try:
-        sidebar_events = get_today_events()
+        sidebar_events = today_view().get()
         for event_html in sidebar_events:
             st.markdown(event_html, unsafe_allow_html=True)
     except Exception as e:
@@ -30,6 +62,7 @@ with st.sidebar:
     st.markdown("---")
     if st.button("🔄 Clear Chat"):
         st.session_state.chat_history = []
+        st.session_state.session_id = str(uuid.uuid4())  # 🧠 Fresh backend context too
         st.rerun()
     
     st.markdown("### 💬 Ask something like:")
@@ -53,6 +86,8 @@ with st.sidebar:
 # 🔁 Initialize session state
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = str(uuid.uuid4())
 
 st.divider()
 
@@ -73,37 +108,54 @@ if user_input:
     st.session_state.chat_history.append({"role": "user", "content": user_input})
 
     with st.chat_message("assistant"):
-        with st.spinner("🤔 Thinking..."):
-            start_time = time.time()
-            try:
-                response = requests.post(f"{API_URL}/agent", json={"message": user_input}, timeout=60)
-                response.raise_for_status()
-                data = response.json()
-                assistant_reply = data.get("response")
-
-                if not assistant_reply:
-                    assistant_reply = "❌ No response received from the assistant."
-                    st.error("⚠️ Empty response from backend.")
-            except requests.exceptions.RequestException as e:
-                assistant_reply = f"❌ Request failed: {e}"
-                st.error(assistant_reply)
-            except Exception as e:
-                assistant_reply = f"❌ Unexpected error: {e}"
-                st.error(assistant_reply)
-
-            response_time = round(time.time() - start_time, 2)
-            st.markdown(f"**Assistant:**\n\n{assistant_reply}", unsafe_allow_html=True)
-            st.caption(f"⏱️ Responded in {response_time}s")
-
-            st.session_state.chat_history.append({
-                "role": "assistant",
-                "content": assistant_reply
-            })
-
-        # 🔁 Rerun sidebar if calendar modified
-        trigger_keywords = ["Booking confirmed", "Rescheduled", "Event deleted"]
-        if any(keyword in assistant_reply for keyword in trigger_keywords):
-            time.sleep(1.5)  # allow Google Calendar to sync
+        # 📡 Render progress as the backend reports it instead of a blind spinner
+        progress = st.empty()
+        reply_box = st.empty()
+        progress.caption("🤔 Thinking...")
+        start_time = time.time()
+        first_update = None
+        assistant_reply = None
+        calendar_changed = False
+        streamed_tokens = ""
+        call = ApiCall()
+        try:
+            payload = {"message": user_input, "session_id": st.session_state.session_id}
+            for event, data in api_client().stream_events("/agent/stream", payload, call):
+                if first_update is None:
+                    first_update = round(time.time() - start_time, 2)
+                if event in PROGRESS_LABELS:
+                    progress.caption(PROGRESS_LABELS[event](data))
+                elif event == "token":
+                    streamed_tokens += data.get("text", "")
+                    reply_box.markdown(f"**Assistant:**\n\n{streamed_tokens}▌", unsafe_allow_html=True)
+                elif event == "final":
+                    assistant_reply = data.get("response")
+                    calendar_changed = data.get("calendar_changed", False)
+
+            if not assistant_reply:
+                assistant_reply = "❌ No response received from the assistant."
+                st.error("⚠️ Empty response from backend.")
+        except requests.exceptions.RequestException as e:
+            assistant_reply = f"❌ Request failed: {e}"
+            st.error(assistant_reply)
+        except Exception as e:
+            assistant_reply = f"❌ Unexpected error: {e}"
+            st.error(assistant_reply)
+
+        response_time = round(time.time() - start_time, 2)
+        progress.empty()
+        reply_box.markdown(f"**Assistant:**\n\n{assistant_reply}", unsafe_allow_html=True)
+        first_update_note = f" (first update after {first_update}s)" if first_update is not None else ""
+        st.caption(f"⏱️ Responded in {response_time}s{first_update_note} · {call.label()}")
+
+        st.session_state.chat_history.append({
+            "role": "assistant",
+            "content": assistant_reply
+        })
+
+        # 🔁 Refresh the sidebar if the backend reports the turn wrote to the calendar
+        if calendar_changed:
+            today_view().invalidate()
             st.rerun()
 
 
@@ -0,0 +1,271 @@
+import difflib
+import re
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import pytz
+from dateutil.parser import parse
+
+# Words that carry no identity in "cancel the marketing review"-style titles
+STOPWORDS = {"a", "an", "the", "my", "our", "with", "for", "of"}
+INDEXED_FIELDS = ("id", "summary", "start", "end", "status")
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace: "Q3  Review!" -> "q3 review"."""
+    return " ".join(_NON_WORD.sub(" ", (title or "").lower()).split())
+
+
+def title_words(title: str) -> frozenset:
+    """The words that identify a title, ignoring order, case, punctuation and stopwords."""
+    words = normalize_title(title).split()
+    return frozenset(word for word in words if word not in STOPWORDS) or frozenset(words)
+
+
+def is_unambiguous(title: str, tier: str, events) -> bool:
+    """
+    Whether a destructive action may go ahead on a title match without asking:
+    an exact title, or a single event whose title has exactly the same words.
+    Prefix, partial-word and fuzzy matches always need confirmation.
+    """
+    if tier == "exact":
+        return bool(events)
+    return len(events) == 1 and title_words(events[0].get("summary", "")) == title_words(title)
+
+
+def _parse_datetime(value: str) -> datetime:
+    # API timestamps are RFC3339, which the stdlib parses far faster than dateutil
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return parse(value)
+
+
+def _prefixed(sorted_keys, prefix):
+    """Keys of a sorted list that start with `prefix`, found by bisection."""
+    i = bisect_left(sorted_keys, prefix)
+    while i < len(sorted_keys) and sorted_keys[i].startswith(prefix):
+        yield sorted_keys[i]
+        i += 1
+
+
+# ------------------------------
+# 🔎 In-memory title index for find / delete / reschedule lookups
+# ------------------------------
+class TitleIndex:
+    """
+    Normalized titles and title tokens -> event ids, with each event's start.
+
+    The index covers a window from yesterday to `horizon_days` ahead. It is
+    rebuilt from one listing when older than `max_age` seconds, and our own
+    writes (`upsert` / `remove`) keep it current in between. Writes that land
+    while a rebuild is fetching are journaled and replayed on top of it.
+
+    `match` tries exact, prefix, all-tokens and finally fuzzy title matches,
+    returning the first tier that has any event in the requested time range.
+    Loose tiers are for finding events; use `is_unambiguous` before acting
+    on one.
+    """
+
+    def __init__(self, max_age=300, horizon_days=90, fuzzy_cutoff=0.8, timezone="Asia/Kolkata"):
+        self.max_age = max_age
+        self.horizon_days = horizon_days
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.tz = pytz.timezone(timezone)
+
+        self._lock = threading.RLock()
+        self._events = {}    # id -> (normalized title, start, event)
+        self._by_title = {}  # normalized title -> {id}
+        self._by_token = {}  # token -> {id}
+        self._sorted_titles = None  # rebuilt lazily after changes
+        self._sorted_tokens = None
+        self._window = None
+        self._loaded_at = None
+        self._refreshing = 0
+        self._journal = []
+
+        self.refreshes = 0
+        self.lookups = 0
+        self.matches = {"exact": 0, "prefix": 0, "tokens": 0, "fuzzy": 0, "none": 0}
+
+    # 🔄 Refresh
+    def needs_refresh(self) -> bool:
+        with self._lock:
+            return self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+
+    def begin_refresh(self):
+        """
+        Return the (start, end) window to fetch, or None when another refresh
+        is already running and the current contents can keep serving.
+        """
+        with self._lock:
+            if self._refreshing and self._loaded_at is not None:
+                return None
+            self._refreshing += 1
+            now = datetime.now(pytz.utc)
+            return now - timedelta(days=1), now + timedelta(days=self.horizon_days)
+
+    def finish_refresh(self, events, window):
+        with self._lock:
+            self._clear()
+            for event in events:
+                self._add(event)
+            for op, payload in self._journal:
+                if op == "upsert":
+                    self._drop(payload["id"])
+                    self._add(payload)
+                else:
+                    self._drop(payload)
+            self._window = window
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            self._end_refresh()
+
+    def abort_refresh(self):
+        with self._lock:
+            self._end_refresh()
+
+    def _end_refresh(self):
+        self._refreshing -= 1
+        if not self._refreshing:
+            self._journal = []
+
+    # ✍️ Writes
+    def upsert(self, event: dict):
+        if not event or not event.get("id"):
+            return
+        event = {key: event[key] for key in INDEXED_FIELDS if key in event}
+        with self._lock:
+            if self._refreshing:
+                self._journal.append(("upsert", event))
+            self._drop(event["id"])
+            self._add(event)
+
+    def remove(self, event_id: str):
+        with self._lock:
+            if self._refreshing:
+                self._journal.append(("remove", event_id))
+            self._drop(event_id)
+
+    def _event_start(self, event):
+        start = event.get("start") or {}
+        if "dateTime" in start:
+            return _parse_datetime(start["dateTime"])
+        if "date" in start:
+            return self.tz.localize(datetime.strptime(start["date"], "%Y-%m-%d"))
+        return None
+
+    def _add(self, event):
+        if event.get("status") == "cancelled":
+            return
+        try:
+            start = self._event_start(event)
+        except (ValueError, OverflowError):
+            start = None
+        if start is None:
+            return
+        title = normalize_title(event.get("summary", ""))
+        self._events[event["id"]] = (title, start, event)
+        self._by_title.setdefault(title, set()).add(event["id"])
+        for token in set(title.split()):
+            self._by_token.setdefault(token, set()).add(event["id"])
+        self._sorted_titles = self._sorted_tokens = None
+
+    def _drop(self, event_id):
+        entry = self._events.pop(event_id, None)
+        if entry is None:
+            return
+        title = entry[0]
+        for key, table in [(title, self._by_title)] + [(token, self._by_token) for token in set(title.split())]:
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(event_id)
+                if not ids:
+                    del table[key]
+        self._sorted_titles = self._sorted_tokens = None
+
+    def _clear(self):
+        self._events.clear()
+        self._by_title.clear()
+        self._by_token.clear()
+        self._sorted_titles = self._sorted_tokens = None
+
+    # 🔍 Reads
+    def covers(self, start: datetime = None, end: datetime = None) -> bool:
+        """Whether [start, end) lies inside the indexed window (an open end never does)."""
+        with self._lock:
+            if self._window is None or end is None:
+                return False
+            window_start, window_end = self._window
+            return (start is None or start >= window_start) and end <= window_end
+
+    def window_end(self):
+        with self._lock:
+            return self._window[1] if self._window is not None else None
+
+    def match(self, title: str, start: datetime = None, end: datetime = None):
+        """
+        (tier, events) for events whose start is in [start, end) and whose
+        title matches `title`, ordered by start; tier is "exact", "prefix",
+        "tokens", "fuzzy" or "none". Returns None when the window isn't
+        indexed, so the caller can fall back to the API.
+        """
+        query = normalize_title(title)
+        with self._lock:
+            if not query or not self.covers(start, end):
+                return None
+            self.lookups += 1
+            for tier, ids in self._candidates(query):
+                events = [
+                    (event_start, event)
+                    for _, event_start, event in map(self._events.__getitem__, ids)
+                    if (start is None or event_start >= start) and event_start < end
+                ]
+                if events:
+                    self.matches[tier] += 1
+                    return tier, [event for _, event in sorted(events, key=lambda pair: pair[0])]
+            self.matches["none"] += 1
+            return "none", []
+
+    def lookup(self, title: str, start: datetime = None, end: datetime = None):
+        """The events of `match`, or None when the window isn't indexed."""
+        result = self.match(title, start, end)
+        return None if result is None else result[1]
+
+    def _candidates(self, query):
+        """Yield (tier, ids) from the strictest match to the loosest."""
+        yield "exact", self._by_title.get(query, ())
+
+        if self._sorted_titles is None:
+            self._sorted_titles = sorted(self._by_title)
+            self._sorted_tokens = sorted(self._by_token)
+
+        yield "prefix", {i for title in _prefixed(self._sorted_titles, query) for i in self._by_title[title]}
+
+        words = [word for word in query.split() if word not in STOPWORDS] or query.split()
+        ids = None
+        for word in words:
+            matching = {i for token in _prefixed(self._sorted_tokens, word) for i in self._by_token[token]}
+            ids = matching if ids is None else ids & matching
+            if not ids:
+                break
+        yield "tokens", ids or ()
+
+        close = difflib.get_close_matches(query, self._sorted_titles, n=5, cutoff=self.fuzzy_cutoff)
+        yield "fuzzy", {i for title in close for i in self._by_title[title]}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "events": len(self._events),
+                "titles": len(self._by_title),
+                "tokens": len(self._by_token),
+                "refreshes": self.refreshes,
+                "seconds_since_refresh": None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1),
+                "lookups": self.lookups,
+                "matches": dict(self.matches),
+            }
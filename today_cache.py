@@ -0,0 +1,78 @@
+import threading
+import time
+
+import requests
+
+
+# ------------------------------
+# 📍 Client-side cache of the backend's today view
+# ------------------------------
+class TodayView:
+    """
+    Cached `GET /today` for the Streamlit sidebar.
+
+    Within `ttl_seconds` of the last fetch the sidebar is served from memory.
+    After that, or after `invalidate()` (the backend reported a write), the
+    next `get()` revalidates with `If-None-Match`; a 304 keeps the cached
+    payload and rendered cards. If the backend can't be reached, the last
+    good cards are served until a fetch succeeds.
+    """
+
+    def __init__(self, url, ttl_seconds=30, render=None, timeout=(5, 10), session=None):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.render = render or (lambda view: view)
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+        self._lock = threading.Lock()
+        self._etag = None
+        self._rendered = None
+        self._fetched_at = None
+
+        self.hits = 0
+        self.not_modified = 0
+        self.fetches = 0
+        self.failures = 0
+
+    def _fresh(self):
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl_seconds
+
+    def get(self):
+        """Rendered today view, revalidated against the backend when stale."""
+        with self._lock:
+            if self._fresh():
+                self.hits += 1
+                return self._rendered
+
+            headers = {"If-None-Match": self._etag} if self._etag and self._rendered is not None else {}
+            try:
+                response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+                if response.status_code == 304:
+                    self.not_modified += 1
+                else:
+                    response.raise_for_status()
+                    self._rendered = self.render(response.json())
+                    self._etag = response.headers.get("ETag")
+                    self.fetches += 1
+                self._fetched_at = time.monotonic()
+            except (requests.RequestException, ValueError):
+                self.failures += 1
+                if self._rendered is None:
+                    raise
+            return self._rendered
+
+    def invalidate(self):
+        """Revalidate on the next `get()` (the ETag is kept, so an unchanged day still costs only a 304)."""
+        with self._lock:
+            self._fetched_at = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "not_modified": self.not_modified,
+                "fetches": self.fetches,
+                "failures": self.failures,
+                "age_seconds": None if self._fetched_at is None else round(time.monotonic() - self._fetched_at, 1),
+            }
@@ -0,0 +1,223 @@
+import functools
+import inspect
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from log_setup import get_logger
+
+# Stages timed on the hot path: intent_routing, date_parsing, calendar_fetch,
+# slot_computation, booking_write and llm_call
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+trace_log = get_logger("trace")
+
+_trace = ContextVar("request_trace", default=None)
+_parent = ContextVar("trace_parent_span", default=None)
+
+
+# ------------------------------
+# 📈 Prometheus-style histograms, rendered as text for /metrics
+# ------------------------------
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, seconds: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{label_text}}} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{{{label_text}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+                lines.append(f"{self.name}{{{label_text}}} {value}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+stage_seconds = Histogram("agent_stage_duration_seconds", "Time spent in each stage of a request.", ("stage",))
+stage_errors = Counter("agent_stage_errors_total", "Stages that ended with an exception.", ("stage",))
+request_seconds = Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "path", "status"))
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in (request_seconds, stage_seconds, stage_errors):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------
+# ⏱️ Spans: one timed stage of the current request
+# ------------------------------
+class RequestTrace:
+    """Spans recorded for one request, written as a single JSON log line when it ends."""
+
+    def __init__(self, request_id, **attrs):
+        self.request_id = request_id
+        self.attrs = attrs
+        self.started = time.perf_counter()
+        self.spans = []
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+    def to_dict(self) -> dict:
+        return {"request_id": self.request_id, **self.attrs, "duration_ms": self.elapsed_ms(), "spans": self.spans}
+
+
+def current_request_id():
+    trace = _trace.get()
+    return trace.request_id if trace is not None else None
+
+
+@contextmanager
+def span(stage: str, **attrs):
+    """
+    Time a stage. Always feeds the /metrics histogram; inside a request it is
+    also recorded on the request trace, with the enclosing stage as parent.
+    """
+    trace = _trace.get()
+    parent = _parent.get()
+    token = _parent.set(stage)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        _parent.reset(token)
+        stage_seconds.observe((stage,), seconds)
+        if error:
+            stage_errors.inc((stage,))
+        if trace is not None:
+            record = {"stage": stage, "ms": round(seconds * 1000, 2), "at_ms": round((started - trace.started) * 1000, 2)}
+            if parent:
+                record["parent"] = parent
+            if error:
+                record["error"] = error
+            record.update(attrs)
+            trace.spans.append(record)
+
+
+def traced(stage: str):
+    """Decorator form of `span` for plain and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def request_scope(request_id: str = None, log=True, **attrs):
+    """Collect spans for one request; `attrs` (path, status, ...) go into its JSON log line."""
+    trace = RequestTrace(request_id or uuid.uuid4().hex[:16], **attrs)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        if log:
+            # The trace dict is attached as structured fields and only serialized by the log writer
+            trace_log.info("request %s finished", trace.request_id, extra={"fields": trace.to_dict()})
+        _trace.reset(token)
+
+
+# ------------------------------
+# 🌐 ASGI middleware: request id in and out, one trace per request
+# ------------------------------
+class TraceMiddleware:
+    """
+    Reuses an incoming X-Request-ID (or makes one), returns it on the response
+    and times the request until its last body chunk, so streamed replies
+    are measured end to end.
+    """
+
+    def __init__(self, app, enabled=True, skip_paths=("/metrics",)):
+        self.app = app
+        self.enabled = enabled
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or None
+        status = 500
+
+        with request_scope(request_id, log=self.enabled, method=scope["method"], path=scope["path"]) as trace:
+            async def send_with_id(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    message["headers"] = list(message.get("headers") or []) + [(b"x-request-id", trace.request_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                trace.attrs["status"] = status
+                # Label by route template, not raw path, to keep series bounded
+                route = scope.get("route")
+                path = getattr(route, "path", None) or "unmatched"
+                request_seconds.observe((scope["method"], path, str(status)), time.perf_counter() - trace.started)